@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Batch Banner Generator
+Renders a manifest of banner jobs across a pool of worker processes
+
+The manifest is a JSON list (or {"jobs": [...]}) of objects like:
+    {"width": 1200, "height": 630, "variant": "dark", "output": "public/og-dragon-dark.png",
+     "title": "FRAME ECONOMICS", "seed": 0, "preset": "balanced", "formats": ["webp"]}
+Only width, height and output are required. Every job gets a fixed grain
+seed (0 unless given), so a manifest always produces the same bytes.
+preset and formats pick the PNG encoder preset and lossy siblings
+(see banner_encode); --preset and --formats set them for every job.
+Jobs whose inputs are unchanged since the last build are skipped (see
+banner_build); --force rebuilds everything.
+"""
+
+import argparse
+import functools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import banner_build
+import banner_encode
+import banner_layers
+import banner_profile
+import banner_scene
+import generate_banners
+
+
+def load_manifest(path):
+    """Read and validate a manifest file"""
+    with open(path) as f:
+        data = json.load(f)
+    jobs = data["jobs"] if isinstance(data, dict) else data
+    outputs = set()
+    for i, job in enumerate(jobs):
+        missing = {"width", "height", "output"} - job.keys()
+        if missing:
+            raise ValueError(f"Job {i} is missing {', '.join(sorted(missing))}")
+        if job["output"] in outputs:
+            raise ValueError(f"Job {i} writes {job['output']} which another job already writes")
+        outputs.add(job["output"])
+        if job.get("preset", banner_encode.DEFAULT_PRESET) not in banner_encode.PRESETS:
+            raise ValueError(f"Job {i} asks for unknown preset {job['preset']}")
+        unknown = set(job.get("formats", ())) - set(banner_encode.SIBLINGS)
+        if unknown:
+            raise ValueError(f"Job {i} asks for unknown format {', '.join(sorted(unknown))}")
+    return jobs
+
+
+def job_inputs(job):
+    """What a job's output depends on, for the build manifest"""
+    params = {
+        "width": job["width"],
+        "height": job["height"],
+        "variant": job.get("variant", "dark"),
+        "title": job.get("title", generate_banners.DEFAULT_TITLE),
+        "seed": job.get("seed", 0),
+        "preset": job.get("preset") or banner_encode.DEFAULT_PRESET,
+        "formats": list(job.get("formats", ())),
+        **banner_layers.render_settings(),
+    }
+    font = generate_banners.find_font_path()
+    return banner_build.target_inputs(params, banner_build.BANNER_CODE, fonts=[font] if font else [])
+
+
+def run_job(job, encode_workers=None):
+    """Render and save one job (plus its siblings); returns its timing report
+
+    encode_workers caps the threads the "smallest" preset searches with.
+    """
+    start = time.perf_counter()
+    img = generate_banners.render_banner(
+        job["width"], job["height"], job.get("variant", "dark"),
+        title=job.get("title", generate_banners.DEFAULT_TITLE),
+        seed=job.get("seed", 0),
+    )
+    rendered = time.perf_counter()
+
+    with banner_profile.stage("encode", path=job["output"]):
+        outputs = banner_encode.save_image(img, job["output"], job.get("preset"), job.get("formats", ()),
+                                           encode_workers)
+    done = time.perf_counter()
+
+    return {
+        "output": job["output"],
+        "size": f"{job['width']}x{job['height']}",
+        "render_s": rendered - start,
+        "encode_s": done - rendered,
+        "total_s": done - start,
+        "bytes": outputs[0]["bytes"],
+        "outputs": outputs,
+        "pid": os.getpid(),
+    }
+
+
+def run_group(jobs, encode_workers=None):
+    """Run jobs one after another in this process, so the layers they share are drawn once"""
+    return [run_job(job, encode_workers) for job in jobs]
+
+
+def share_groups(jobs):
+    """Job indexes grouped by the cached base image their scenes start from (see banner_scene)"""
+    groups = {}
+    for i, job in enumerate(jobs):
+        key = banner_scene.shared_key(generate_banners.DRAGON_SCENE, job["width"], job["height"],
+                                      job.get("variant", "dark"))
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
+
+
+def run_batch(jobs, workers=None, build=None):
+    """Run jobs on a process pool and return reports in manifest order
+
+    workers=None uses every core; workers=1 runs in this process. With a
+    banner_build.BuildManifest, up-to-date jobs are skipped (their report
+    has "skipped": True), each rebuilt job's report lists why under
+    "rebuilt", and the manifest is updated and saved.
+    """
+    if build is None:
+        return _run_jobs(jobs, workers)
+    inputs = [job_inputs(job) for job in jobs]
+    reports = []
+    stale = []
+    for job, job_in in zip(jobs, inputs):
+        reasons = build.reasons(job["output"], job_in)
+        reports.append({"output": job["output"], "size": f"{job['width']}x{job['height']}",
+                        "skipped": not reasons, "rebuilt": reasons})
+        if reasons:
+            stale.append(len(reports) - 1)
+
+    for index, report in zip(stale, _run_jobs([jobs[i] for i in stale], workers)):
+        reports[index].update(report)
+        written = [out["path"] for out in report["outputs"] if out["bytes"] is not None]
+        build.record(jobs[index]["output"], inputs[index], written)
+    build.save()
+    return reports
+
+
+def _run_jobs(jobs, workers):
+    workers = workers or os.cpu_count() or 1
+    # Profiled runs stay in this process so every stage is recorded
+    if workers == 1 or len(jobs) <= 1 or banner_profile.PROFILER.enabled:
+        return [run_job(job) for job in jobs]
+    workers = min(workers, len(jobs))
+    groups = share_groups(jobs)
+    # Every core already has a job, so each job encodes on a single thread
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if len(groups) < workers:
+            return list(pool.map(functools.partial(run_job, encode_workers=1), jobs))
+        # Jobs sharing a base image go to the same worker, as long as that keeps every worker busy
+        reports = [None] * len(jobs)
+        batches = [[jobs[i] for i in group] for group in groups]
+        for group, group_reports in zip(groups, pool.map(functools.partial(run_group, encode_workers=1), batches)):
+            for i, report in zip(group, group_reports):
+                reports[i] = report
+        return reports
+
+
+def print_report(reports, wall):
+    built = [r for r in reports if not r.get("skipped")]
+    for r in reports:
+        if r.get("skipped"):
+            print(banner_build.format_reasons(r["output"], []))
+            continue
+        if r.get("rebuilt"):
+            print(banner_build.format_reasons(r["output"], r["rebuilt"]))
+        print(f"✅ {r['output']} ({r['size']}) render {r['render_s'] * 1000:.0f} ms, "
+              f"encode {r['encode_s'] * 1000:.0f} ms, {r['bytes']:,} bytes")
+        print(banner_encode.format_report(r["outputs"]))
+    job_time = sum(r["total_s"] for r in built)
+    skipped = len(reports) - len(built)
+    print(f"\n🎉 {len(built)} banners in {wall:.2f}s wall ({job_time:.2f}s summed job time"
+          + (f", {skipped} up to date)" if skipped else ")"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a manifest of banners in parallel")
+    parser.add_argument("manifest", help="JSON manifest of banner jobs")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--report", help="also write the per-job timing report as JSON")
+    parser.add_argument("--preset", choices=sorted(banner_encode.PRESETS),
+                        help=f"PNG encoder preset for every job (default: {banner_encode.DEFAULT_PRESET})")
+    parser.add_argument("--formats", default="", help="comma-separated siblings to write: "
+                        + ",".join(banner_encode.SIBLINGS))
+    parser.add_argument("--force", action="store_true", help="rebuild every job, even if up to date")
+    parser.add_argument("--build-manifest", default=banner_build.DEFAULT_MANIFEST,
+                        help="where inputs of finished builds are recorded (default: %(default)s)")
+    parser.add_argument("--profile", nargs="?", const="1", metavar="TRACE",
+                        help="time each render stage (runs jobs in this process); with a path, "
+                             "also write a Chrome trace there")
+    args = parser.parse_args()
+    if args.profile:
+        banner_profile.enable(args.profile)
+
+    formats = [fmt for fmt in args.formats.split(",") if fmt]
+    unknown = set(formats) - set(banner_encode.SIBLINGS)
+    if unknown:
+        parser.error(f"unknown format: {', '.join(sorted(unknown))}")
+    jobs = load_manifest(args.manifest)
+    for job in jobs:
+        if args.preset:
+            job["preset"] = args.preset
+        if formats:
+            job["formats"] = formats
+    start = time.perf_counter()
+    reports = run_batch(jobs, args.workers, banner_build.BuildManifest(args.build_manifest, args.force))
+    wall = time.perf_counter() - start
+    print_report(reports, wall)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"wall_s": wall, "jobs": reports}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
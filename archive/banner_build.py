@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Incremental builds for the banner scripts
+Each output is recorded in a JSON build manifest together with its inputs:
+the build parameters, hashes of the source images and fonts it reads, and
+hashes of the code that produces it. An output whose inputs and bytes are
+unchanged is skipped; anything else is rebuilt with the reasons reported.
+BANNER_BUILD_MANIFEST moves the manifest (default .cache/banner-build.json).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+ARCHIVE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MANIFEST = os.environ.get("BANNER_BUILD_MANIFEST", os.path.join(".cache", "banner-build.json"))
+
+# Modules (and the scene file) whose source decides the bytes of a generate_banners output
+BANNER_CODE = ("generate_banners.py", "banner_scene.py", "scenes/dragon.json", "banner_layers.py",
+               "banner_compositor.py", "banner_fonts.py", "banner_encode.py", "png_stream.py")
+
+_LABELS = {"code": "code", "sources": "source", "fonts": "font"}
+_hashes = {}
+
+
+def file_hash(path):
+    """sha256 of a file, remembered per (path, size, mtime); None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _hashes.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = _hashes[key] = h.hexdigest()
+    return digest
+
+
+def target_inputs(params, code=(), sources=(), fonts=()):
+    """Everything an output depends on, in the form the manifest stores
+
+    params must be JSON-serializable; code names modules in this directory,
+    sources and fonts are file paths.
+    """
+    inputs = {
+        "params": params,
+        "code": {name: file_hash(os.path.join(ARCHIVE_DIR, name)) for name in code},
+        "sources": {path: file_hash(path) for path in sources},
+        "fonts": {path: file_hash(path) for path in fonts},
+    }
+    # Round-trip so tuples compare equal to the lists read back from disk
+    return json.loads(json.dumps(inputs))
+
+
+class BuildManifest:
+    """Recorded inputs and output hashes per target, keyed by the target's main output path"""
+
+    def __init__(self, path=DEFAULT_MANIFEST, force=False):
+        self.path = path
+        self.force = force
+        try:
+            with open(path) as f:
+                self.targets = json.load(f)["targets"]
+        except (OSError, ValueError, KeyError):
+            self.targets = {}
+
+    def reasons(self, target, inputs):
+        """Why target must be rebuilt; an empty list means it is up to date"""
+        if self.force:
+            return ["forced"]
+        entry = self.targets.get(target)
+        if entry is None:
+            return ["not built before"]
+        reasons = []
+        old_params, new_params = entry["inputs"]["params"], inputs["params"]
+        for name in sorted(old_params.keys() | new_params.keys()):
+            if old_params.get(name) != new_params.get(name):
+                reasons.append(f"{name} changed: {old_params.get(name)!r} -> {new_params.get(name)!r}")
+        for kind, label in _LABELS.items():
+            old, new = entry["inputs"].get(kind, {}), inputs[kind]
+            for name in sorted(old.keys() | new.keys()):
+                if old.get(name) != new.get(name):
+                    reasons.append(f"{label} changed: {name}")
+        for path, digest in entry["outputs"].items():
+            current = file_hash(path)
+            if current is None:
+                reasons.append(f"output missing: {path}")
+            elif current != digest:
+                reasons.append(f"output modified: {path}")
+        return reasons
+
+    def record(self, target, inputs, outputs):
+        """Remember a finished build of target and the files it wrote"""
+        self.targets[target] = {"inputs": inputs, "outputs": {path: file_hash(path) for path in outputs}}
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory or ".", prefix=".tmp-")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"targets": self.targets}, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def format_reasons(target, reasons):
+    if not reasons:
+        return f"⏭️  {target} is up to date"
+    return f"🔨 {target}: " + "; ".join(reasons)
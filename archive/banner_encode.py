@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Encoder stage for the banner generators
+PNGs are first reduced losslessly (alpha dropped when fully opaque, a
+palette when there are at most 256 colours, grey when R == G == B) and then
+written with one of three presets:
+
+    fast      zlib level 1, Sub filter
+    balanced  zlib level 6, adaptive per-row filter
+    smallest  every filter choice screened at zlib level 1 in parallel, the
+              best SEARCH_KEEP redone at level 9, smallest kept
+
+WebP, AVIF and JPEG siblings can be written next to the PNG. Every output is
+reported with its encode time and size. BANNER_PNG_PRESET sets the default.
+stream_png() hands a PNG out in pieces as it is deflated, for HTTP responses.
+"""
+
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, features
+import numpy as np
+
+import png_stream
+
+# preset -> (zlib level, PNG filter choices to try)
+PRESETS = {
+    "fast": (1, ("sub",)),
+    "balanced": (6, ("adaptive",)),
+    "smallest": (9, png_stream.FILTERS + ("adaptive",)),
+}
+DEFAULT_PRESET = os.environ.get("BANNER_PNG_PRESET", "balanced")
+
+# Filters whose level 1 size ranks best are the only ones tried at full level;
+# across our banners the level 9 winner was always in the level 1 top two
+SCREEN_LEVEL = 1
+SEARCH_KEEP = 2
+
+# Rows per block when encode_png_planes() joins RGB and alpha
+PLANE_BLOCK_ROWS = 64
+
+# stream_png(): rows deflated per step, and compressed bytes per IDAT chunk sent
+STREAM_ROWS = 32
+STREAM_IDAT_BYTES = 16 * 1024
+
+# format -> (Pillow format, Pillow feature, extension, save options)
+SIBLINGS = {
+    "webp": ("WEBP", "webp", ".webp", {"quality": 90, "method": 4}),
+    "avif": ("AVIF", "avif", ".avif", {"quality": 80}),
+    "jpeg": ("JPEG", "jpg", ".jpg", {"quality": 90, "optimize": True, "progressive": True}),
+}
+
+
+def reduce_lossless(img):
+    """Smallest PNG colour type that holds img exactly: (mode, pixels, palette, transparency)"""
+    img = img if img.mode in ("RGB", "RGBA") else img.convert("RGBA")
+    arr = np.asarray(img)
+    has_alpha = img.mode == "RGBA" and img.getchannel("A").getextrema()[0] < 255
+    colors = img.getcolors(256)
+
+    if colors is not None:
+        gray = all(c[0] == c[1] == c[2] for _, c in colors)
+        if not gray or has_alpha:
+            # Palette: index every pixel by its packed colour
+            packed = arr.astype(np.uint32) @ (1 << np.arange(0, 8 * arr.shape[2], 8, dtype=np.uint32))
+            entries, indices = np.unique(packed, return_inverse=True)
+            table = ((entries[:, None] >> np.arange(0, 8 * arr.shape[2], 8)) & 0xFF).astype(np.uint8)
+            transparency = table[:, 3].tobytes() if has_alpha else None
+            return "P", indices.reshape(arr.shape[:2]).astype(np.uint8), table[:, :3].tobytes(), transparency
+
+    if not (arr[..., 0] == arr[..., 1]).all() or not (arr[..., 1] == arr[..., 2]).all():
+        return ("RGBA", arr, None, None) if has_alpha else ("RGB", np.ascontiguousarray(arr[..., :3]), None, None)
+    if has_alpha:
+        return "LA", np.ascontiguousarray(arr[..., (0, 3)]), None, None
+    return "L", np.ascontiguousarray(arr[..., 0]), None, None
+
+
+def _search(encode, preset, workers):
+    """Run encode(filter, level) as the preset says; the smallest result wins"""
+    level, filters = PRESETS[preset or DEFAULT_PRESET]
+    if len(filters) == 1:
+        return encode(filters[0], level)
+    # zlib and the numpy filters release the GIL, so threads use every core
+    with ThreadPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(filters))) as pool:
+        screened = dict(zip(filters, pool.map(lambda f: len(encode(f, SCREEN_LEVEL)), filters)))
+        finalists = sorted(filters, key=screened.get)[:SEARCH_KEEP]
+        return min(pool.map(lambda f: encode(f, level), finalists), key=len)
+
+
+def encode_png(img, preset=None, workers=None):
+    """PNG bytes for img; when a preset tries several filters the smallest result wins"""
+    mode, pixels, palette, transparency = reduce_lossless(img)
+    return _search(lambda filter, level: png_stream.encode_png(pixels, mode, level=level, filter=filter,
+                                                               palette=palette, transparency=transparency),
+                   preset, workers)
+
+
+def _row_blocks(img, rows):
+    """img as numpy arrays of `rows` rows each, so no full-frame array is made"""
+    for y in range(0, img.height, rows):
+        yield np.asarray(img.crop((0, y, img.width, min(y + rows, img.height))))
+
+
+def _stream_mode(img, rows):
+    """reduce_lossless's colour type for img when it has more than 256 colours, and the channels it keeps
+
+    Opacity comes from Pillow's band extrema and greyness from a scan block by
+    block that stops at the first coloured pixel, so neither copies the frame.
+    """
+    has_alpha = img.mode == "RGBA" and img.getextrema()[3][0] < 255
+    gray = all((block[..., 0] == block[..., 1]).all() and (block[..., 1] == block[..., 2]).all()
+               for block in _row_blocks(img, rows))
+    if gray:
+        return ("LA", (0, 3)) if has_alpha else ("L", (0,))
+    return ("RGBA", (0, 1, 2, 3)) if has_alpha else ("RGB", (0, 1, 2))
+
+
+def stream_png(render, preset=None, rows=STREAM_ROWS):
+    """encode_png as an iterator of byte chunks, for writing to a response as they are ready
+
+    The signature comes out before render() is called; the header needs the
+    image's reduced colour type, so it follows the render. With a single-filter
+    preset the rendered image is then read `rows` rows at a time: each block is
+    reduced to the colour type on its own and deflated, and IDAT chunks go out
+    as every STREAM_IDAT_BYTES are ready. Besides the render, only a block and
+    that much of the encoded file are held. Images of 256 colours or fewer
+    (palette or grey) and presets that search several filters need the whole
+    image reduced at once, and the latter yield their result in one piece.
+    """
+    yield png_stream.PNG_SIGNATURE
+    img = render()
+    img = img if img.mode in ("RGB", "RGBA") else img.convert("RGBA")
+    level, filters = PRESETS[preset or DEFAULT_PRESET]
+    if len(filters) > 1:
+        yield encode_png(img, preset)[len(png_stream.PNG_SIGNATURE):]
+        return
+
+    if img.getcolors(256) is None:
+        mode, channels = _stream_mode(img, rows)
+        palette = transparency = None
+        blocks = (np.ascontiguousarray(block[..., channels] if len(channels) > 1 else block[..., 0])
+                  for block in _row_blocks(img, rows))
+    else:
+        mode, pixels, palette, transparency = reduce_lossless(img)
+        blocks = (pixels[y:y + rows] for y in range(0, img.height, rows))
+
+    encoder = png_stream.PNGEncoder(img.width, img.height, mode, level=level, filter=filters[0],
+                                    idat_size=STREAM_IDAT_BYTES, palette=palette, transparency=transparency)
+    yield encoder.start()[len(png_stream.PNG_SIGNATURE):]
+    for block in blocks:
+        data = encoder.encode_rows(block)
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+def encode_png_planes(rgb, alpha, preset=None, workers=None):
+    """encode_png for an image held as an RGB buffer shared with other images plus its own alpha plane
+
+    RGBA rows are put together PLANE_BLOCK_ROWS at a time inside the encoder,
+    so the RGB is never copied whole. Of the lossless reductions only the
+    opaque-alpha one applies; palette and grey need the whole image.
+    """
+    height, width = alpha.shape
+    opaque = alpha.min() == 255
+
+    def encode(filter, level):
+        encoder = png_stream.PNGEncoder(width, height, "RGB" if opaque else "RGBA", level=level, filter=filter)
+        parts = [encoder.start()]
+        for y in range(0, height, PLANE_BLOCK_ROWS):
+            rows = rgb[y:y + PLANE_BLOCK_ROWS]
+            if not opaque:
+                rows = np.dstack((rows, alpha[y:y + PLANE_BLOCK_ROWS]))
+            parts.append(encoder.encode_rows(rows))
+        parts.append(encoder.finish())
+        return b"".join(parts)
+
+    return _search(encode, preset, workers)
+
+
+def encode_sibling(img, fmt):
+    """Lossy sibling bytes; JPEG has no alpha, so transparent images are flattened onto black"""
+    pillow_format, _, _, options = SIBLINGS[fmt]
+    if pillow_format == "JPEG" and img.mode != "RGB":
+        img = Image.alpha_composite(Image.new("RGBA", img.size, (0, 0, 0, 255)), img.convert("RGBA")).convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, pillow_format, **options)
+    return buf.getvalue()
+
+
+def available_formats():
+    """Sibling formats this Pillow build can write"""
+    return [fmt for fmt, (_, feature, _, _) in SIBLINGS.items() if features.check(feature)]
+
+
+def save_image(img, path, preset=None, formats=(), workers=None):
+    """Write img as a PNG at path plus one sibling per format; returns a report per file
+
+    Siblings replace the PNG's extension. Formats this Pillow build cannot
+    write are reported as skipped.
+    """
+    preset = preset or DEFAULT_PRESET
+    supported = set(available_formats())
+    reports = [_write(path, "png", preset, lambda: encode_png(img, preset, workers))]
+    for fmt in formats:
+        out_path = os.path.splitext(path)[0] + SIBLINGS[fmt][2]
+        if fmt not in supported:
+            reports.append({"path": out_path, "format": fmt, "encoder": "unavailable", "encode_s": 0.0,
+                            "bytes": None})
+        else:
+            reports.append(_write(out_path, fmt, f"q{SIBLINGS[fmt][3]['quality']}",
+                                  lambda fmt=fmt: encode_sibling(img, fmt)))
+    return reports
+
+
+def save_png_planes(rgb, alpha, path, preset=None, workers=None):
+    """Write an RGB + alpha plane image (see encode_png_planes) as a PNG; returns its report"""
+    preset = preset or DEFAULT_PRESET
+    return _write(path, "png", preset, lambda: encode_png_planes(rgb, alpha, preset, workers))
+
+
+def _write(path, fmt, encoder, encode):
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    data = encode()
+    seconds = time.perf_counter() - start
+    with open(path, "wb") as f:
+        f.write(data)
+    return {"path": path, "format": fmt, "encoder": encoder, "encode_s": seconds, "bytes": len(data)}
+
+
+def format_report(reports):
+    lines = []
+    for r in reports:
+        if r["bytes"] is None:
+            lines.append(f"  {r['format']:<5} {r['path']} skipped ({r['format']} support not built into Pillow)")
+        else:
+            lines.append(f"  {r['format']:<5} {r['encoder']:<9} {r['encode_s'] * 1000:>7.0f} ms "
+                         f"{r['bytes']:>10,} bytes  {r['path']}")
+    return "\n".join(lines)
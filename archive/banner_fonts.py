@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Process-wide font registry for the banner generators
+Each (candidate paths, size) is resolved and parsed by FreeType once. Text
+metrics and rasterized glyph masks are kept per (font, text), so rendering
+the same title or URL again, at any position or colour, skips FreeType.
+"""
+
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+class FontRegistry:
+    """Loaded fonts, text bounding boxes and text masks with hit/miss counters
+
+    Mask memory is bounded by max_mask_bytes (least recently used go first).
+    """
+
+    def __init__(self, max_mask_bytes=64 * 1024 * 1024):
+        self.max_mask_bytes = max_mask_bytes
+        self.mask_bytes = 0
+        self._fonts = {}
+        self._bboxes = {}
+        self._masks = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name, hit):
+        stats = self._stats.setdefault(name, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+    def font(self, size, candidates):
+        """First of candidates FreeType can load at size, else Pillow's default font"""
+        key = (tuple(candidates), size)
+        with self._lock:
+            font = self._fonts.get(key)
+            self._count("fonts", font is not None)
+        if font is not None:
+            return font
+        font = None
+        for path in candidates:
+            try:
+                font = ImageFont.truetype(path, size=size)
+                break
+            except (OSError, ValueError):
+                continue
+        if font is None:
+            font = ImageFont.load_default()
+        with self._lock:
+            return self._fonts.setdefault(key, font)
+
+    def getbbox(self, font, text):
+        """font.getbbox(text), computed once per (font, text)"""
+        key = (font, text)
+        with self._lock:
+            bbox = self._bboxes.get(key)
+            self._count("layouts", bbox is not None)
+        if bbox is None:
+            bbox = font.getbbox(text)
+            with self._lock:
+                self._bboxes[key] = bbox
+        return bbox
+
+    def textbbox(self, xy, text, font):
+        """ImageDraw.textbbox for single-line text at integer xy with the default anchor"""
+        if not _cacheable(xy, text, font):
+            return ImageDraw.Draw(_SCRATCH).textbbox(xy, text, font=font)
+        left, top, right, bottom = self.getbbox(font, text)
+        return left + xy[0], top + xy[1], right + xy[0], bottom + xy[1]
+
+    def _mask(self, font, text, mode):
+        key = (font, text, mode)
+        with self._lock:
+            entry = self._masks.get(key)
+            self._count("masks", entry is not None)
+            if entry is not None:
+                self._masks.move_to_end(key)
+                return entry
+        entry = font.getmask2(text, mode, start=(0, 0))
+        nbytes = entry[0].size[0] * entry[0].size[1]
+        with self._lock:
+            if key not in self._masks:
+                self._masks[key] = entry
+                self.mask_bytes += nbytes
+            while self.mask_bytes > self.max_mask_bytes and len(self._masks) > 1:
+                _, (evicted, _) = self._masks.popitem(last=False)
+                self.mask_bytes -= evicted.size[0] * evicted.size[1]
+        return entry
+
+    def draw_text(self, draw, xy, text, font, fill):
+        """draw.text(xy, text, font=font, fill=fill), reusing the rasterized mask
+
+        Multi-line text, fractional positions and bitmap fonts go through
+        ImageDraw unchanged.
+        """
+        if not _cacheable(xy, text, font):
+            draw.text(xy, text, font=font, fill=fill)
+            return
+        ink, fill_ink = draw._getink(fill)
+        ink = fill_ink if ink is None else ink
+        if ink is None:
+            return
+        mask, (dx, dy) = self._mask(font, text, draw.fontmode)
+        # The same call ImageDraw.text makes once it has the mask
+        draw.draw.draw_bitmap((xy[0] + dx, xy[1] + dy), mask, ink)
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    def format_stats(self):
+        lines = []
+        for name, s in sorted(self.stats().items()):
+            total = s["hits"] + s["misses"]
+            rate = s["hits"] / total if total else 0
+            lines.append(f"  {name:<8} {s['hits']:>6} hits {s['misses']:>6} misses  ({rate:.0%} hit rate)")
+        return "\n".join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._fonts.clear()
+            self._bboxes.clear()
+            self._masks.clear()
+            self._stats.clear()
+            self.mask_bytes = 0
+
+
+def _cacheable(xy, text, font):
+    return (isinstance(font, ImageFont.FreeTypeFont) and isinstance(text, str) and "\n" not in text
+            and all(isinstance(v, int) for v in xy))
+
+
+_SCRATCH = Image.new("L", (1, 1))
+
+FONTS = FontRegistry()
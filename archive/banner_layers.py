@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Shared layer cache for the banner generators
+Background, glow, vignette and grain layers depend only on their size and
+parameters, so they are built once and reused for every banner that asks
+for the same ones. Set BANNER_LAYER_CACHE to a directory to keep them on
+disk as .npy files between runs (clear it after changing how a layer is drawn).
+The drawing helpers the banner scenes are made of (gradient, radial glow,
+topo lines, dragon silhouette) live here too.
+"""
+
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
+import numpy as np
+import hashlib
+import math
+import os
+import threading
+from collections import OrderedDict
+
+
+class LayerCache:
+    """Memoizes RGBA layers as read-only uint8 arrays keyed by (name, params)
+
+    Memory use is bounded by max_bytes (least recently used layers go first).
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, persist_dir=None, enabled=True):
+        self.max_bytes = max_bytes
+        self.persist_dir = persist_dir
+        self.enabled = enabled
+        self.size = 0
+        self._layers = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name, field):
+        stats = self._stats.setdefault(name, {"hits": 0, "disk_hits": 0, "misses": 0})
+        stats[field] += 1
+
+    def _disk_path(self, name, params):
+        digest = hashlib.sha1(repr(params).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.persist_dir, f"{name}-{digest}.npy")
+
+    def get(self, name, params, build):
+        """Return the layer for (name, params), calling build() -> Image on a miss"""
+        if not self.enabled:
+            return np.asarray(build())
+        key = (name, params)
+        with self._lock:
+            arr = self._layers.get(key)
+            if arr is not None:
+                self._layers.move_to_end(key)
+                self._count(name, "hits")
+                return arr
+
+        arr = None
+        if self.persist_dir:
+            try:
+                arr = np.load(self._disk_path(name, params), mmap_mode="r")
+                self._count(name, "disk_hits")
+            except (OSError, ValueError):
+                arr = None
+        if arr is None:
+            arr = np.ascontiguousarray(np.asarray(build().convert("RGBA")))
+            self._count(name, "misses")
+            if self.persist_dir:
+                os.makedirs(self.persist_dir, exist_ok=True)
+                tmp = self._disk_path(name, params) + f".{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, arr)
+                os.replace(tmp, self._disk_path(name, params))
+        arr.flags.writeable = False
+
+        with self._lock:
+            if key not in self._layers:
+                self._layers[key] = arr
+                self.size += arr.nbytes
+            while self.size > self.max_bytes and len(self._layers) > 1:
+                _, evicted = self._layers.popitem(last=False)
+                self.size -= evicted.nbytes
+        return arr
+
+    def image(self, name, params, build):
+        """Like get(), but as an RGBA image sharing the cached pixels"""
+        return Image.fromarray(self.get(name, params, build), "RGBA")
+
+    def stats(self):
+        """Per-layer hit/miss counters"""
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    def format_stats(self):
+        lines = []
+        for name, s in sorted(self.stats().items()):
+            total = s["hits"] + s["disk_hits"] + s["misses"]
+            rate = (s["hits"] + s["disk_hits"]) / total if total else 0
+            lines.append(f"  {name:<12} {s['hits']:>5} hits {s['disk_hits']:>5} disk {s['misses']:>5} misses  "
+                         f"({rate:.0%} hit rate)")
+        return "\n".join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._layers.clear()
+            self._stats.clear()
+            self.size = 0
+
+
+LAYERS = LayerCache(persist_dir=os.environ.get("BANNER_LAYER_CACHE") or None)
+
+
+def vertical_gradient_rgba(w, h, top_rgb, bot_rgb, rows=None):
+    """Create a vertical gradient background (only rows y0..y1 if rows=(y0, y1))"""
+    y0, y1 = rows or (0, h)
+    g = np.linspace(0, 1, h, dtype=np.float32)[y0:y1, None, None]
+    top = np.array(top_rgb, dtype=np.float32)[None, None, :]
+    bot = np.array(bot_rgb, dtype=np.float32)[None, None, :]
+    arr = top * (1 - g) + bot * g
+    arr = np.repeat(arr, w, axis=1)
+    arr = np.ascontiguousarray(arr.astype(np.uint8))
+    return Image.fromarray(arr, "RGB").convert("RGBA")
+
+
+def radial_overlay(w, h, center, color=(70, 160, 120), power=2.1, alpha=0.45, rows=None):
+    """Create a radial gradient overlay (only rows y0..y1 if rows=(y0, y1))"""
+    y0, y1 = rows or (0, h)
+    # Open grids broadcast to the same values as np.mgrid without two full int64 planes
+    yy, xx = np.ogrid[y0:y1, 0:w]
+    cx, cy = center
+    r = np.sqrt(((xx - cx) / (0.9 * w)) ** 2 + ((yy - cy) / (0.9 * h)) ** 2)
+    mask = np.clip(1 - (r ** power), 0, 1) * alpha * 255
+    overlay = Image.new("RGBA", (w, y1 - y0), color + (0,))
+    overlay.putalpha(Image.fromarray(mask.astype(np.uint8)))
+    return overlay
+
+
+def add_topo_lines(img, color=(22, 65, 58, 55), step=44, y0=0, height=None):
+    """Add topographical lines to the background
+
+    img may be a strip of a taller canvas: y0 is its first row and height
+    the full canvas height.
+    """
+    draw = ImageDraw.Draw(img)
+    W, H = img.width, height or img.height
+    for i in range(-H, W, step):
+        draw.line([(i, -y0), (i + H, H - y0)], fill=color, width=1)
+
+
+def create_dragon_silhouette(w, h):
+    """Create a dragon silhouette using paths"""
+    dragon = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    draw_dragon_silhouette(ImageDraw.Draw(dragon), w, h)
+    return dragon
+
+
+def draw_dragon_silhouette(draw, w, h, offset=(0, 0)):
+    """Draw the w x h silhouette with its top-left corner at offset (may lie off-canvas)"""
+    ox, oy = offset
+    
+    # Scale factor based on image size
+    scale = min(w, h) / 400
+    
+    def pt(x, y):
+        return (int(x * scale) + ox, int(y * scale) + oy)
+    
+    # Dragon head outline (simplified)
+    head_points = [
+        pt(200, 150),
+        pt(180, 120),
+        pt(160, 100),
+        pt(200, 80),
+        pt(240, 90),
+        pt(280, 110),
+        pt(300, 140),
+        pt(290, 170),
+        pt(270, 180),
+        pt(240, 175),
+    ]
+    
+    # Draw dragon head
+    draw.polygon(head_points, fill=(90, 210, 160, 180), outline=(60, 180, 130, 200))
+    
+    # Dragon horns/antlers
+    horn_points = [
+        [pt(220, 80), pt(210, 60), pt(215, 40)],
+        [pt(240, 75), pt(250, 55), pt(260, 35)],
+        [pt(260, 85), pt(275, 65), pt(290, 45)]
+    ]
+    
+    for horn in horn_points:
+        draw.line(horn, fill=(90, 210, 160, 220), width=int(3 * scale))
+    
+    # Dragon eye
+    draw.ellipse([pt(230, 130), pt(245, 145)], fill=(120, 240, 180, 255))
+    
+    # Breathing effect (curved lines)
+    breath_points = [
+        [pt(160, 140), pt(120, 135), pt(80, 130)],
+        [pt(165, 150), pt(125, 148), pt(85, 145)],
+        [pt(155, 130), pt(115, 125), pt(75, 120)]
+    ]
+    
+    for breath in breath_points:
+        draw.line(breath, fill=(90, 210, 160, 150), width=int(2 * scale))
+
+
+# "exact" blurs the whole canvas with Pillow; "fast" reproduces that blur per axis
+VIGNETTE_QUALITY = os.environ.get("BANNER_VIGNETTE_QUALITY", "fast")
+# Largest alpha difference the fast vignette may show against the exact one
+VIGNETTE_TOLERANCE = 1
+
+# "exact" is Pillow's GaussianBlur at full size; "fast" and "draft" blur large radii
+# on a downsampled copy, shrinking it while the remaining radius stays above this
+BLUR_QUALITY = os.environ.get("BANNER_BLUR_QUALITY", "fast")
+BLUR_MIN_RADIUS = {"exact": math.inf, "fast": 3.5, "draft": 1.75}
+# Largest channel difference each quality may show against the exact blur
+BLUR_TOLERANCE = {"exact": 0, "fast": 2, "draft": 6}
+
+# "tile" cuts grain from a seamless noise tile made once per (blur, alpha); the seed
+# picks where in the tile the frame starts. "field" draws and blurs full-frame noise.
+GRAIN_TEXTURE = os.environ.get("BANNER_GRAIN_TEXTURE", "tile")
+GRAIN_TILE = 512
+GRAIN_TILE_SEED = 0
+
+
+def render_settings():
+    """The environment settings above, which change a render's bytes: a build input"""
+    return {"vignette_quality": VIGNETTE_QUALITY, "blur_quality": BLUR_QUALITY, "grain_texture": GRAIN_TEXTURE}
+
+# Field noise is drawn from one RNG per block of rows, so any strip can be regenerated alone
+GRAIN_BLOCK_ROWS = 64
+
+
+def vignette_layer(w, h, radius, strength, inset=0, quality=None):
+    """Dark edge vignette: black with alpha rising towards the borders
+
+    A white rectangle inset from the edges is blurred, inverted and scaled
+    by strength into the alpha channel. With inset=0 the rectangle fills
+    the canvas, and because the blur extends edge pixels the layer comes
+    out fully transparent.
+    """
+    quality = quality or VIGNETTE_QUALITY
+    if quality == "fast":
+        vignette = _fast_vignette_mask(w, h, radius, strength, inset)
+    else:
+        vignette = Image.new("L", (w, h), 0)
+        vignette_draw = ImageDraw.Draw(vignette)
+        vignette_draw.rectangle((inset, inset, w - 1 - inset, h - 1 - inset), fill=255)
+        vignette = vignette.filter(ImageFilter.GaussianBlur(radius))
+        vignette = ImageOps.invert(vignette)
+        vignette = vignette.point(lambda x: int(x * strength))
+
+    vig_img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    if vignette is not None:
+        vig_img.putalpha(vignette)
+    return vig_img
+
+
+def _box_radius(sigma, passes):
+    """Fractional box radius Pillow uses to approximate a Gaussian (Gwosdek et al.)"""
+    sigma2 = sigma * sigma / passes
+    length = math.sqrt(12.0 * sigma2 + 1.0)
+    whole = math.floor((length - 1.0) / 2.0)
+    frac = (2 * whole + 1) * (whole * (whole + 1) - 3 * sigma2)
+    frac /= 6 * (sigma2 - (whole + 1) * (whole + 1))
+    return whole, frac
+
+
+def _blur_profile(n, inset, sigma, passes=3):
+    """1-D edge falloff: Pillow's clamped, per-pass rounded box cascade on one axis"""
+    profile = np.zeros(n, dtype=np.float64)
+    profile[inset:n - inset] = 255
+    whole, frac = _box_radius(sigma, passes)
+    kernel = np.ones(2 * whole + 3)
+    kernel[0] = kernel[-1] = frac
+    kernel /= 2 * (whole + frac) + 1
+    for _ in range(passes):
+        padded = np.pad(profile, whole + 1, mode="edge")
+        profile = np.floor(np.convolve(padded, kernel, mode="valid") + 0.5)
+    return profile.astype(np.float32)
+
+
+def blur_halo(radius, passes=3):
+    """Rows beyond a strip that GaussianBlur(radius) reads to get the strip's own rows right"""
+    whole, _ = _box_radius(radius, passes)
+    return passes * (whole + 1)
+
+
+def blur_factor(radius, quality=None):
+    """Downsampling factor blur_image uses for radius: a power of two, 1 for an exact blur"""
+    min_radius = BLUR_MIN_RADIUS[quality or BLUR_QUALITY]
+    factor = 1
+    while radius / (factor * 2) >= min_radius:
+        factor *= 2
+    return factor
+
+
+def blur_image(img, radius, quality=None):
+    """GaussianBlur(radius), approximated through a pyramid for large radii
+
+    The image is padded to a multiple of the factor with its edge pixels (as
+    the exact blur extends them), box-reduced, blurred by radius / factor and
+    scaled back up bilinearly, so the cost follows the image size over the
+    factor squared. RGBA goes through as four plain bands: Pillow's reduce
+    and resize would premultiply alpha, its GaussianBlur does not.
+    """
+    factor = blur_factor(radius, quality)
+    if factor == 1 or img.mode != "RGBA":
+        return img.filter(ImageFilter.GaussianBlur(radius))
+    w, h = img.size
+    pw, ph = -(-w // factor) * factor, -(-h // factor) * factor
+    data = np.asarray(img)
+    if (pw, ph) != (w, h):
+        data = np.pad(data, ((0, ph - h), (0, pw - w), (0, 0)), mode="edge")
+    bands = Image.frombytes("CMYK", (pw, ph), data.tobytes())
+    small = bands.reduce(factor).filter(ImageFilter.GaussianBlur(radius / factor))
+    blurred = Image.frombytes("RGBA", (pw, ph), small.resize((pw, ph), Image.BILINEAR).tobytes())
+    return blurred if (pw, ph) == (w, h) else blurred.crop((0, 0, w, h))
+
+
+def _fast_vignette_mask(w, h, radius, strength, inset, rows=None):
+    """Separable equivalent of the blurred-rectangle mask, or None if fully transparent"""
+    # Invert and scale in one lookup table, as ImageOps.invert + point() would
+    lut = [int((255 - x) * strength) for x in range(256)]
+    y0, y1 = rows or (0, h)
+    px = _blur_profile(w, inset, radius)
+    py = _blur_profile(h, inset, radius)[y0:y1]
+    if lut[int(px.min() * py.min() / 255 + 0.5)] == 0:
+        return None
+    blurred = np.outer(py * (1 / 255), px)
+    blurred += 0.5
+    return Image.fromarray(blurred.astype(np.uint8), "L").point(lut)
+
+
+def vignette_rows(w, h, y0, y1, radius, strength, inset=0):
+    """Rows y0..y1 of the fast vignette layer, or None where they are fully transparent"""
+    mask = _fast_vignette_mask(w, h, radius, strength, inset, (y0, y1))
+    if mask is None:
+        return None
+    vig_img = Image.new("RGBA", (w, y1 - y0), (0, 0, 0, 0))
+    vig_img.putalpha(mask)
+    return vig_img
+
+
+def grain_noise(w, y0, y1, seed):
+    """Rows y0..y1 of the uniform uint8 noise field behind the grain layer"""
+    first, last = y0 // GRAIN_BLOCK_ROWS, (y1 - 1) // GRAIN_BLOCK_ROWS
+    blocks = [np.random.default_rng((seed, block)).integers(0, 256, (GRAIN_BLOCK_ROWS, w), dtype=np.uint8)
+              for block in range(first, last + 1)]
+    noise = blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+    offset = first * GRAIN_BLOCK_ROWS
+    return noise[y0 - offset:y1 - offset]
+
+
+def grain_tile(blur, alpha, size=GRAIN_TILE):
+    """Blurred noise at alpha that repeats seamlessly, as a cached (size, size, 4) array
+
+    The noise is padded by wrapping before the blur, so the edges blur into
+    the opposite edges exactly as the interior does.
+    """
+    def build():
+        noise = np.random.default_rng(GRAIN_TILE_SEED).integers(0, 256, (size, size), dtype=np.uint8)
+        halo = blur_halo(blur)
+        padded = Image.fromarray(np.pad(noise, halo, mode="wrap"), "L").filter(ImageFilter.GaussianBlur(blur))
+        tile = padded.crop((halo, halo, halo + size, halo + size)).convert("RGBA")
+        tile.putalpha(alpha)
+        return tile
+    return LAYERS.get("grain-tile", (blur, alpha, size, GRAIN_TILE_SEED), build)
+
+
+def _wrap_blit(tile, out, ox, oy):
+    """Fill out with tile repeated, starting at (ox, oy) in it, one slice copy per tile piece"""
+    size = len(tile)
+    h, w = out.shape[:2]
+    y = 0
+    while y < h:
+        ty = (y + oy) % size
+        n = min(size - ty, h - y)
+        x = 0
+        while x < w:
+            tx = (x + ox) % size
+            m = min(size - tx, w - x)
+            out[y:y + n, x:x + m] = tile[ty:ty + n, tx:tx + m]
+            x += m
+        y += n
+
+
+def grain_offset(seed, size=GRAIN_TILE):
+    """(x, y) in the grain tile where a frame with this seed starts"""
+    x, y = np.random.default_rng(seed).integers(0, size, 2)
+    return int(x), int(y)
+
+
+def grain_rows(w, h, y0, y1, blur, alpha, seed, texture=None):
+    """Rows y0..y1 of grain_layer(w, h, blur, alpha, seed)"""
+    if (texture or GRAIN_TEXTURE) == "tile":
+        tile = grain_tile(blur, alpha)
+        ox, oy = grain_offset(seed, len(tile))
+        out = np.empty((y1 - y0, w, 4), dtype=np.uint8)
+        _wrap_blit(tile, out, ox, y0 + oy)
+        return Image.fromarray(out, "RGBA")
+    # Full-frame noise, blurring only a halo around the rows
+    halo = blur_halo(blur)
+    top, bottom = max(y0 - halo, 0), min(y1 + halo, h)
+    noise_img = Image.fromarray(grain_noise(w, top, bottom, seed), "L").filter(ImageFilter.GaussianBlur(blur))
+    noise_img = noise_img.crop((0, y0 - top, w, y1 - top)).convert("RGBA")
+    noise_img.putalpha(alpha)
+    return noise_img
+
+
+def grain_layer(w, h, blur, alpha, seed=None, texture=None):
+    """Blurred monochrome noise at a fixed low alpha"""
+    if seed is None:
+        seed = random_seed()
+    return grain_rows(w, h, 0, h, blur, alpha, seed, texture)
+
+
+def random_seed():
+    """Fresh grain seed for unseeded renders"""
+    return int(np.random.SeedSequence().entropy)
+
+
+def cached_vignette(w, h, radius, strength, inset=0, quality=None):
+    quality = quality or VIGNETTE_QUALITY
+    return LAYERS.image("vignette", (w, h, radius, strength, inset, quality),
+                        lambda: vignette_layer(w, h, radius, strength, inset, quality))
+
+
+def cached_grain(w, h, blur, alpha, seed=None):
+    """Grain layer; only seeded field grain is worth caching whole, tiled grain is cut from a cached tile"""
+    if seed is None or GRAIN_TEXTURE == "tile":
+        return grain_layer(w, h, blur, alpha, seed)
+    return LAYERS.image("grain", (w, h, blur, alpha, seed), lambda: grain_layer(w, h, blur, alpha, seed))
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Procedural line patterns, computed with NumPy instead of one draw call per line
+A family of parallel lines is a 1-D function of the distance along the
+lines' normal: each line is a spike at its offset with its own alpha,
+widened by the line width and the pixel footprint and softened by an
+optional blur. That profile is built once by convolution and every pixel
+looks its value up, so a pattern costs a few array passes however many
+lines it has, and a blurred pattern needs no image blur afterwards.
+(Aliased 1px lines stay with ImageDraw.line: a few dozen C calls are cheaper
+than any full-canvas mask.)
+
+- lines_alpha: a family of lines, anti-aliased, per-line alpha, optionally blurred
+- repeating_stripes: a CSS repeating-linear-gradient with one hard-edged stripe,
+  such as the landing page's storm lines (STORM)
+
+    python banner_pattern.py storm.png --size 1200x630
+"""
+
+import argparse
+import math
+
+from PIL import Image
+import numpy as np
+
+# Profile samples per pixel of distance
+OVERSAMPLE = 8
+
+# dragon_page.DRAGON_TEMPLATE's .storm background at background-position 0 0
+STORM = {"angle": 20, "period": 27, "start": 25, "end": 27, "color": (0, 255, 127, 0.05)}
+
+
+def _family(start, stop, step, run, top, bottom):
+    """Unit normal (nx, ny) of lines (i, top)-(i + run, bottom), i in range(start, stop, step), and their offsets along it"""
+    dy = bottom - top
+    if dy <= 0:
+        raise ValueError("lines must run downwards (bottom > top)")
+    length = math.hypot(run, dy)
+    nx, ny = dy / length, -run / length
+    starts = np.arange(start, stop, step, dtype=np.float64)
+    return (nx, ny), starts * nx + top * ny
+
+
+def _kernel(width, blur):
+    """Profile of one line across its normal: its width, a pixel, then the blur (all at OVERSAMPLE)"""
+    def box(size):
+        # How much of each sample's interval the box covers, so the box sums to size * OVERSAMPLE
+        half = size * OVERSAMPLE / 2
+        j = np.arange(-math.ceil(half), math.ceil(half) + 1)
+        return np.clip(half - np.abs(j) + 0.5, 0, 1)
+
+    kernel = np.convolve(box(width), box(1.0) / OVERSAMPLE)
+    if blur:
+        sigma = blur * OVERSAMPLE
+        x = np.arange(-math.ceil(3 * sigma), math.ceil(3 * sigma) + 1)
+        gauss = np.exp(-x * x / (2 * sigma * sigma))
+        kernel = np.convolve(kernel, gauss / gauss.sum())
+    return kernel
+
+
+def stripe_field(w, h, normal, offsets, alphas, width=1.0, blur=0.0, origin=(0, 0)):
+    """Alpha (float32, h x w) of infinite lines at offsets along normal, each with its alpha
+
+    Pixel (x, y) of the result samples point (x + origin[0], y + origin[1]).
+    """
+    nx, ny = normal
+    xs = np.arange(w, dtype=np.float64) + origin[0]
+    ys = np.arange(h, dtype=np.float64) + origin[1]
+    corners = [x * nx + y * ny for x in (xs[0], xs[-1]) for y in (ys[0], ys[-1])]
+    kernel = _kernel(width, blur)
+    half = (len(kernel) // 2) / OVERSAMPLE
+    t0, t1 = min(corners) - half - 1, max(corners) + half + 1
+
+    comb = np.zeros(int(math.ceil((t1 - t0) * OVERSAMPLE)) + 1)
+    spikes = np.round((np.asarray(offsets) - t0) * OVERSAMPLE).astype(np.int64)
+    keep = (spikes >= 0) & (spikes < len(comb))
+    np.add.at(comb, spikes[keep], np.broadcast_to(alphas, spikes.shape)[keep])
+    profile = np.convolve(comb, kernel, mode="same").astype(np.float32)
+
+    t = (xs * (nx * OVERSAMPLE)).astype(np.float32)[None, :] + \
+        ((ys * ny - t0) * OVERSAMPLE + 0.5).astype(np.float32)[:, None]
+    return profile[t.astype(np.int64)]
+
+
+def lines_alpha(w, h, start, stop, step, run, top, bottom, alphas, width=1.0, blur=0.0, origin=(0, 0)):
+    """Alpha (float32, 0..255) of lines (i, top)-(i + run, bottom), i in range(start, stop, step)
+
+    alphas is one value per line (or one for all). The line ends are cut at
+    rows top and bottom, and softened like the lines themselves when blur is set.
+    """
+    normal, offsets = _family(start, stop, step, run, top, bottom)
+    field = stripe_field(w, h, normal, offsets, alphas, width, blur, origin)
+    ys = np.arange(h) + origin[1]
+    if blur:
+        scale = blur * math.sqrt(2)
+        rows = [0.5 * (math.erf((y - top + 0.5) / scale) - math.erf((y - bottom - 0.5) / scale)) for y in ys]
+        field *= np.array(rows, dtype=np.float32)[:, None]
+    else:
+        field[(ys < top) | (ys > bottom)] = 0
+    return field
+
+
+def repeating_stripes(w, h, angle, period, start, end, color, offset=(0, 0)):
+    """RGBA image of repeating-linear-gradient(angle deg, transparent start px, color start px end px, transparent end px)
+
+    color is (r, g, b, a) with a from 0 to 1 as in CSS, and offset is the
+    background-position (taken as shifting endless stripes, without the seam
+    where the browser repeats the background). Stripe edges are anti-aliased.
+    """
+    a = math.radians(angle)
+    nx, ny = math.sin(a), -math.cos(a)
+    length = abs(w * nx) + abs(h * ny)
+    # CSS measures the stripes from the gradient line's start, half its length before the centre
+    base = (offset[0] + w / 2) * nx + (offset[1] + h / 2) * ny - length / 2 + (start + end) / 2
+    centre = w / 2 * nx + h / 2 * ny
+    first = math.floor((centre - length / 2 - base) / period) - 1
+    last = math.ceil((centre + length / 2 - base) / period) + 1
+    offsets = base + period * np.arange(first, last + 1)
+    # CSS samples pixel centres
+    field = stripe_field(w, h, (nx, ny), offsets, color[3] * 255, end - start, origin=(0.5, 0.5))
+    img = Image.new("RGBA", (w, h), tuple(color[:3]) + (0,))
+    img.putalpha(Image.fromarray((np.clip(field, 0, 255) + 0.5).astype(np.uint8), "L"))
+    return img
+
+
+def storm_layer(w, h, offset=(0, 0)):
+    """The landing page's storm lines as a static image, for fallbacks without CSS"""
+    return repeating_stripes(w, h, offset=offset, **STORM)
+
+
+def main():
+    from banner_encode import format_report, save_image
+
+    parser = argparse.ArgumentParser(description="Render the landing page's storm lines to a PNG")
+    parser.add_argument("out")
+    parser.add_argument("--size", default="1200x630", help="WIDTHxHEIGHT")
+    parser.add_argument("--offset", default="0,0", help="background-position X,Y (the animation runs 0,0 to 40,80)")
+    args = parser.parse_args()
+    w, h = map(int, args.size.split("x"))
+    reports = save_image(storm_layer(w, h, tuple(map(float, args.offset.split(",")))), args.out)
+    print(f"✅ Generated: {args.out}")
+    print(format_report(reports))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Per-stage profiling for the banner renderers
+Wrap a step in `with stage("grain"):` and, while profiling is on, its wall
+time, CPU time, peak RSS growth and allocated bytes are recorded. Nested
+stages are recorded on their own and inside their parent. Profiling is off
+unless BANNER_PROFILE is set (or a script's --profile flag is given); when
+off, stage() returns a shared no-op context.
+
+BANNER_PROFILE=1 prints the summary table at exit; BANNER_PROFILE=trace.json
+also writes Chrome trace events (chrome://tracing, Perfetto) to that file.
+Allocated bytes are what tracemalloc sees (Python objects and numpy
+buffers); Pillow's image memory only shows up in RSS. tracemalloc's peak is
+process-wide, so stages that overlap stages on other threads (layers drawn
+on banner_scene's thread pool) report no allocation. While profiling,
+banner_batch runs its jobs in this process so every stage is recorded.
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_OFF = contextlib.nullcontext()
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "args", "start", "cpu", "rss", "traced", "inner_peak", "epoch", "shared")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.epoch, self.shared = self.profiler._open(stack)
+        traced, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1].inner_peak = max(stack[-1].inner_peak, peak)
+        tracemalloc.reset_peak()
+        stack.append(self)
+        self.traced, self.inner_peak = traced, 0
+        self.rss = _peak_rss_bytes()
+        self.cpu = time.process_time_ns()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        cpu = time.process_time_ns()
+        rss = _peak_rss_bytes()
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self.inner_peak)
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].inner_peak = max(stack[-1].inner_peak, peak)
+        tracemalloc.reset_peak()
+        shared = self.profiler._close(stack, self.epoch) or self.shared
+        self.profiler._record({
+            "name": self.name,
+            "start_ns": self.start,
+            "wall_ns": end - self.start,
+            "cpu_ns": cpu - self.cpu,
+            "rss_delta": None if rss is None else rss - self.rss,
+            "allocated": None if shared else max(peak - self.traced, 0),
+            "tid": threading.get_ident(),
+            "args": self.args,
+        })
+        return False
+
+
+class Profiler:
+    """Records one event per finished stage while enabled"""
+
+    def __init__(self, enabled=False):
+        self.enabled = False
+        self.events = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Threads inside a stage, and a count of the times a second one entered
+        self._threads = 0
+        self._epoch = 0
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        tracemalloc.stop()
+
+    def stage(self, name, **args):
+        """Context manager timing the named stage; args are kept in the trace"""
+        if not self.enabled:
+            return _OFF
+        return _Stage(self, name, args)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _open(self, stack):
+        """Note a stage starting on this thread: (epoch, whether another thread is inside a stage)"""
+        with self._lock:
+            if not stack:
+                self._threads += 1
+                if self._threads > 1:
+                    self._epoch += 1
+            return self._epoch, self._threads > 1
+
+    def _close(self, stack, epoch):
+        """Note a stage ending on this thread; True if another thread entered a stage since epoch"""
+        with self._lock:
+            shared = self._epoch != epoch or self._threads > 1
+            if not stack:
+                self._threads -= 1
+            return shared
+
+    def _record(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def summary(self):
+        """Per stage name: calls, total wall and CPU seconds, largest RSS growth and allocation"""
+        rows = {}
+        with self._lock:
+            events = list(self.events)
+        for e in events:
+            row = rows.setdefault(e["name"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                              "rss_delta": None, "allocated": None})
+            row["calls"] += 1
+            row["wall_s"] += e["wall_ns"] / 1e9
+            row["cpu_s"] += e["cpu_ns"] / 1e9
+            if e["rss_delta"] is not None:
+                row["rss_delta"] = max(row["rss_delta"] or 0, e["rss_delta"])
+            if e["allocated"] is not None:
+                row["allocated"] = max(row["allocated"] or 0, e["allocated"])
+        return rows
+
+    def format_summary(self):
+        lines = [f"  {'stage':<18} {'calls':>5} {'wall ms':>9} {'cpu ms':>9} {'peak RSS +':>11} {'allocated':>11}"]
+        for name, row in sorted(self.summary().items(), key=lambda item: -item[1]["wall_s"]):
+            rss = "n/a" if row["rss_delta"] is None else f"{row['rss_delta'] / 2**20:.1f} MiB"
+            allocated = "n/a" if row["allocated"] is None else f"{row['allocated'] / 2**20:.1f} MiB"
+            lines.append(f"  {name:<18} {row['calls']:>5} {row['wall_s'] * 1000:>9.1f} {row['cpu_s'] * 1000:>9.1f} "
+                         f"{rss:>11} {allocated:>11}")
+        return "\n".join(lines)
+
+    def trace_events(self):
+        """The events in Chrome trace-event format (complete events, microseconds)"""
+        with self._lock:
+            events = list(self.events)
+        origin = min((e["start_ns"] for e in events), default=0)
+        return [{
+            "name": e["name"],
+            "cat": "banner",
+            "ph": "X",
+            "ts": (e["start_ns"] - origin) / 1000,
+            "dur": e["wall_ns"] / 1000,
+            "pid": os.getpid(),
+            "tid": e["tid"],
+            "args": dict(e["args"], cpu_ms=e["cpu_ns"] / 1e6, rss_delta=e["rss_delta"], allocated=e["allocated"]),
+        } for e in events]
+
+    def write_trace(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f, default=str)
+
+    def report(self, trace_path=None):
+        """Print the summary table, and write the trace if trace_path is given"""
+        if not self.events:
+            return
+        print("⏱️  Banner stages", file=sys.stderr)
+        print(self.format_summary(), file=sys.stderr)
+        if trace_path:
+            self.write_trace(trace_path)
+            print(f"📈 Trace written to {trace_path}", file=sys.stderr)
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+
+
+PROFILER = Profiler()
+
+
+def stage(name, **args):
+    """PROFILER.stage(name, **args)"""
+    return PROFILER.stage(name, **args)
+
+
+_exit_trace = []
+
+
+def enable(target):
+    """Profile from now on and report at exit; target is "1" for the summary only, else a trace path"""
+    PROFILER.enable()
+    if not _exit_trace:
+        atexit.register(lambda: PROFILER.report(_exit_trace[-1]))
+    _exit_trace.append(None if target in ("1", "true", "yes") else target)
+
+
+if os.environ.get("BANNER_PROFILE"):
+    enable(os.environ["BANNER_PROFILE"])
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Responsive image sets for the banners
+One image (a file, or a banner rendered once at a large size) becomes the
+srcset widths and the per-platform OG sizes. Sizes come from a downscale
+pyramid: the image is halved with Lanczos while the half still covers a
+requested size, and each size is cropped and resampled from the smallest
+level that covers it, so small sizes never resample the full resolution.
+A JSON manifest lists every file with its size, bytes and sha256 for the
+Next.js front end. Sets whose inputs are unchanged are skipped (see
+banner_build); --force rebuilds them.
+
+The hand-laid-out banners (generate_banners.py's 1200x600 slim banner,
+the translucent 1200x630) are still rendered for their size; a responsive
+set crops one layout to every aspect ratio.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+import banner_build
+import banner_encode
+
+# srcset widths, at the source aspect ratio
+SRCSET_WIDTHS = (1920, 1280, 960, 640, 480, 320)
+
+# name -> (width, height) cropped to fill
+OG_SIZES = {
+    "og": (1200, 630),
+    "og-slim": (1200, 600),
+    "linkedin": (1200, 627),
+    "square": (1080, 1080),
+    "thumb": (600, 315),
+    "thumb-small": (300, 158),
+}
+
+# Render size when the set is made from a banner rather than a file
+RENDER_SIZE = (2400, 1260)
+
+CODE = ("banner_responsive.py", "banner_encode.py", "png_stream.py")
+
+
+class Pyramid:
+    """Halvings of an image, made on demand and kept for the next size"""
+
+    def __init__(self, img):
+        self.levels = [img]
+
+    def level_for(self, width, height):
+        """Smallest level at least width x height, or None if even the source is smaller"""
+        if self.levels[0].width < width or self.levels[0].height < height:
+            return None
+        while True:
+            last = self.levels[-1]
+            half = (last.width // 2, last.height // 2)
+            if half[0] < width or half[1] < height:
+                break
+            self.levels.append(last.resize(half, Image.Resampling.LANCZOS))
+        return next(level for level in reversed(self.levels)
+                    if level.width >= width and level.height >= height)
+
+    def fill(self, width, height):
+        """width x height cropped around the centre to fill, from the nearest larger level; None if too small"""
+        source = self.levels[0]
+        level = self.level_for(width, height)
+        if level is None:
+            return None
+        # The centred crop in source coordinates, scaled to the level
+        scale = min(source.width / width, source.height / height)
+        crop_w, crop_h = width * scale, height * scale
+        left, top = (source.width - crop_w) / 2, (source.height - crop_h) / 2
+        sx, sy = level.width / source.width, level.height / source.height
+        box = (left * sx, top * sy, (left + crop_w) * sx, (top + crop_h) * sy)
+        return level.resize((width, height), Image.Resampling.LANCZOS, box=box)
+
+
+def set_sizes(source_size, widths=SRCSET_WIDTHS, og_sizes=OG_SIZES):
+    """(name, width, height) for every size the source covers without upscaling"""
+    w, h = source_size
+    sizes = [(f"w{width}", width, round(h * width / w)) for width in widths if width <= w]
+    sizes += [(name, width, height) for name, (width, height) in og_sizes.items() if width <= w and height <= h]
+    return sizes
+
+
+def build_set(img, out_dir, stem, preset=None, formats=(), public_dir="public", workers=None):
+    """Write every size of img as <out_dir>/<stem>-<w>x<h>.png; returns the manifest entries
+
+    Resampling runs in order down the pyramid; encoding is fanned out to threads.
+    """
+    img = img.convert("RGBA") if img.mode not in ("RGB", "RGBA") else img
+    pyramid = Pyramid(img)
+    planned = []
+    for name, width, height in set_sizes(img.size):
+        path = os.path.join(out_dir, f"{stem}-{width}x{height}.png")
+        planned.append((name, path, pyramid.fill(width, height)))
+
+    def save(job):
+        name, path, resized = job
+        return name, resized.size, banner_encode.save_image(resized, path, preset, formats, workers=1)
+
+    with ThreadPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(planned) or 1)) as pool:
+        saved = list(pool.map(save, planned))
+
+    entries = []
+    for name, (width, height), reports in saved:
+        files = [{"format": r["format"], "src": public_url(r["path"], public_dir), "path": r["path"],
+                  "bytes": r["bytes"], "sha256": banner_build.file_hash(r["path"])}
+                 for r in reports if r["bytes"] is not None]
+        entries.append({"name": name, "width": width, "height": height, **files[0],
+                        "siblings": files[1:]})
+    return entries
+
+
+def public_url(path, public_dir="public"):
+    """URL a file under public_dir is served at; other paths are returned as they are"""
+    rel = os.path.relpath(path, public_dir)
+    if rel.startswith(os.pardir):
+        return path
+    return "/" + rel.replace(os.sep, "/")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a responsive image set and its manifest")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--source", help="image file to build the set from")
+    source.add_argument("--variant", choices=("dark", "light"), help="render this banner once and build from it")
+    parser.add_argument("--render-size", default="x".join(map(str, RENDER_SIZE)),
+                        help="banner render size for --variant (default: %(default)s)")
+    parser.add_argument("--out-dir", default=os.path.join("public", "responsive"))
+    parser.add_argument("--public-dir", default="public", help="directory the front end serves at /")
+    parser.add_argument("--stem", help="file name prefix (default: source name or og-dragon-<variant>)")
+    parser.add_argument("--preset", choices=sorted(banner_encode.PRESETS),
+                        help=f"PNG encoder preset (default: {banner_encode.DEFAULT_PRESET})")
+    parser.add_argument("--formats", default="", help="comma-separated siblings to write: "
+                        + ",".join(banner_encode.SIBLINGS))
+    parser.add_argument("--force", action="store_true", help="rebuild the set, even if up to date")
+    args = parser.parse_args()
+
+    formats = [fmt for fmt in args.formats.split(",") if fmt]
+    unknown = set(formats) - set(banner_encode.SIBLINGS)
+    if unknown:
+        parser.error(f"unknown format: {', '.join(sorted(unknown))}")
+    stem = args.stem or (os.path.splitext(os.path.basename(args.source))[0] if args.source
+                         else f"og-dragon-{args.variant}")
+    manifest_path = os.path.join(args.out_dir, f"{stem}.json")
+
+    params = {"widths": list(SRCSET_WIDTHS), "og_sizes": OG_SIZES, "stem": stem,
+              "preset": args.preset or banner_encode.DEFAULT_PRESET, "formats": formats}
+    if args.source:
+        inputs = banner_build.target_inputs(params, CODE, sources=[args.source])
+    else:
+        import banner_layers
+        import generate_banners
+        params.update(variant=args.variant, render_size=args.render_size, **banner_layers.render_settings())
+        font = generate_banners.find_font_path()
+        inputs = banner_build.target_inputs(params, CODE + banner_build.BANNER_CODE,
+                                            fonts=[font] if font else [])
+    build = banner_build.BuildManifest(force=args.force)
+    reasons = build.reasons(manifest_path, inputs)
+    print(banner_build.format_reasons(manifest_path, reasons))
+    if not reasons:
+        return
+
+    start = time.perf_counter()
+    if args.source:
+        img = Image.open(args.source)
+        img.load()
+    else:
+        width, height = map(int, args.render_size.lower().split("x"))
+        img = generate_banners.render_banner(width, height, args.variant, seed=0)
+    entries = build_set(img, args.out_dir, stem, args.preset, formats, args.public_dir)
+    with open(manifest_path, "w") as f:
+        json.dump({"source": args.source or f"{args.variant} banner {args.render_size}",
+                   "width": img.width, "height": img.height, "images": entries}, f, indent=2)
+    build.record(manifest_path, inputs,
+                 [manifest_path] + [f["path"] for e in entries for f in [e] + e["siblings"]])
+    build.save()
+
+    for e in entries:
+        print(f"✅ {e['path']} ({e['name']}, {e['width']}x{e['height']}) {e['bytes']:,} bytes")
+    skipped = [name for name, _, _ in set_sizes((10 ** 9, 10 ** 9)) if name not in {e["name"] for e in entries}]
+    if skipped:
+        print(f"⏭️  {img.width}x{img.height} is too small for: {', '.join(skipped)}")
+    print(f"🎉 {len(entries)} images and {manifest_path} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
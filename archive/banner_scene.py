@@ -0,0 +1,814 @@
+#!/usr/bin/env python3
+"""
+Declarative banner scenes and the planner that renders them
+A scene file (JSON, or YAML when PyYAML is installed) lists layers back to
+front. Numbers in a layer may be expressions over the canvas size W, H and
+the scene's vars, e.g. "int(W * 0.78)". plan() resolves a scene for one
+size and variant and compiles it into a render plan:
+
+- every layer is drawn at its bounding box (plus blur halo), not full frame,
+  and blurred at the layer's "quality" (default banner_layers.BLUR_QUALITY)
+- transparent, empty and occluded layers are dropped, adjacent fills merged
+- layers that do not depend on the title or grain seed are cached in LAYERS
+  under a digest of their resolved spec, so a layer shared by several
+  scenes in a batch (the dragon glow of the dark and light banners) is
+  drawn once, and the leading run of such layers is flattened into one
+  cached base image that each render starts from
+
+render_rows() renders one band of rows of the same plan, for banner_tiled.
+
+    python banner_scene.py scenes/dragon.json out.png --variant light --explain
+"""
+
+import ast
+import functools
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFilter
+import numpy as np
+
+from banner_compositor import Compositor
+from banner_fonts import FONTS
+from banner_layers import (BLUR_QUALITY, LAYERS, blur_halo, blur_image, cached_grain, cached_vignette,
+                           create_dragon_silhouette, draw_dragon_silhouette, grain_rows, radial_overlay,
+                           vertical_gradient_rgba, vignette_rows)
+from banner_pattern import lines_alpha
+from banner_profile import stage
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+SCENES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenes")
+
+# Threads drawing one render's layers while they are composited in order; 1 draws them in turn
+LAYER_THREADS = int(os.environ.get("BANNER_LAYER_THREADS", "1"))
+
+# Functions scene expressions may call
+FUNCTIONS = {"int": int, "min": min, "max": max, "abs": abs, "round": round}
+_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp, ast.Call, ast.Name,
+          ast.Load, ast.Constant, ast.List, ast.Tuple, ast.operator, ast.unaryop, ast.boolop, ast.cmpop)
+
+# Layer fields that are taken as written rather than evaluated
+LITERAL_FIELDS = {"kind", "name", "blend", "text", "if", "quality"}
+
+
+class SceneError(ValueError):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def compile_expression(source):
+    """Compile an arithmetic expression over scene variables"""
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise SceneError(f"Bad expression {source!r}: {e.msg}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _NODES):
+            raise SceneError(f"Bad expression {source!r}: {type(node).__name__} is not allowed")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS):
+            raise SceneError(f"Bad expression {source!r}: only {', '.join(FUNCTIONS)} may be called")
+    return compile(tree, source, "eval")
+
+
+def resolve(value, env):
+    """Evaluate the expressions in a JSON value (strings, inside lists and dicts too)"""
+    if isinstance(value, str):
+        try:
+            return eval(compile_expression(value), {"__builtins__": {}, **FUNCTIONS}, env)
+        except NameError as e:
+            raise SceneError(f"Bad expression {value!r}: {e}") from None
+    if isinstance(value, list):
+        return [resolve(item, env) for item in value]
+    if isinstance(value, dict):
+        return {key: item if key in LITERAL_FIELDS else resolve(item, env) for key, item in value.items()}
+    return value
+
+
+class Scene:
+    """A parsed scene file"""
+
+    def __init__(self, data, path=None):
+        self.path = path
+        self.name = data.get("name") or os.path.splitext(os.path.basename(path or "scene"))[0]
+        self.size = tuple(data.get("size", (1200, 630)))
+        self.title = data.get("title", "")
+        self.fonts = list(data.get("fonts", ()))
+        self.variants = data.get("variants", {})
+        self.default_variant = data.get("default_variant") or next(iter(self.variants), None)
+        self.vars = data.get("vars", {})
+        self.layers = data["layers"]
+        for i, layer in enumerate(self.layers):
+            if layer.get("kind") not in KINDS:
+                raise SceneError(f"{self.name}: layer {i} has unknown kind {layer.get('kind')!r}")
+            if layer.get("blend", "over") not in ("over", "draw"):
+                raise SceneError(f"{self.name}: layer {i} has unknown blend {layer['blend']!r}")
+        self.digest = hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def env(self, W, H, variant=None):
+        """Variables for one size and variant: W, H, the variant's values, then the scene vars in order"""
+        variant = variant or self.default_variant
+        if self.variants and variant not in self.variants:
+            raise SceneError(f"{self.name} has no variant {variant!r} (has {', '.join(self.variants)})")
+        env = {"W": W, "H": H}
+        for name, value in self.variants.get(variant, {}).items():
+            env[name] = resolve(value, env)
+        for name, value in self.vars.items():
+            env[name] = resolve(value, env)
+        return env
+
+
+_scenes = {}
+
+
+def load_scene(path):
+    """Parse a scene file once per modification time; bare names are looked up in scenes/"""
+    if not os.path.exists(path) and not os.path.dirname(path):
+        for ext in (".json", ".yaml", ".yml"):
+            if os.path.exists(os.path.join(SCENES_DIR, path + ext)):
+                path = os.path.join(SCENES_DIR, path + ext)
+                break
+    mtime = os.stat(path).st_mtime_ns
+    cached = _scenes.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise SceneError(f"{path} is YAML but PyYAML is not installed: pip install pyyaml")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    scene = Scene(data, path)
+    _scenes[path] = (mtime, scene)
+    return scene
+
+
+# --- layer kinds -------------------------------------------------------------
+# Each kind gives the bounding box a layer touches on a W x H canvas and draws
+# it, either into a transparent image of that box ("over") or straight onto
+# the canvas ("draw", replacing pixels as ImageDraw does). Kinds with
+# draws_rows can also draw just some rows of their box, for strip renders.
+
+def _full(W, H):
+    return (0, 0, W, H)
+
+
+def _rect(box):
+    x, y, w, h = box
+    return (x, y, x + w, y + h)
+
+
+def _blur(img, spec):
+    return blur_image(img, spec["blur"], spec["quality"]) if spec.get("blur") else img
+
+
+class Kind:
+    dynamic = False
+    full_frame_only = False
+    # blur is applied to the drawn image with blur_image, at the layer's quality
+    pyramid_blur = False
+    # rows() draws part of the box; other kinds are drawn whole and cut for strips
+    draws_rows = False
+
+    def bbox(self, spec, W, H):
+        return _full(W, H)
+
+    def transparent(self, spec):
+        return False
+
+    def image(self, spec, box, W, H):
+        raise NotImplementedError
+
+    def rows(self, spec, box, W, H, y0, y1, seed=None):
+        """Rows y0..y1 of image() (within box), or None where they are fully transparent"""
+        raise NotImplementedError
+
+    def paint(self, spec, draw, oy=0):
+        """Draw onto the canvas; a canvas holding rows from oy down is drawn shifted up by oy"""
+        raise SceneError(f"{type(self).__name__} layers cannot use blend 'draw'")
+
+
+class Fill(Kind):
+    draws_rows = True
+
+    def bbox(self, spec, W, H):
+        return _rect(spec["box"]) if "box" in spec else _full(W, H)
+
+    def transparent(self, spec):
+        return spec["color"][3] == 0
+
+    def image(self, spec, box, W, H):
+        return Image.new("RGBA", (box[2] - box[0], box[3] - box[1]), tuple(spec["color"]))
+
+    def rows(self, spec, box, W, H, y0, y1, seed=None):
+        return self.image(spec, (box[0], y0, box[2], y1), W, H)
+
+    def paint(self, spec, draw, oy=0):
+        w, h = draw.im.size
+        x0, y0, x1, y1 = _rect(spec["box"]) if "box" in spec else (0, oy, w, oy + h)
+        draw.rectangle((x0, y0 - oy, x1 - 1, y1 - 1 - oy), fill=tuple(spec["color"]))
+
+
+class Gradient(Kind):
+    """Vertical gradient over box (default full frame), with rounded corners if radius is set"""
+
+    draws_rows = True
+
+    def bbox(self, spec, W, H):
+        return _rect(spec["box"]) if "box" in spec else _full(W, H)
+
+    def image(self, spec, box, W, H):
+        x, y, w, h = spec.get("box", (0, 0, W, H))
+        img = vertical_gradient_rgba(w, h, tuple(spec["top"]), tuple(spec["bottom"]))
+        if spec.get("radius"):
+            mask = Image.new("L", (w, h), 0)
+            ImageDraw.Draw(mask).rounded_rectangle((0, 0, w, h), radius=spec["radius"], fill=255)
+            img = Image.composite(img, Image.new("RGBA", (w, h), (0, 0, 0, 0)), mask)
+        return img.crop((box[0] - x, box[1] - y, box[2] - x, box[3] - y)) if box != (x, y, x + w, y + h) else img
+
+    def rows(self, spec, box, W, H, y0, y1, seed=None):
+        if "box" in spec or spec.get("radius"):
+            return self.image(spec, box, W, H).crop((0, y0 - box[1], box[2] - box[0], y1 - box[1]))
+        return vertical_gradient_rgba(W, H, tuple(spec["top"]), tuple(spec["bottom"]), (y0, y1))
+
+
+class Radial(Kind):
+    """Radial glow centred at center, fading out over 0.9 of the canvas size"""
+
+    draws_rows = True
+
+    def bbox(self, spec, W, H):
+        cx, cy = spec["center"]
+        return (0, max(int(cy - 0.9 * H), 0), W, min(int(cy + 0.9 * H) + 1, H))
+
+    def transparent(self, spec):
+        return spec.get("alpha", 0.45) * 255 < 1
+
+    def image(self, spec, box, W, H):
+        return self.rows(spec, box, W, H, box[1], box[3])
+
+    def rows(self, spec, box, W, H, y0, y1, seed=None):
+        return radial_overlay(W, H, tuple(spec["center"]), tuple(spec.get("color", (70, 160, 120))),
+                              spec.get("power", 2.1), spec.get("alpha", 0.45), rows=(y0, y1))
+
+
+class Lines(Kind):
+    """One line per i in range(*range); from, to and color may use i"""
+
+    pyramid_blur = True
+
+    def segments(self, spec, env):
+        segments = []
+        for i in range(*spec["range"]):
+            line_env = dict(env, i=i)
+            segments.append((tuple(resolve(spec["from"], line_env)), tuple(resolve(spec["to"], line_env)),
+                             tuple(resolve(spec["color"], line_env))))
+        return segments
+
+    def bbox(self, spec, W, H):
+        points = [p for start, end, _ in spec["segments"] for p in (start, end)]
+        pad = spec.get("width", 1) + (blur_halo(spec["blur"]) if spec.get("blur") else 0)
+        return (min(x for x, _ in points) - pad, min(y for _, y in points) - pad,
+                max(x for x, _ in points) + pad + 1, max(y for _, y in points) + pad + 1)
+
+    def transparent(self, spec):
+        return all(color[3] == 0 for _, _, color in spec["segments"])
+
+    def _draw(self, spec, draw, ox=0, oy=0):
+        for (x0, y0), (x1, y1), color in spec["segments"]:
+            draw.line([(x0 - ox, y0 - oy), (x1 - ox, y1 - oy)], fill=color, width=spec.get("width", 1))
+
+    def image(self, spec, box, W, H):
+        img = Image.new("RGBA", (box[2] - box[0], box[3] - box[1]), (0, 0, 0, 0))
+        self._draw(spec, ImageDraw.Draw(img), box[0], box[1])
+        return _blur(img, spec)
+
+    def paint(self, spec, draw, oy=0):
+        self._draw(spec, draw, 0, oy)
+
+
+class Stripes(Kind):
+    """Evenly spaced parallel lines, written like "lines" but drawn in one NumPy pass (banner_pattern)
+
+    Every line must be the first one shifted by the range step along x, and
+    only the alpha of color may change from line to line. Lines are
+    anti-aliased, and blur is part of the pattern rather than a blur of the
+    drawn image, though it darkens the colour the way that blur would.
+    Aliased lines drawn with blend 'draw' stay "lines".
+    """
+
+    def family(self, segments):
+        if not segments:
+            return {"range": [0, 0, 1], "run": 0, "top": 0, "bottom": 1, "rgb": [0, 0, 0], "alphas": []}
+        ((x0, top), (x1, bottom), color) = segments[0]
+        step = segments[1][0][0] - x0 if len(segments) > 1 else 1
+        for k, ((fx, fy), (tx, ty), line_color) in enumerate(segments):
+            if (fx - k * step, fy, tx - k * step, ty) != (x0, top, x1, bottom) or line_color[:3] != color[:3]:
+                raise SceneError("Stripes layers need evenly spaced, parallel lines of one colour")
+        if step <= 0 or bottom <= top:
+            raise SceneError("Stripes layers need lines running down, listed left to right")
+        return {"range": [x0, x0 + len(segments) * step, step], "run": x1 - x0, "top": top, "bottom": bottom,
+                "rgb": list(color[:3]), "alphas": [line_color[3] for _, _, line_color in segments]}
+
+    def _lines(self, spec):
+        return (*spec["range"], spec["run"], spec["top"], spec["bottom"])
+
+    def bbox(self, spec, W, H):
+        start, stop, step, run, top, bottom = self._lines(spec)
+        last = start + (len(spec["alphas"]) - 1) * step
+        pad = spec.get("width", 1) + (blur_halo(spec["blur"]) if spec.get("blur") else 0)
+        return (min(start, start + run) - pad, top - pad, max(last, last + run) + pad + 1, bottom + pad + 1)
+
+    def transparent(self, spec):
+        return not any(spec["alphas"])
+
+    def image(self, spec, box, W, H):
+        w, h = box[2] - box[0], box[3] - box[1]
+
+        def field(alphas):
+            return lines_alpha(w, h, *self._lines(spec), alphas, spec.get("width", 1), spec.get("blur", 0),
+                               origin=box[:2])
+
+        rgba = np.empty((h, w, 4), dtype=np.float32)
+        rgba[..., 3] = field(np.array(spec["alphas"], dtype=np.float64))
+        if spec.get("blur"):
+            # Blurring drawn lines blurs their colour with the transparent black around them
+            rgba[..., :3] = field(1.0)[..., None] * np.array(spec["rgb"], dtype=np.float32)
+        else:
+            rgba[..., :3] = spec["rgb"]
+        return Image.fromarray((np.clip(rgba, 0, 255) + 0.5).astype(np.uint8), "RGBA")
+
+
+class Shapes(Kind):
+    """Ellipses, rectangles and rounded rectangles ([x0, y0, x1, y1], inclusive) drawn in order"""
+
+    pyramid_blur = True
+
+    SHAPES = ("ellipse", "rectangle", "rounded_rectangle")
+
+    def _shapes(self, spec):
+        for shape in spec["shapes"]:
+            kind = next(k for k in self.SHAPES if k in shape)
+            yield kind, shape[kind], shape
+
+    def bbox(self, spec, W, H):
+        boxes = [xy for _, xy, _ in self._shapes(spec)]
+        pad = blur_halo(spec["blur"]) if spec.get("blur") else 0
+        return (min(b[0] for b in boxes) - pad, min(b[1] for b in boxes) - pad,
+                max(b[2] for b in boxes) + pad + 1, max(b[3] for b in boxes) + pad + 1)
+
+    def transparent(self, spec):
+        return all(shape.get("fill", (0, 0, 0, 0))[3] == 0 for _, _, shape in self._shapes(spec))
+
+    def _draw(self, spec, draw, ox=0, oy=0):
+        for kind, (x0, y0, x1, y1), shape in self._shapes(spec):
+            options = {"radius": shape["radius"]} if kind == "rounded_rectangle" else {}
+            getattr(draw, kind)([x0 - ox, y0 - oy, x1 - ox, y1 - oy], fill=tuple(shape["fill"]), **options)
+
+    def image(self, spec, box, W, H):
+        img = Image.new("RGBA", (box[2] - box[0], box[3] - box[1]), (0, 0, 0, 0))
+        self._draw(spec, ImageDraw.Draw(img), box[0], box[1])
+        return _blur(img, spec)
+
+    def paint(self, spec, draw, oy=0):
+        self._draw(spec, draw, 0, oy)
+
+
+class Silhouette(Kind):
+    """The dragon silhouette scaled to box, blurred within it if blur is set"""
+
+    pyramid_blur = True
+    draws_rows = True
+
+    def bbox(self, spec, W, H):
+        return _rect(spec["box"])
+
+    def image(self, spec, box, W, H):
+        x, y, w, h = spec["box"]
+        dragon = _blur(create_dragon_silhouette(w, h), spec)
+        # Pasted through its own alpha, as the generators always placed it
+        img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+        img.paste(dragon, (0, 0), dragon)
+        return img.crop((box[0] - x, box[1] - y, box[2] - x, box[3] - y)) if box != (x, y, x + w, y + h) else img
+
+    def rows(self, spec, box, W, H, y0, y1, seed=None):
+        """Only the part of the silhouette the rows need is drawn
+
+        For a blurred layer that is the rows plus the blur's halo, clamped to
+        the silhouette's edges exactly where the whole-silhouette blur clamps.
+        The blur here is always the exact one: a pyramid blur would need rows
+        aligned to its downsampling factor.
+        """
+        x, y, w, h = spec["box"]
+        top, bottom = y0 - y, y1 - y
+        halo = blur_halo(spec["blur"]) if spec.get("blur") else 0
+        first, last = max(top - halo, 0), min(bottom + halo, h)
+        dragon = Image.new("RGBA", (w, last - first), (0, 0, 0, 0))
+        draw_dragon_silhouette(ImageDraw.Draw(dragon), w, h, offset=(0, -first))
+        if spec.get("blur"):
+            dragon = dragon.filter(ImageFilter.GaussianBlur(spec["blur"]))
+        dragon = dragon.crop((0, top - first, w, bottom - first))
+        img = Image.new("RGBA", dragon.size, (0, 0, 0, 0))
+        img.paste(dragon, (0, 0), dragon)
+        return img.crop((box[0] - x, 0, box[2] - x, img.height)) if (box[0], box[2]) != (x, x + w) else img
+
+
+class Pill(Kind):
+    """Rounded button with an outline and a highlight (shine, in pill coordinates) composited on top"""
+
+    def bbox(self, spec, W, H):
+        return _rect(spec["box"])
+
+    def transparent(self, spec):
+        return all(spec.get(key, (0, 0, 0, 0))[3] == 0 for key in ("fill", "outline", "shine_fill"))
+
+    def image(self, spec, box, W, H):
+        x, y, w, h = spec["box"]
+        pill = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+        ImageDraw.Draw(pill).rounded_rectangle((0, 0, w, h), radius=spec["radius"], fill=tuple(spec["fill"]),
+                                               outline=tuple(spec["outline"]), width=spec.get("outline_width", 1))
+        if "shine" in spec:
+            shine = Image.new("RGBA", (w, h), (255, 255, 255, 0))
+            ImageDraw.Draw(shine).rounded_rectangle(tuple(spec["shine"]), radius=spec["shine_radius"],
+                                                    fill=tuple(spec["shine_fill"]))
+            pill = Image.alpha_composite(pill, shine)
+        return pill.crop((box[0] - x, box[1] - y, box[2] - x, box[3] - y)) if box != (x, y, x + w, y + h) else pill
+
+
+class Text(Kind):
+    """Text at xy in the scene font; "{title}" in the text is the render's title"""
+
+    def bbox(self, spec, W, H):
+        if "{title}" in spec["text"]:
+            return (*spec["xy"], W, H)
+        return FONTS.textbbox(tuple(spec["xy"]), spec["text"], spec["font"])
+
+    def transparent(self, spec):
+        return spec["fill"][3] == 0
+
+
+class Vignette(Kind):
+    full_frame_only = True
+    draws_rows = True
+
+    def transparent(self, spec):
+        return spec["strength"] == 0
+
+    def image(self, spec, box, W, H):
+        return cached_vignette(W, H, spec["radius"], spec["strength"], spec.get("inset", 0))
+
+    def rows(self, spec, box, W, H, y0, y1, seed=None):
+        # Always the fast vignette, the only one that can be cut into rows
+        return vignette_rows(W, H, y0, y1, spec["radius"], spec["strength"], spec.get("inset", 0))
+
+
+class Grain(Kind):
+    dynamic = True
+    full_frame_only = True
+    draws_rows = True
+
+    def transparent(self, spec):
+        return spec["alpha"] == 0
+
+    def rows(self, spec, box, W, H, y0, y1, seed=None):
+        return grain_rows(W, H, y0, y1, spec["blur"], spec["alpha"], seed)
+
+
+KINDS = {
+    "fill": Fill(),
+    "gradient": Gradient(),
+    "radial": Radial(),
+    "lines": Lines(),
+    "stripes": Stripes(),
+    "shapes": Shapes(),
+    "silhouette": Silhouette(),
+    "pill": Pill(),
+    "text": Text(),
+    "vignette": Vignette(),
+    "grain": Grain(),
+}
+
+
+# --- planning ----------------------------------------------------------------
+
+class Step:
+    """One planned layer: its resolved spec, the canvas box it touches and, if static, its cache key"""
+
+    __slots__ = ("name", "kind", "spec", "box", "key")
+
+    def __init__(self, name, kind, spec, box, key):
+        self.name = name
+        self.kind = kind
+        self.spec = spec
+        self.box = box
+        self.key = key
+
+    @property
+    def blend(self):
+        return "draw" if self.kind == "text" else self.spec.get("blend", "over")
+
+    def layer(self, W, H):
+        """The layer image for this step's box, from LAYERS when it is static and smaller than the frame
+
+        Full-frame layers are only drawn into a base image, which is cached as a whole.
+        """
+        kind = KINDS[self.kind]
+        if self.key is None or kind.full_frame_only or self.box == _full(W, H):
+            return kind.image(self.spec, self.box, W, H)
+        return LAYERS.image("scene-layer", self.key, lambda: kind.image(self.spec, self.box, W, H))
+
+    @property
+    def composited(self):
+        """True if the step composites an image of its own, which can be drawn ahead of the canvas"""
+        return self.blend == "over"
+
+    def image(self, W, H, seed=None):
+        """The image a composited step lays over its box"""
+        if self.kind == "grain":
+            return cached_grain(W, H, self.spec["blur"], self.spec["alpha"], seed)
+        return self.layer(W, H)
+
+    def apply(self, canvas, W, H, title=None, seed=None, image=None):
+        """Draw the step onto canvas; image is its already drawn image, if any"""
+        if self.kind == "text":
+            text = self.spec["text"].format(title=title) if self.key is None else self.spec["text"]
+            canvas.text(tuple(self.spec["xy"]), text, self.spec["font"], tuple(self.spec["fill"]))
+        elif self.blend == "draw":
+            KINDS[self.kind].paint(self.spec, canvas.draw())
+        else:
+            canvas.over(self.image(W, H, seed) if image is None else image, dest=self.box[:2])
+
+    def apply_rows(self, canvas, W, H, y0, y1, title=None, seed=None):
+        """apply() for a canvas holding only rows y0..y1 of the frame"""
+        kind = KINDS[self.kind]
+        if self.kind == "text":
+            text = self.spec["text"].format(title=title) if self.key is None else self.spec["text"]
+            (x, y), font = self.spec["xy"], self.spec["font"]
+            bbox = FONTS.textbbox((x, y), text, font)
+            # Glyph masks are rendered whole, so skip rows the text does not reach
+            if bbox[1] < y1 and bbox[3] > y0:
+                canvas.text((x, y - y0), text, font, tuple(self.spec["fill"]))
+            return
+        if self.blend == "draw":
+            kind.paint(self.spec, canvas.draw(), y0)
+            return
+        top, bottom = max(self.box[1], y0), min(self.box[3], y1)
+        if top >= bottom:
+            return
+        if kind.draws_rows:
+            img = kind.rows(self.spec, self.box, W, H, top, bottom, seed)
+        else:
+            # Drawn whole (and cached when static), then cut to the rows
+            img = self.layer(W, H).crop((0, top - self.box[1], self.box[2] - self.box[0], bottom - self.box[1]))
+        if img is not None:
+            canvas.over(img, dest=(self.box[0], top - y0))
+
+
+@functools.lru_cache(maxsize=None)
+def _layer_pool(threads):
+    return ThreadPoolExecutor(max_workers=threads, thread_name_prefix="banner-layer")
+
+
+def _draw_layer(step, W, H, seed):
+    with stage(f"{step.name} layer"):
+        return step.image(W, H, seed)
+
+
+def _layer_images(steps, W, H, seed=None, threads=1):
+    """One callable per step giving the image it composites (None for steps drawn on the canvas)
+
+    Layer images depend on nothing but their spec; only compositing has an
+    order. With threads > 1 every image is started on the layer pool at
+    once, and each callable waits for its own, so the caller can composite
+    the first layers while later ones are still being drawn.
+    """
+    if threads <= 1 or sum(step.composited for step in steps) < 2:
+        return [functools.partial(step.image, W, H, seed) if step.composited else None for step in steps]
+    pool = _layer_pool(threads)
+    futures = [pool.submit(_draw_layer, step, W, H, seed) if step.composited else None for step in steps]
+    return [future.result if future is not None else None for future in futures]
+
+
+def _apply(steps, images, canvas, W, H, title=None, seed=None):
+    for step, image in zip(steps, images):
+        with stage(step.name):
+            step.apply(canvas, W, H, title, seed, image() if image is not None else None)
+
+
+def _digest(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:20]
+
+
+def _clip(box, W, H):
+    x0, y0, x1, y1 = box
+    return (max(x0, 0), max(y0, 0), min(x1, W), min(y1, H))
+
+
+def _over_color(below, above):
+    """One pixel of Image.alpha_composite, so merged fills blend exactly as separate ones"""
+    return Image.alpha_composite(Image.new("RGBA", (1, 1), tuple(below)),
+                                 Image.new("RGBA", (1, 1), tuple(above))).getpixel((0, 0))
+
+
+class Plan:
+    """A scene compiled for one size, variant and font
+
+    base holds the leading static steps (flattened into one cached image);
+    steps run on a copy of it for every render. dropped lists the layers the
+    planner removed and why.
+    """
+
+    def __init__(self, scene, W, H, variant, base, steps, dropped):
+        self.scene = scene
+        self.size = (W, H)
+        self.variant = variant
+        self.base = base
+        self.steps = steps
+        self.dropped = dropped
+        self.base_key = _digest(W, H, [(s.kind, s.key) for s in base]) if base else None
+
+    def base_image(self, compositor=Compositor, threads=None):
+        W, H = self.size
+
+        def build():
+            steps = self.base
+            images = _layer_images(steps, W, H, threads=threads or LAYER_THREADS)
+            if _opaque_cover(steps[0], W, H) and steps[0].blend == "over":
+                # Nothing shows through the first layer, so start from it
+                with stage(steps[0].name):
+                    canvas = compositor(images[0]())
+                steps, images = steps[1:], images[1:]
+            else:
+                canvas = compositor(Image.new("RGBA", (W, H), (0, 0, 0, 0)))
+            _apply(steps, images, canvas, W, H)
+            return canvas.image()
+
+        if self.base_key is None:
+            return Image.new("RGBA", (W, H), (0, 0, 0, 0))
+        return LAYERS.image("scene-base", self.base_key, build)
+
+    def explain(self):
+        lines = [f"  {self.scene.name} {self.size[0]}x{self.size[1]}"
+                 + (f" ({self.variant})" if self.variant else "") + f": base {self.base_key or '-'}"]
+        for label, steps in (("base", self.base), ("per render", self.steps)):
+            for step in steps:
+                x0, y0, x1, y1 = step.box
+                cached = "" if step.key is None else f"  [{step.key[:8]}]"
+                lines.append(f"    {label:<10} {step.name:<14} {step.kind:<10} {step.blend:<5} "
+                             f"{x1 - x0}x{y1 - y0}+{x0}+{y0}{cached}")
+        for name, reason in self.dropped:
+            lines.append(f"    {'dropped':<10} {name:<14} {reason}")
+        return "\n".join(lines)
+
+
+def _resolve_layer(scene, layer, env, fonts):
+    if layer["kind"] in ("lines", "stripes"):
+        # from, to and color are evaluated once per line, with i set
+        spec = resolve({key: value for key, value in layer.items() if key not in ("from", "to", "color")}, env)
+        spec["segments"] = KINDS["lines"].segments(dict(layer, range=spec.pop("range")), env)
+        if layer["kind"] == "stripes":
+            spec.update(KINDS["stripes"].family(spec.pop("segments")))
+    else:
+        spec = resolve(layer, env)
+    if layer["kind"] == "text":
+        spec["font"] = FONTS.font(spec["size"], fonts)
+    if spec.get("blur") and KINDS[layer["kind"]].pyramid_blur:
+        # Part of the layer's cache key, so renders at different qualities never share one
+        spec.setdefault("quality", BLUR_QUALITY)
+    return spec
+
+
+def _opaque_cover(step, W, H):
+    """True if the step leaves nothing below it visible"""
+    if step.box[:2] != (0, 0) or step.box[2:] != (W, H):
+        return False
+    if step.kind == "fill":
+        return step.blend == "draw" or step.spec["color"][3] == 255
+    return step.kind == "gradient" and not step.spec.get("radius")
+
+
+@functools.lru_cache(maxsize=256)
+def _plan(scene, W, H, variant, font_path):
+    env = scene.env(W, H, variant)
+    fonts = [font_path] if font_path else scene.fonts
+    steps, dropped = [], []
+    for i, layer in enumerate(scene.layers):
+        name = layer.get("name") or f"{layer['kind']}-{i}"
+        if "if" in layer and not resolve(layer["if"], env):
+            continue
+        kind = KINDS[layer["kind"]]
+        spec = _resolve_layer(scene, layer, env, fonts)
+        if kind.transparent(spec) and spec.get("blend", "over") == "over":
+            dropped.append((name, "fully transparent"))
+            continue
+        box = _clip(kind.bbox(spec, W, H), W, H) if not kind.full_frame_only else _full(W, H)
+        if box[0] >= box[2] or box[1] >= box[3]:
+            dropped.append((name, "outside the canvas"))
+            continue
+        dynamic = kind.dynamic or "{title}" in spec.get("text", "")
+        # Fonts are keyed by the files they may come from, so keys stay the same across processes
+        key = None if dynamic else _digest(layer["kind"], dict(spec, font=fonts if "font" in spec else None), box)
+        step = Step(name, layer["kind"], spec, box, key)
+
+        if _opaque_cover(step, W, H):
+            dropped.extend((s.name, f"hidden under {name}") for s in steps)
+            steps = []
+        previous = steps[-1] if steps else None
+        if (previous is not None and previous.kind == step.kind == "fill" and previous.box == step.box
+                and previous.blend == step.blend == "over"):
+            merged = dict(step.spec, color=list(_over_color(previous.spec["color"], step.spec["color"])))
+            steps[-1] = Step(f"{previous.name}+{name}", "fill", merged, box, _digest("fill", merged, box))
+            dropped.append((name, f"merged into {previous.name}"))
+            continue
+        steps.append(step)
+
+    static = 0
+    while static < len(steps) and steps[static].key is not None:
+        static += 1
+    return Plan(scene, W, H, variant if scene.variants else None, steps[:static], steps[static:], dropped)
+
+
+def plan(scene, W=None, H=None, variant=None, font_path=None):
+    """Render plan for scene (a Scene or a path) at W x H (default: the scene's size)"""
+    if not isinstance(scene, Scene):
+        scene = load_scene(scene)
+    default_w, default_h = scene.size
+    return _plan(scene, W or default_w, H or default_h, variant or scene.default_variant, font_path)
+
+
+def render_scene(scene, W=None, H=None, variant=None, title=None, font_path=None, seed=None,
+                 compositor=Compositor, threads=None):
+    """Render a scene and return it as an RGBA image
+
+    title fills "{title}" in text layers and seed fixes the grain texture.
+    threads (default LAYER_THREADS) draws independent layers concurrently;
+    the pixels are the same for any number.
+    """
+    p = plan(scene, W, H, variant, font_path)
+    W, H = p.size
+    threads = threads or LAYER_THREADS
+    title = p.scene.title if title is None else title
+    # Started first, so a cold base image is built while they are drawn
+    images = _layer_images(p.steps, W, H, seed, threads)
+    with stage("base"):
+        canvas = compositor(p.base_image(compositor, threads))
+    _apply(p.steps, images, canvas, W, H, title, seed)
+    return canvas.image()
+
+
+def render_rows(scene, W, H, y0, y1, variant=None, title=None, font_path=None, seed=0, compositor=Compositor):
+    """Rows y0..y1 of render_scene() as an RGBA image, drawing only what those rows need
+
+    Blurred silhouettes use the exact blur and the vignette the fast one, so
+    the rows match render_scene() at BANNER_BLUR_QUALITY=exact and the default
+    BANNER_VIGNETTE_QUALITY=fast.
+    """
+    p = plan(scene, W, H, variant, font_path)
+    title = p.scene.title if title is None else title
+    canvas = compositor(Image.new("RGBA", (W, y1 - y0), (0, 0, 0, 0)))
+    for step in p.base + p.steps:
+        with stage(step.name):
+            step.apply_rows(canvas, W, H, y0, y1, title, seed)
+    return canvas.image()
+
+
+def shared_key(scene, W=None, H=None, variant=None, font_path=None):
+    """Cache key of the scene's base image; renders with equal keys share it"""
+    return plan(scene, W, H, variant, font_path).base_key
+
+
+def main():
+    import argparse
+    import time
+    from banner_encode import format_report, save_image
+
+    parser = argparse.ArgumentParser(description="Render a banner scene file")
+    parser.add_argument("scene", help="scene file, or the name of one in scenes/")
+    parser.add_argument("output")
+    parser.add_argument("--size", help="WxH (default: the scene's size)")
+    parser.add_argument("--variant")
+    parser.add_argument("--title", default="")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threads", type=int, help=f"threads drawing layers (default {LAYER_THREADS})")
+    parser.add_argument("--explain", action="store_true", help="print the render plan")
+    args = parser.parse_args()
+
+    W, H = map(int, args.size.lower().split("x")) if args.size else (None, None)
+    if args.explain:
+        print(plan(args.scene, W, H, args.variant).explain())
+    start = time.perf_counter()
+    img = render_scene(args.scene, W, H, args.variant, args.title, seed=args.seed, threads=args.threads)
+    rendered = time.perf_counter()
+    reports = save_image(img, args.output)
+    print(f"✅ Generated: {args.output} ({img.width}x{img.height}, render {(rendered - start) * 1000:.0f} ms)")
+    print(format_report(reports))
+
+
+if __name__ == "__main__":
+    main()
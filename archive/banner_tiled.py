@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Strip-by-strip banner rendering for very large and print sizes
+The banner's scene plan (banner_scene) is rendered one band of rows at a
+time and the finished rows go straight into a streaming PNG encoder, so peak
+memory follows the strip size instead of the canvas size. The pixels match
+render_banner() with the fast vignette and the exact glow blur
+(BANNER_BLUR_QUALITY=exact): a pyramid blur would need strips aligned to
+its downsampling factor.
+
+    python banner_tiled.py 16384 8602 print-dragon.png --variant dark --seed 0
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import generate_banners as gb
+from banner_layers import random_seed
+from banner_scene import render_rows
+from png_stream import write_png
+
+# Pixels per strip; the background's float64 maths needs about 30 bytes per pixel
+STRIP_PIXELS = 512 * 1024
+MIN_STRIP_ROWS = 16
+
+
+def strip_rows_for(width):
+    """Strip height that keeps a strip of this width near STRIP_PIXELS"""
+    return max(MIN_STRIP_ROWS, STRIP_PIXELS // width)
+
+
+def iter_banner_strips(W, H, variant="dark", title=gb.DEFAULT_TITLE, font_path=None, seed=None,
+                       strip_rows=None):
+    """Yield the banner as RGBA images of strip_rows rows (the last may be shorter), top to bottom
+
+    strip_rows defaults to strip_rows_for(W).
+    """
+    strip_rows = strip_rows or strip_rows_for(W)
+    if seed is None:
+        seed = random_seed()
+    for y0 in range(0, H, strip_rows):
+        yield render_rows(gb.DRAGON_SCENE, W, H, y0, min(y0 + strip_rows, H), variant, title, font_path, seed)
+
+
+def render_banner_tiled(W, H, out_path, variant="dark", title=gb.DEFAULT_TITLE, font_path=None, seed=None,
+                        strip_rows=None, level=6):
+    """Render a banner strip by strip straight into a PNG file; returns its size in bytes"""
+    strips = iter_banner_strips(W, H, variant, title, font_path, seed, strip_rows)
+    return write_png(out_path, W, H, (np.asarray(strip) for strip in strips), level=level)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a large banner strip by strip")
+    parser.add_argument("width", type=int)
+    parser.add_argument("height", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--variant", default="dark", choices=("dark", "light"))
+    parser.add_argument("--title", default=gb.DEFAULT_TITLE)
+    parser.add_argument("--seed", type=int, default=None, help="grain seed (default: random)")
+    parser.add_argument("--strip-rows", type=int, default=None,
+                        help=f"rows per strip (default: about {STRIP_PIXELS:,} pixels per strip)")
+    parser.add_argument("--level", type=int, default=6, help="zlib compression level")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    size = render_banner_tiled(args.width, args.height, args.output, args.variant, args.title,
+                               seed=args.seed, strip_rows=args.strip_rows, level=args.level)
+    print(f"✅ Generated: {args.output} ({args.width}x{args.height}, {size:,} bytes, "
+          f"{time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,92 +1,149 @@
 #!/usr/bin/env python3
 """
 Create translucent variants of the dragon OG image for better web integration.
+The source is decoded once (optionally through a memory-mapped .npy cache,
+see --cache-dir) and every variant shares its RGB: a variant is only a new
+alpha plane, made with a lookup table or the fade mask, and the variants are
+encoded concurrently. Variants whose inputs are unchanged since the last run
+are skipped (see banner_build); pass --force to rebuild them all.
 """
 
-try:
-    from PIL import Image, ImageOps
-    import os
-    import numpy as np
-    
-    # Source image
-    src_path = "public/dragon-og.png"
-    
-    if not os.path.exists(src_path):
-        print(f"❌ Source image not found: {src_path}")
-        exit(1)
-    
-    print(f"📸 Loading source image: {src_path}")
-    im = Image.open(src_path).convert("RGBA")
-    w, h = im.size
-    print(f"📏 Image dimensions: {w}x{h}")
-    
-    def apply_opacity(img, opacity):
-        """Apply uniform opacity to an image"""
-        r, g, b, a = img.split()
-        # Keep existing alpha but reduce overall opacity
-        a = a.point(lambda x: int(x * opacity))
-        return Image.merge("RGBA", (r, g, b, a))
-    
-    def create_vignette_fade(img):
-        """Create a radial fade effect centered on the dragon"""
-        w, h = img.size
-        # Create a radial gradient mask
-        yy, xx = np.mgrid[0:h, 0:w]
-        cx, cy = int(0.74*w), int(0.50*h)  # Dragon position (right-center)
-        
-        # Radial distance calculation
-        r = np.sqrt(((xx-cx)/(0.7*w))**2 + ((yy-cy)/(0.7*h))**2)
-        # Gradient from center (opaque) to edges (transparent)
-        grad = 1.0 - np.clip((r-0.2)/0.6, 0, 1)
-        mask_arr = (grad*255).astype(np.uint8)
-        mask = Image.fromarray(mask_arr, mode="L")
-        
-        # Apply the mask
-        result = img.copy()
-        result.putalpha(mask)
-        return result
-    
-    print("🎨 Creating translucent variants...")
-    
-    # Create opacity variants
-    variants = [
-        ("public/dragon-og-translucent-70.png", 0.70),
-        ("public/dragon-og-translucent-40.png", 0.40),
-        ("public/dragon-og-translucent-20.png", 0.20)
-    ]
-    
-    for output_path, opacity in variants:
-        translucent = apply_opacity(im, opacity)
-        translucent.save(output_path, "PNG", optimize=True)
-        size = os.path.getsize(output_path)
-        print(f"✅ Created {output_path} ({opacity*100}% opacity) - {size:,} bytes")
-    
-    # Create vignette fade variant
-    fade_path = "public/dragon-og-translucent-fade.png"
-    faded = create_vignette_fade(im)
-    faded.save(fade_path, "PNG", optimize=True)
-    size = os.path.getsize(fade_path)
-    print(f"✅ Created {fade_path} (vignette fade) - {size:,} bytes")
-    
-    # Create optimized 1200x630 version with 40% opacity
-    target_w, target_h = 1200, 630
-    resized = im.resize((target_w, target_h), Image.Resampling.LANCZOS)
-    resized40 = apply_opacity(resized, 0.40)
-    og_path = "public/dragon-og-1200x630-translucent.png"
-    resized40.save(og_path, "PNG", optimize=True)
-    size = os.path.getsize(og_path)
-    print(f"✅ Created {og_path} (1200x630, 40% opacity) - {size:,} bytes")
-    
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from banner_build import BuildManifest, file_hash, format_reasons, target_inputs
+from banner_encode import DEFAULT_PRESET, format_report, save_png_planes
+
+SOURCE_PATH = "public/dragon-og.png"
+CACHE_DIR = os.environ.get("TRANSLUCENT_CACHE_DIR")
+CODE = ("create_translucent_dragons.py", "banner_encode.py", "png_stream.py")
+
+# (output, size or None for the source size, opacity or "fade")
+VARIANTS = [
+    ("public/dragon-og-translucent-70.png", None, 0.70),
+    ("public/dragon-og-translucent-40.png", None, 0.40),
+    ("public/dragon-og-translucent-20.png", None, 0.20),
+    # Vignette fade variant
+    ("public/dragon-og-translucent-fade.png", None, "fade"),
+    # Optimized 1200x630 version with 40% opacity
+    ("public/dragon-og-1200x630-translucent.png", (1200, 630), 0.40),
+]
+
+
+def load_source(path, cache_dir=None):
+    """The source as an (h, w, 4) uint8 RGBA array, decoded once
+
+    With cache_dir the decoded pixels are kept there as <name>-<hash>.npy
+    and memory-mapped read-only on later runs instead of decoding the PNG.
+    """
+    if not cache_dir:
+        with Image.open(path) as im:
+            return np.asarray(im.convert("RGBA"))
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, f"{name}-{file_hash(path)[:16]}.npy")
+    if not os.path.exists(cache_path):
+        with Image.open(path) as im:
+            pixels = np.asarray(im.convert("RGBA"))
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=".tmp-", suffix=".npy")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, pixels)
+        os.replace(tmp, cache_path)
+    return np.load(cache_path, mmap_mode="r")
+
+
+def opacity_lut(opacity):
+    """Lookup table scaling alpha by opacity, as Image.point(lambda x: int(x * opacity)) does"""
+    return np.array([int(x * opacity) for x in range(256)], dtype=np.uint8)
+
+
+def fade_mask(w, h):
+    """Radial fade centred on the dragon (right-centre): opaque there, transparent at the edges"""
+    yy, xx = np.ogrid[0:h, 0:w]
+    cx, cy = int(0.74 * w), int(0.50 * h)
+    r = np.sqrt(((xx - cx) / (0.7 * w)) ** 2 + ((yy - cy) / (0.7 * h)) ** 2)
+    grad = 1.0 - np.clip((r - 0.2) / 0.6, 0, 1)
+    return (grad * 255).astype(np.uint8)
+
+
+def variant_planes(source, stale):
+    """(rgb, alpha) for each stale (output, size, alpha spec)
+
+    Variants of one size share a single RGB view; only the alpha plane is
+    new per variant, and identical (size, spec) pairs share that too.
+    """
+    sized = {None: source}
+    alphas = {}
+    planes = []
+    for _, size, spec in stale:
+        if size not in sized:
+            h, w = source.shape[:2]
+            # Pillow resizes RGBA premultiplied, so resample through it
+            sized[size] = source if tuple(size) == (w, h) else np.asarray(
+                Image.fromarray(np.asarray(source)).resize(size, Image.Resampling.LANCZOS))
+        rgba = sized[size]
+        if (size, spec) not in alphas:
+            h, w = rgba.shape[:2]
+            alphas[size, spec] = fade_mask(w, h) if spec == "fade" else opacity_lut(spec)[rgba[..., 3]]
+        planes.append((rgba[..., :3], alphas[size, spec]))
+    return planes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create translucent variants of the dragon OG image")
+    parser.add_argument("--force", action="store_true", help="rebuild every variant, even if up to date")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help="keep the decoded source here as a memory-mapped .npy "
+                             "(default: $TRANSLUCENT_CACHE_DIR, off when unset)")
+    parser.add_argument("--workers", type=int, default=None, help="concurrent encoders (default: all cores)")
+    args = parser.parse_args()
+
+    if not os.path.exists(SOURCE_PATH):
+        print(f"❌ Source image not found: {SOURCE_PATH}")
+        sys.exit(1)
+
+    build = BuildManifest(force=args.force)
+    stale = []
+    for output_path, size, spec in VARIANTS:
+        params = {"fade": True} if spec == "fade" else {"opacity": spec}
+        if size:
+            params["size"] = list(size)
+        inputs = target_inputs(dict(params, preset=DEFAULT_PRESET), CODE, sources=[SOURCE_PATH])
+        reasons = build.reasons(output_path, inputs)
+        print(format_reasons(output_path, reasons))
+        if reasons:
+            stale.append((output_path, size, spec, inputs))
+
+    if stale:
+        print(f"📸 Loading source image: {SOURCE_PATH}")
+        source = load_source(SOURCE_PATH, args.cache_dir)
+        print(f"📏 Image dimensions: {source.shape[1]}x{source.shape[0]}")
+
+        print("🎨 Creating translucent variants...")
+        planes = variant_planes(source, [(output_path, size, spec) for output_path, size, spec, _ in stale])
+        workers = min(args.workers or os.cpu_count() or 1, len(stale))
+        # zlib and the numpy filters release the GIL, so the encoders run side by side
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(save_png_planes, rgb, alpha, output_path, workers=1)
+                       for (output_path, _, _, _), (rgb, alpha) in zip(stale, planes)]
+            for (output_path, _, _, inputs), future in zip(stale, futures):
+                report = future.result()
+                print(f"✅ Created {output_path}")
+                print(format_report([report]))
+                build.record(output_path, inputs, [report["path"]])
+        build.save()
+
     print("🎉 All translucent dragon variants created successfully!")
     print("\nGenerated files:")
-    for output_path, _ in variants:
+    for output_path, _, _ in VARIANTS:
         print(f"  - {output_path}")
-    print(f"  - {fade_path}")
-    print(f"  - {og_path}")
-    
-except ImportError:
-    print("❌ PIL (Pillow) not available. Installing...")
-    os.system("pip install Pillow")
-    print("Please run the script again after installation.")
-except Exception as e:
-    print(f"❌ Error: {e}")
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    main()
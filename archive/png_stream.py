@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Streaming PNG encoder
+Rows are filtered and deflated as they arrive, so encoding memory is bounded
+by the rows in flight instead of the whole image. Output is a plain PNG any
+decoder reads.
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# mode -> (PNG colour type, bytes per pixel)
+COLOR_TYPES = {"L": (0, 1), "RGB": (2, 3), "P": (3, 1), "LA": (4, 2), "RGBA": (6, 4)}
+
+FILTERS = ("none", "sub", "up", "average", "paeth")
+
+# Rows are filtered in blocks of about this many raw bytes; the filters need
+# roughly 20x that in temporaries, whatever the caller's strip size
+FILTER_BLOCK_BYTES = 256 * 1024
+
+
+def png_chunk(tag, data):
+    crc = zlib.crc32(data, zlib.crc32(tag)) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", crc)
+
+
+def filter_rows(rows, prior, bpp, method="adaptive"):
+    """Apply PNG row filters to a block of rows
+
+    rows is (n, stride) uint8 and prior the raw row above the first one
+    (zeros for the top of the image). method is one of FILTERS or
+    "adaptive", which picks per row the filter with the smallest sum of
+    absolute signed bytes (the heuristic libpng uses). Returns (n, stride + 1)
+    uint8 with the filter type byte in column 0.
+    """
+    raw = rows.astype(np.int16)
+    up = np.vstack([prior[None, :].astype(np.int16), raw[:-1]])
+    left = np.zeros_like(raw)
+    left[:, bpp:] = raw[:, :-bpp]
+    upleft = np.zeros_like(raw)
+    upleft[:, bpp:] = up[:, :-bpp]
+
+    def paeth():
+        p = left + up - upleft
+        pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - upleft)
+        pred = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upleft))
+        return raw - pred
+
+    candidates = {
+        "none": lambda: raw,
+        "sub": lambda: raw - left,
+        "up": lambda: raw - up,
+        "average": lambda: raw - ((left + up) >> 1),
+        "paeth": paeth,
+    }
+
+    out = np.empty((raw.shape[0], raw.shape[1] + 1), dtype=np.uint8)
+    if method != "adaptive":
+        out[:, 0] = FILTERS.index(method)
+        out[:, 1:] = candidates[method]() & 0xFF
+        return out
+
+    # Score one filter at a time so only one extra strip-sized buffer is alive
+    best_cost = None
+    for index, name in enumerate(FILTERS):
+        filtered = candidates[name]() & 0xFF
+        signed = filtered.astype(np.int8).astype(np.int16)
+        cost = np.abs(signed).sum(axis=1, dtype=np.int64)
+        better = slice(None) if best_cost is None else cost < best_cost
+        out[better, 0] = index
+        out[better, 1:] = filtered[better]
+        best_cost = cost if best_cost is None else np.minimum(cost, best_cost)
+    return out
+
+
+class PNGEncoder:
+    """Incremental PNG encoder: start(), encode_rows() as often as needed, finish()
+
+    Each call returns the bytes ready to send or write; IDAT chunks are
+    emitted once idat_size compressed bytes have accumulated. Mode "P" needs
+    palette (packed RGB bytes) and takes per-entry alpha as transparency.
+    """
+
+    def __init__(self, width, height, mode="RGBA", level=6, filter="adaptive", idat_size=64 * 1024,
+                 strategy=zlib.Z_DEFAULT_STRATEGY, palette=None, transparency=None):
+        if mode not in COLOR_TYPES:
+            raise ValueError(f"Unsupported PNG mode: {mode}")
+        if (mode == "P") != (palette is not None):
+            raise ValueError("A palette is required for mode P and only allowed there")
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.color_type, self.bpp = COLOR_TYPES[mode]
+        self.filter = filter
+        self.idat_size = idat_size
+        self.palette = palette
+        self.transparency = transparency
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, strategy)
+        self._pending = []
+        self._pending_size = 0
+        self._prior = np.zeros(width * self.bpp, dtype=np.uint8)
+
+    def start(self):
+        ihdr = struct.pack(">IIBBBBB", self.width, self.height, 8, self.color_type, 0, 0, 0)
+        header = PNG_SIGNATURE + png_chunk(b"IHDR", ihdr)
+        if self.palette is not None:
+            header += png_chunk(b"PLTE", bytes(self.palette))
+            if self.transparency:
+                header += png_chunk(b"tRNS", bytes(self.transparency))
+        return header
+
+    def _flush_idat(self, force=False):
+        if not self._pending or (not force and self._pending_size < self.idat_size):
+            return b""
+        data = b"".join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        return png_chunk(b"IDAT", data)
+
+    def encode_rows(self, rows):
+        """Encode an (n, width[, channels]) uint8 array of rows"""
+        rows = np.ascontiguousarray(rows, dtype=np.uint8).reshape(len(rows), -1)
+        if rows.shape[1] != self.width * self.bpp:
+            raise ValueError(f"Expected rows of {self.width * self.bpp} bytes, got {rows.shape[1]}")
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError("More rows than the image height")
+        if not len(rows):
+            return b""
+        block = max(1, FILTER_BLOCK_BYTES // rows.shape[1])
+        for start in range(0, len(rows), block):
+            chunk = rows[start:start + block]
+            filtered = filter_rows(chunk, self._prior, self.bpp, self.filter)
+            self._prior = chunk[-1]
+            data = self._compressor.compress(filtered)
+            if data:
+                self._pending.append(data)
+                self._pending_size += len(data)
+        self._prior = self._prior.copy()
+        self.rows_written += len(rows)
+        return self._flush_idat()
+
+    def finish(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"Wrote {self.rows_written} of {self.height} rows")
+        self._pending.append(self._compressor.flush())
+        return self._flush_idat(force=True) + png_chunk(b"IEND", b"")
+
+
+def encode_png(rows, mode="RGBA", **options):
+    """Encode a whole (height, width[, channels]) uint8 array; options as for PNGEncoder"""
+    encoder = PNGEncoder(rows.shape[1], rows.shape[0], mode, **options)
+    return encoder.start() + encoder.encode_rows(rows) + encoder.finish()
+
+
+def write_png(path, width, height, strips, mode="RGBA", level=6, filter="adaptive"):
+    """Write a PNG from an iterable of row blocks; returns the file size"""
+    encoder = PNGEncoder(width, height, mode, level, filter)
+    with open(path, "wb") as f:
+        data = encoder.start()
+        f.write(data)
+        size = len(data)
+        for rows in strips:
+            data = encoder.encode_rows(rows)
+            f.write(data)
+            size += len(data)
+        data = encoder.finish()
+        f.write(data)
+        size += len(data)
+    return size
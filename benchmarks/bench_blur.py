@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Pyramid blur (banner_layers.blur_image) against Pillow's exact GaussianBlur
+Sources are drawn at the size the scenes blur them: the layer's own box, not
+the canvas. Exits non-zero if any quality differs from the exact blur by more
+than its banner_layers.BLUR_TOLERANCE.
+"""
+
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "archive"))
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+import banner_layers
+
+QUALITIES = ("fast", "draft")
+
+
+def silhouette(w, h):
+    return banner_layers.create_dragon_silhouette(w, h)
+
+
+def ellipses(w, h):
+    img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.ellipse((w * 0.15, h * 0.2, w * 0.85, h * 0.8), fill=(33, 189, 140, 55))
+    draw.ellipse((w * 0.3, h * 0.35, w * 0.7, h * 0.65), fill=(155, 240, 200, 45))
+    return img
+
+
+def lines(w, h):
+    img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for i in range(0, w, 36):
+        draw.line([(i, 0), (i + h, h)], fill=(255, 255, 255, 18), width=2)
+    return img
+
+
+# (label, source, width, height, radius); the first four are what the scenes blur today
+CASES = [
+    ("dragon glow", silhouette, 720, 378, 15),
+    ("dragon glow", silhouette, 1152, 648, 15),
+    ("earth glow", ellipses, 350, 310, 20),
+    ("earth sheen", lines, 1200, 185, 2.4),
+    ("dragon glow", silhouette, 333, 177, 15),
+    ("dragon glow", silhouette, 2304, 1210, 15),
+    ("wide glow", silhouette, 1200, 630, 40),
+    ("soft glow", ellipses, 400, 300, 8),
+]
+
+
+def best_ms(fn, number=3):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1000
+
+
+def main():
+    failed = False
+    print("🐉 Blur: exact GaussianBlur vs pyramid (factor, ms, max diff, mean diff per quality)")
+    print(f"  {'source':<12} {'size':>10} {'radius':>6} {'exact ms':>9}"
+          + "".join(f" {quality:>22}" for quality in QUALITIES))
+    for label, source, w, h, radius in CASES:
+        img = source(w, h)
+        exact = np.asarray(img.filter(ImageFilter.GaussianBlur(radius))).astype(np.int16)
+        row = f"  {label:<12} {f'{w}x{h}':>10} {radius:>6} "
+        row += f"{best_ms(lambda: img.filter(ImageFilter.GaussianBlur(radius))):>9.1f}"
+        for quality in QUALITIES:
+            diff = np.abs(np.asarray(banner_layers.blur_image(img, radius, quality)) - exact)
+            failed |= diff.max() > banner_layers.BLUR_TOLERANCE[quality]
+            ms = best_ms(lambda: banner_layers.blur_image(img, radius, quality))
+            factor = banner_layers.blur_factor(radius, quality)
+            row += f" {factor:>3}x {ms:>6.1f} {int(diff.max()):>4} {diff.mean():>6.3f}"
+        print(row)
+
+    if failed:
+        print(f"❌ Pyramid blur differs by more than {banner_layers.BLUR_TOLERANCE}")
+        sys.exit(1)
+    print(f"✅ All cases within tolerance of the exact blur {banner_layers.BLUR_TOLERANCE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Wall time, peak memory and pixel difference of the float32 compositor
+against the original chain of Image.alpha_composite calls
+Exits non-zero if any banner differs by more than banner_compositor.TOLERANCE.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(ROOT), "archive"))
+
+CASES = {
+    "banner-dark": lambda c, size: generate_banners.render_banner(*size, "dark", seed=0, compositor=c),
+    "banner-light": lambda c, size: generate_banners.render_banner(*size, "light", seed=0, compositor=c),
+    "earth": lambda c, size: generate_earth_dragon_banner.create_earth_dragon_banner(c, seed=0),
+}
+
+import banner_compositor
+import generate_banners
+import generate_earth_dragon_banner
+import memory
+
+
+def measure(case, engine, size, repeat):
+    """Run in a child process: warm caches, then time and memory-sample renders"""
+    compositor = getattr(banner_compositor, engine)
+    CASES[case](compositor, size)
+    memory.reset_peak()
+    before = memory.rss_kb()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        CASES[case](compositor, size)
+    seconds = (time.perf_counter() - start) / repeat
+    return {"ms": seconds * 1000, "peak_delta_kb": memory.peak_rss_kb() - before}
+
+
+def run_child(case, engine, size, repeat):
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", case, engine, f"{size[0]}x{size[1]}", str(repeat)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the banner compositor")
+    parser.add_argument("--size", default="1200x630", help="banner size (the Earth Dragon is always 1200x630)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        case, engine, size, repeat = args.child
+        print(json.dumps(measure(case, engine, tuple(map(int, size.split("x"))), int(repeat))))
+        return
+
+    size = tuple(map(int, args.size.split("x")))
+    failed = False
+    print(f"🐉 Compositor benchmark ({args.size}, {args.repeat} renders, warm layer cache)")
+    print(f"  {'case':<13} {'engine':<17} {'ms/render':>10} {'peak MiB':>9} {'max diff':>9}")
+    for case in CASES:
+        reference = CASES[case](banner_compositor.PillowCompositor, size)
+        fast = CASES[case](banner_compositor.Compositor, size)
+        diff = banner_compositor.max_difference(reference, fast)
+        failed |= diff > banner_compositor.TOLERANCE
+        for engine in ("PillowCompositor", "Compositor"):
+            r = run_child(case, engine, size, args.repeat)
+            shown = "-" if engine == "PillowCompositor" else str(diff)
+            print(f"  {case:<13} {engine:<17} {r['ms']:>10.1f} {r['peak_delta_kb'] / 1024:>9.1f} {shown:>9}")
+
+    if failed:
+        print(f"❌ Compositor output differs by more than {banner_compositor.TOLERANCE}")
+        sys.exit(1)
+    print(f"✅ All cases within {banner_compositor.TOLERANCE} of the Pillow reference")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Encode time and size of each banner_encode preset and sibling format against
+the Pillow optimize=True PNG the generators used to write
+Exits non-zero if a preset's PNG does not decode to the original pixels.
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(ROOT), "archive"))
+
+from PIL import Image
+import numpy as np
+
+import banner_encode
+import generate_banners
+import generate_earth_dragon_banner
+
+CASES = {
+    "banner-dark": lambda: generate_banners.render_banner(1200, 630, "dark", seed=0),
+    "banner-light": lambda: generate_banners.render_banner(1200, 630, "light", seed=0),
+    "earth": lambda: generate_earth_dragon_banner.create_earth_dragon_banner(seed=0),
+}
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        data = fn()
+    return (time.perf_counter() - start) / repeat, data
+
+
+def pillow_optimize(img):
+    buf = io.BytesIO()
+    img.save(buf, "PNG", optimize=True)
+    return buf.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the banner encoder presets")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None, help="threads for the smallest preset")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"🐉 Encoder benchmark ({args.repeat} encodes each, {os.cpu_count()} cores)")
+    print(f"  {'case':<13} {'encoder':<18} {'ms':>8} {'bytes':>11} {'vs optimize':>12}")
+    for case, render in CASES.items():
+        img = render()
+        seconds, data = timed(lambda: pillow_optimize(img), args.repeat)
+        baseline = len(data)
+        print(f"  {case:<13} {'png optimize=True':<18} {seconds * 1000:>8.0f} {baseline:>11,} {'':>12}")
+        for preset in banner_encode.PRESETS:
+            seconds, data = timed(lambda: banner_encode.encode_png(img, preset, args.workers), args.repeat)
+            with Image.open(io.BytesIO(data)) as decoded:
+                exact = np.array_equal(np.asarray(decoded.convert(img.mode)), np.asarray(img))
+            failed |= not exact
+            print(f"  {case:<13} {'png ' + preset:<18} {seconds * 1000:>8.0f} {len(data):>11,} "
+                  f"{len(data) / baseline:>11.0%}{'' if exact else '  MISMATCH'}")
+        for fmt in banner_encode.available_formats():
+            seconds, data = timed(lambda: banner_encode.encode_sibling(img, fmt), args.repeat)
+            print(f"  {case:<13} {fmt:<18} {seconds * 1000:>8.0f} {len(data):>11,} {len(data) / baseline:>11.0%}")
+
+    if failed:
+        print("❌ A PNG preset changed the pixels")
+        sys.exit(1)
+    print("✅ Every PNG preset is lossless")
+
+
+if __name__ == "__main__":
+    main()
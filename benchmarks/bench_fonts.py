@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Typography cost of a banner batch with and without the font registry
+Renders the text layers (title, subtitle, features line) of every job the
+way render_banner() does. "uncached" clears banner_fonts.FONTS and the scene
+plans before each job, which matches the old per-call font loading and
+rasterizing.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(ROOT), "archive"))
+
+from PIL import Image
+
+import banner_scene
+import generate_banners
+from banner_compositor import Compositor
+from banner_fonts import FONTS
+
+SIZES = [(1200, 630), (1200, 600), (1080, 1080), (1500, 500), (1920, 1080), (800, 418)]
+
+
+def typeset(width, height, variant):
+    canvas = Compositor(Image.new("RGBA", (width, height), (6, 24, 22, 255)))
+    plan = banner_scene.plan(generate_banners.DRAGON_SCENE, width, height, variant)
+    for step in plan.base + plan.steps:
+        if step.kind == "text":
+            step.apply(canvas, width, height, generate_banners.DEFAULT_TITLE)
+
+
+def run(jobs, cached):
+    FONTS.clear()
+    banner_scene._plan.cache_clear()
+    start = time.perf_counter()
+    for job in jobs:
+        if not cached:
+            # Plans hold the fonts their text layers resolved
+            FONTS.clear()
+            banner_scene._plan.cache_clear()
+        typeset(*job)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the font registry")
+    parser.add_argument("--rounds", type=int, default=4, help="times each size/variant is rendered")
+    args = parser.parse_args()
+
+    jobs = [(w, h, variant) for _ in range(args.rounds) for w, h in SIZES for variant in ("dark", "light")]
+    typeset(*jobs[0])  # import and first-use costs
+    uncached = run(jobs, cached=False)
+    cached = run(jobs, cached=True)
+
+    print(f"🐉 Typography for {len(jobs)} banners ({len(SIZES)} sizes x 2 variants x {args.rounds} rounds)")
+    print(f"  uncached  {uncached * 1000 / len(jobs):7.2f} ms/banner")
+    print(f"  cached    {cached * 1000 / len(jobs):7.2f} ms/banner  ({uncached / cached:.1f}x)")
+    print(FONTS.format_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Grain stage cost: full-frame noise and blur against a blit from the cached tile
+"tile cold" includes building the tile for the blur radius; later banners
+only pay "tile warm".
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "archive"))
+
+import generate_banners
+from banner_layers import LAYERS, grain_layer
+
+SIZES = [(1200, 630), (1920, 1080), (3840, 2016)]
+
+
+def per_call(fn, repeat):
+    start = time.perf_counter()
+    for seed in range(repeat):
+        fn(seed)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the grain layer")
+    parser.add_argument("--repeat", type=int, default=10, help="grain layers per measurement (one seed each)")
+    args = parser.parse_args()
+    grain = next(layer for layer in generate_banners.DRAGON_SCENE.layers if layer["kind"] == "grain")
+    blur, alpha = grain["blur"], grain["alpha"]
+
+    print(f"🐉 Grain layer (blur {blur}, alpha {alpha}), ms per banner")
+    print(f"  {'size':<10} {'field':>8} {'tile cold':>10} {'tile warm':>10} {'speedup':>8}")
+    for w, h in SIZES:
+        field = per_call(lambda seed: grain_layer(w, h, blur, alpha, seed, "field"), args.repeat)
+        LAYERS.clear()
+        start = time.perf_counter()
+        grain_layer(w, h, blur, alpha, 0, "tile")
+        cold = time.perf_counter() - start
+        warm = per_call(lambda seed: grain_layer(w, h, blur, alpha, seed, "tile"), args.repeat)
+        print(f"  {f'{w}x{h}':<10} {field * 1000:>8.1f} {cold * 1000:>10.1f} {warm * 1000:>10.1f} "
+              f"{field / warm:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Requests/sec for the dragon_server.py landing page
+Compares the old per-request render_template_string path with the render cache
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask import render_template_string
+
+from dragon_page import DRAGON_TEMPLATE, brotli
+from dragon_server import app
+
+
+@app.route('/__bench/legacy')
+def legacy_home():
+    """The route as it was before the render cache"""
+    return render_template_string(DRAGON_TEMPLATE,
+        current_time=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        python_version=f"{sys.version_info.major}.{sys.version_info.minor}"
+    )
+
+
+def run(client, path, seconds, headers=None, revalidate=False):
+    """Hit one path in a loop for a fixed time and return requests/sec
+
+    With revalidate=True the client replays the last ETag it saw, like a
+    browser would, so most responses are 304s.
+    """
+    headers = dict(headers or {})
+    count = 0
+    statuses = set()
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        response = client.get(path, headers=headers)
+        response.get_data()
+        statuses.add(response.status_code)
+        if revalidate and response.status_code == 200:
+            headers["If-None-Match"] = response.headers["ETag"]
+        count += 1
+    return count / (time.perf_counter() - start), "/".join(map(str, sorted(statuses)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0, help="time per scenario")
+    args = parser.parse_args()
+
+    client = app.test_client()
+
+    scenarios = [
+        ("legacy render_template_string", "/__bench/legacy", None, False),
+        ("render cache, identity", "/", None, False),
+        ("render cache, gzip", "/", {"Accept-Encoding": "gzip"}, False),
+        ("render cache, 304 revalidation", "/", None, True),
+    ]
+    if brotli is not None:
+        scenarios.insert(3, ("render cache, br", "/", {"Accept-Encoding": "br"}, False))
+
+    print(f"🐉 dragon_home benchmark ({args.seconds:.1f}s per scenario)")
+    baseline = None
+    for name, path, headers, revalidate in scenarios:
+        rps, status = run(client, path, args.seconds, headers, revalidate)
+        baseline = baseline or rps
+        print(f"  {name:<34} {rps:>9,.0f} req/s  {rps / baseline:>5.2f}x  (HTTP {status})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Per-banner render time with and without the shared layer cache
+Renders the same size repeatedly, as a batch of localized banners would
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "archive"))
+
+import generate_banners
+from banner_layers import LAYERS
+
+
+def render_many(count, width, height, variant, titles):
+    start = time.perf_counter()
+    for i in range(count):
+        generate_banners.render_banner(width, height, variant, title=titles[i % len(titles)], seed=0)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the banner layer cache")
+    parser.add_argument("--count", type=int, default=8, help="banners per run")
+    parser.add_argument("--size", default="1200x630")
+    parser.add_argument("--variant", default="dark")
+    args = parser.parse_args()
+    width, height = map(int, args.size.split("x"))
+    titles = ["FRAME ECONOMICS", "ÉCONOMIE DU CADRE", "RAHMENÖKONOMIE", "ECONOMÍA DEL MARCO"]
+
+    print(f"🐉 {args.count} x {args.size} {args.variant} banners (render only, no PNG encode)")
+    LAYERS.enabled = False
+    uncached = render_many(args.count, width, height, args.variant, titles)
+    print(f"  without layer cache  {uncached * 1000:8.1f} ms/banner")
+
+    LAYERS.enabled = True
+    LAYERS.clear()
+    cached = render_many(args.count, width, height, args.variant, titles)
+    print(f"  with layer cache     {cached * 1000:8.1f} ms/banner  ({uncached / cached:.2f}x)")
+    print(LAYERS.format_stats())
+
+
+if __name__ == "__main__":
+    main()
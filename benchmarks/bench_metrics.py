@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Cost of the /metrics instrumentation on the / hot path
+Calls the WSGI app directly (no sockets, no test client) with and without
+the dragon_metrics wrapper, alternating rounds. On a busy machine the / times
+swing by more than the wrapper costs, so the budget is checked against the
+wrapper around a no-op app; exits non-zero if that is over --budget-us.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from werkzeug.test import EnvironBuilder
+
+import dragon_server
+
+# Allowed cost of recording one request, in microseconds
+BUDGET_US = 15.0
+
+
+def noop_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", "2")])
+    return [b"ok"]
+
+
+def best_pair(plain_app, instrumented_app, environ, requests, rounds):
+    plain, instrumented = [], []
+    for _ in range(rounds):
+        plain.append(per_request(plain_app, environ, requests))
+        instrumented.append(per_request(instrumented_app, environ, requests))
+    return min(plain), min(instrumented)
+
+
+def per_request(wsgi_app, environ, count):
+    def start_response(status, headers, exc_info=None):
+        return None
+
+    start = time.perf_counter()
+    for _ in range(count):
+        body = wsgi_app(dict(environ), start_response)
+        for _ in body:
+            pass
+        close = getattr(body, "close", None)
+        if close is not None:
+            close()
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the metrics middleware")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--budget-us", type=float, default=BUDGET_US)
+    args = parser.parse_args()
+
+    metrics = dragon_server.metrics
+    environ = EnvironBuilder(path="/", headers={"Accept-Encoding": "gzip"}).get_environ()
+    home, home_instrumented = best_pair(metrics._wsgi_app, metrics.wsgi_app, environ, args.requests, args.rounds)
+    flask_app, metrics._wsgi_app = metrics._wsgi_app, noop_app
+    try:
+        noop, noop_instrumented = best_pair(noop_app, metrics.wsgi_app, environ, args.requests * 10, args.rounds)
+    finally:
+        metrics._wsgi_app = flask_app
+    cost = noop_instrumented - noop
+
+    print(f"🐉 Metrics middleware (best of {args.rounds} rounds)")
+    print(f"  /                 {home * 1e6:8.1f} µs/request uninstrumented, {home_instrumented * 1e6:8.1f} instrumented")
+    print(f"  wrapper alone     {cost * 1e6:8.1f} µs/request ({cost / home:.1%} of /), budget {args.budget_us:.0f} µs")
+    if cost * 1e6 > args.budget_us:
+        print("❌ Metrics overhead is over budget")
+        sys.exit(1)
+    print("✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Vectorized line patterns (banner_pattern) against the draw loops they replace
+The sheen's alpha must stay within SHEEN_TOLERANCE of the lines drawn one
+by one and then blurred. The storm lines have no drawn counterpart, so their
+average alpha is checked against the stripe's share of the CSS period
+instead. Exits non-zero if either check fails.
+"""
+
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "archive"))
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+import banner_pattern
+
+# Largest alpha difference between the computed sheen and the drawn and blurred one
+SHEEN_TOLERANCE = 1
+
+SHEEN_SIZES = [(1200, 630), (1920, 1008)]
+STORM_SIZES = [(1200, 630), (1920, 1080)]
+
+
+def sheen_geometry(w, h, margin=24, band=170):
+    """The earth dragon scene's sheen: (run, top, bottom, per-line alphas)"""
+    alphas = [max(0, int(max(0, 120 - abs(i - w // 2) * 0.25)) // 18) for i in range(0, w, 6)]
+    return int(h * 0.5), margin, margin + band, alphas
+
+
+def sheen_loop(w, h):
+    run, top, bottom, alphas = sheen_geometry(w, h)
+    img = Image.new("RGBA", (w, bottom + 24), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for i, alpha in zip(range(0, w, 6), alphas):
+        draw.line([(i, top), (i + run, bottom)], fill=(255, 255, 255, alpha))
+    return img.filter(ImageFilter.GaussianBlur(2.4))
+
+
+def sheen_vectorized(w, h):
+    run, top, bottom, alphas = sheen_geometry(w, h)
+    return banner_pattern.lines_alpha(w, bottom + 24, 0, w, 6, run, top, bottom, np.array(alphas, dtype=float),
+                                      blur=2.4)
+
+
+def best_ms(fn, number=3):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1000
+
+
+def main():
+    failed = False
+    print("🐉 Line patterns: draw loop vs vectorized")
+    print(f"  {'pattern':<8} {'size':>10} {'loop ms':>8} {'numpy ms':>9} {'max diff':>9}")
+    for w, h in SHEEN_SIZES:
+        drawn = np.asarray(sheen_loop(w, h))[..., 3].astype(np.float32)
+        diff = int(np.abs(drawn - np.floor(sheen_vectorized(w, h) + 0.5)).max())
+        failed |= diff > SHEEN_TOLERANCE
+        print(f"  {'sheen':<8} {f'{w}x{h}':>10} {best_ms(lambda: sheen_loop(w, h)):>8.1f} "
+              f"{best_ms(lambda: sheen_vectorized(w, h)):>9.1f} {diff:>9}")
+    storm = banner_pattern.STORM
+    expected = storm["color"][3] * 255 * (storm["end"] - storm["start"]) / storm["period"]
+    for w, h in STORM_SIZES:
+        mean = float(np.asarray(banner_pattern.storm_layer(w, h))[..., 3].mean())
+        failed |= abs(mean - expected) > 0.1
+        print(f"  {'storm':<8} {f'{w}x{h}':>10} {'-':>8} {best_ms(lambda: banner_pattern.storm_layer(w, h)):>9.1f} "
+              f"{'-':>9}  mean alpha {mean:.2f} (CSS {expected:.2f})")
+
+    if failed:
+        print("❌ A vectorized pattern differs from its reference")
+        sys.exit(1)
+    print(f"✅ Sheen within {SHEEN_TOLERANCE} of the blurred lines, storm coverage as in CSS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Load test: / latency while a flood of unique OG banners is requested
+Each flood client asks for a new banner size every time, so every request
+is a miss, and connects from its own loopback address, so the per-client
+limit does not hide the global one. With the render queue
+(dragon_og.RenderQueue, DRAGON_OG_RENDER_PROCESSES > 0) renders run in niced
+render processes and excess ones are shed with a cached nearby size, 429 or
+503; with the default of 0 they render and stream in the server's request
+threads. / is measured alone and then during the flood, for both.
+"""
+
+import argparse
+import http.client
+import itertools
+import os
+import re
+import tempfile
+import threading
+import time
+
+from load_test import free_port, print_results, run_level, start_server, stop_server
+
+MODES = [("queue", str(min(os.cpu_count() or 1, 2))), ("in-process", "0")]
+
+
+def flood(port, deadline, counter, outcomes, lock, client=0):
+    def connect():
+        return http.client.HTTPConnection("127.0.0.1", port, timeout=60, source_address=(f"127.0.1.{client + 1}", 0))
+
+    conn = connect()
+    while time.perf_counter() < deadline:
+        size = next(counter)
+        try:
+            conn.request("GET", f"/og/dark/{600 + size % 1000}x{315 + size // 1000}.png?title=Flood")
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            outcome = "error"
+            conn.close()
+            conn = connect()
+        else:
+            outcome = "fallback" if response.getheader("Content-Location") else str(response.status)
+        with lock:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    conn.close()
+
+
+def scrape(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/metrics")
+    text = conn.getresponse().read().decode()
+    conn.close()
+    # name, or name:reason for the rejection counters
+    return {m.group(1) + (f":{m.group(2)}" if m.group(2) else ""): float(m.group(3))
+            for m in re.finditer(r'^(dragon_og_\w+)(?:\{reason="(\w+)"\})? (\S+)$', text, re.M)}
+
+
+def run_mode(processes, args):
+    os.environ["DRAGON_OG_CACHE"] = tempfile.mkdtemp(prefix="bench-queue-")
+    os.environ["DRAGON_OG_RENDER_PROCESSES"] = processes
+    port = free_port()
+    proc = start_server(port, ["--serve", "--workers", "1"])
+    try:
+        # Warm the banner imports and layer caches, then measure / alone
+        flood(port, time.perf_counter() + 1, itertools.count(999_000), {}, threading.Lock())
+        idle = run_level("127.0.0.1", port, "/", args.concurrency, args.seconds)
+
+        outcomes, lock = {}, threading.Lock()
+        deadline = time.perf_counter() + args.seconds
+        counter = itertools.count()
+        clients = [threading.Thread(target=flood, args=(port, deadline, counter, outcomes, lock, i))
+                   for i in range(args.flood)]
+        for client in clients:
+            client.start()
+        busy = run_level("127.0.0.1", port, "/", args.concurrency, args.seconds)
+        for client in clients:
+            client.join()
+        return idle, busy, outcomes, scrape(port)
+    finally:
+        stop_server(proc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test / during a flood of OG banner renders")
+    parser.add_argument("--flood", type=int, default=16, help="clients requesting unique banners")
+    parser.add_argument("--concurrency", type=int, default=4, help="clients requesting /")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"🐉 / under an OG render flood ({args.flood} flood clients, {os.cpu_count()} cores)")
+    for mode, processes in MODES:
+        idle, busy, outcomes, samples = run_mode(processes, args)
+        idle["path"], busy["path"] = "/ idle", "/ flood"
+        print(f"\n  {mode}: banners " + ", ".join(f"{k} {v}" for k, v in sorted(outcomes.items())))
+        print_results([idle, busy])
+        if mode == "queue":
+            started = samples.get("dragon_og_queue_started_total", 0)
+            wait = samples.get("dragon_og_queue_wait_seconds_total", 0) / max(started, 1)
+            print(f"  queue: {started:.0f} renders started, mean wait {wait * 1000:.0f} ms, rejected "
+                  f"{samples.get('dragon_og_rejections_total:queue', 0):.0f} (queue) "
+                  f"{samples.get('dragon_og_rejections_total:client', 0):.0f} (client), "
+                  f"{samples.get('dragon_og_fallbacks_total', 0):.0f} fallbacks")
+        print(f"  / p50 x{busy['p50_ms'] / idle['p50_ms']:.1f}, p99 x{busy['p99_ms'] / idle['p99_ms']:.1f} during the flood")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Resampling cost of a responsive set: every size straight from the full
+resolution image against the banner_responsive pyramid
+Encoding is left out; both sides produce the same list of sizes. The mean
+absolute difference per channel shows what the pyramid costs in fidelity.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(ROOT), "archive"))
+
+from PIL import Image
+import numpy as np
+
+import banner_responsive
+import generate_banners
+
+SOURCES = [(2400, 1260), (4800, 2520)]
+
+
+def direct(img):
+    out = []
+    for _, width, height in banner_responsive.set_sizes(img.size):
+        scale = min(img.width / width, img.height / height)
+        crop_w, crop_h = width * scale, height * scale
+        left, top = (img.width - crop_w) / 2, (img.height - crop_h) / 2
+        out.append(img.resize((width, height), Image.Resampling.LANCZOS,
+                              box=(left, top, left + crop_w, top + crop_h)))
+    return out
+
+
+def pyramid(img):
+    p = banner_responsive.Pyramid(img)
+    return [p.fill(width, height) for _, width, height in banner_responsive.set_sizes(img.size)]
+
+
+def best_of(fn, img, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(img)
+        times.append(time.perf_counter() - start)
+    return min(times), out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the responsive set pyramid")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"🐉 Responsive set resampling (best of {args.repeat})")
+    print(f"  {'source':<10} {'sizes':>5} {'direct ms':>10} {'pyramid ms':>11} {'speedup':>8} {'mean diff':>10}")
+    for w, h in SOURCES:
+        img = generate_banners.render_banner(w, h, "dark", seed=0)
+        direct_s, expected = best_of(direct, img, args.repeat)
+        pyramid_s, got = best_of(pyramid, img, args.repeat)
+        diff = np.mean([np.abs(np.asarray(a, np.int16) - np.asarray(b, np.int16)).mean()
+                        for a, b in zip(expected, got)])
+        print(f"  {f'{w}x{h}':<10} {len(got):>5} {direct_s * 1000:>10.0f} {pyramid_s * 1000:>11.0f} "
+              f"{direct_s / pyramid_s:>7.1f}x {diff:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
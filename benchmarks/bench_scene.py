@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Scene planner: what each plan keeps, drops and caches, and what a render costs
+"cold" starts with empty layer caches and includes planning; "warm" is a
+render of the same plan once its base image and static layers are cached.
+The batch line renders generate_banners' default jobs in one process and
+counts how often a cached base image or layer was reused.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "archive"))
+
+import banner_scene
+from banner_layers import LAYERS
+
+CASES = [
+    ("dragon", "dark", (1200, 630)),
+    ("dragon", "light", (1200, 630)),
+    ("dragon", "dark", (1920, 1080)),
+    ("earth-dragon", None, (1200, 630)),
+]
+
+BATCH = [("dark", (1200, 630)), ("dark", (1200, 600)), ("light", (1200, 630)), ("dark", (1200, 630))]
+
+
+def cold_and_warm(scene, variant, size, repeat):
+    LAYERS.clear()
+    banner_scene._plan.cache_clear()
+    start = time.perf_counter()
+    banner_scene.render_scene(scene, *size, variant, seed=0)
+    cold = time.perf_counter() - start
+    warm = []
+    for seed in range(repeat):
+        start = time.perf_counter()
+        banner_scene.render_scene(scene, *size, variant, seed=seed)
+        warm.append(time.perf_counter() - start)
+    return cold, min(warm)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the banner scene planner")
+    parser.add_argument("--repeat", type=int, default=10, help="warm renders per case (the best counts)")
+    parser.add_argument("--explain", action="store_true", help="print each render plan")
+    args = parser.parse_args()
+
+    print("🐉 Scene renders, ms")
+    print(f"  {'scene':<22} {'base':>5} {'render':>7} {'dropped':>8} {'cold':>8} {'warm':>7}")
+    for scene, variant, size in CASES:
+        cold, warm = cold_and_warm(scene, variant, size, args.repeat)
+        plan = banner_scene.plan(scene, *size, variant)
+        label = f"{scene}{'-' + variant if variant else ''} {size[0]}x{size[1]}"
+        print(f"  {label:<22} {len(plan.base):>5} {len(plan.steps):>7} {len(plan.dropped):>8} "
+              f"{cold * 1000:>8.1f} {warm * 1000:>7.1f}")
+        if args.explain:
+            print(plan.explain())
+
+    LAYERS.clear()
+    banner_scene._plan.cache_clear()
+    start = time.perf_counter()
+    for variant, size in BATCH:
+        banner_scene.render_scene("dragon", *size, variant, seed=0)
+    elapsed = time.perf_counter() - start
+    stats = LAYERS.stats()
+    reused = {name: stats.get(name, {}).get("hits", 0) for name in ("scene-base", "scene-layer")}
+    print(f"\n  batch of {len(BATCH)} dragon banners: {elapsed * 1000:.1f} ms, "
+          f"{reused['scene-base']} base images and {reused['scene-layer']} layers reused")
+
+
+if __name__ == "__main__":
+    main()
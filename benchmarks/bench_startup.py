@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Cold start of the dragon server: import time and time to the first / response
+Each run is a fresh interpreter that imports the entry point and answers one
+GET / through WSGI. A separate `-X importtime` run gives the per-module
+breakdown. Exits non-zero if the cold-start entry point (dragon_cold with the
+pre-rendered page) takes longer than --target-ms from interpreter start to
+the first response body, interpreter startup itself excluded.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Import plus first response for dragon_cold, in milliseconds
+TARGET_MS = 25.0
+
+# name, module, WSGI callable, pre-rendered page available
+ENTRIES = [
+    ("dragon_server", "dragon_server", "app", True),
+    ("dragon_cold", "dragon_cold", "application", True),
+    ("dragon_cold, no prerender", "dragon_cold", "application", False),
+]
+
+HEAVY_MODULES = ("flask", "jinja2", "werkzeug", "numpy", "PIL")
+
+CHILD = """
+import io, json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+if not {prerendered!r}:
+    sys.modules["dragon_home_page"] = None
+import {module} as entry
+imported = time.perf_counter()
+environ = {{
+    "REQUEST_METHOD": "GET", "PATH_INFO": "/", "QUERY_STRING": "", "SERVER_NAME": "localhost",
+    "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1", "HTTP_HOST": "localhost",
+    "HTTP_ACCEPT_ENCODING": "gzip", "wsgi.version": (1, 0), "wsgi.url_scheme": "http",
+    "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr, "wsgi.multithread": False,
+    "wsgi.multiprocess": False, "wsgi.run_once": True,
+}}
+statuses = []
+body = b"".join(entry.{app}(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+done = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - start) * 1000, "first_response_ms": (done - start) * 1000,
+                  "status": statuses[0], "bytes": len(body),
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def child_source(module, app, prerendered):
+    return CHILD.format(root=ROOT, module=module, app=app, prerendered=prerendered, heavy=HEAVY_MODULES)
+
+
+def run_child(source, *flags):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *flags, "-c", source], capture_output=True, text=True, check=True)
+    return (time.perf_counter() - start) * 1000, proc
+
+
+def import_breakdown(source, module, top):
+    """-X importtime for the entry module and its slowest direct imports, as (cumulative ms, name)"""
+    _, proc = run_child(source, "-X", "importtime")
+    children = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        row = (int(cumulative) / 1000, name.strip())
+        # importtime prints an import's own imports before it
+        if depth == 0 and row[1] == module:
+            return [row] + sorted(children, reverse=True)[:top]
+        if depth == 0:
+            children = []
+        elif depth == 1:
+            children.append(row)
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dragon server cold start")
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per entry point")
+    parser.add_argument("--top", type=int, default=6, help="imports to list per entry point")
+    parser.add_argument("--target-ms", type=float, default=TARGET_MS)
+    args = parser.parse_args()
+
+    subprocess.run([sys.executable, os.path.join(ROOT, "dragon_page.py")], check=True, capture_output=True)
+    interpreter = statistics.median(run_child("pass")[0] for _ in range(args.runs))
+    print(f"🐉 Cold start, median of {args.runs} fresh interpreters (bare interpreter {interpreter:.1f} ms)")
+    print(f"  {'entry point':<27} {'import':>8} {'first /':>9} {'process':>9}  heavy modules loaded")
+
+    results = {}
+    for name, module, app, prerendered in ENTRIES:
+        source = child_source(module, app, prerendered)
+        runs = []
+        for _ in range(args.runs):
+            wall, proc = run_child(source)
+            runs.append(dict(json.loads(proc.stdout), wall_ms=wall))
+        if runs[0]["status"] != "200 OK":
+            raise SystemExit(f"❌ {name}: GET / answered {runs[0]['status']}")
+        result = results[name] = {key: statistics.median(r[key] for r in runs)
+                                  for key in ("import_ms", "first_response_ms", "wall_ms")}
+        print(f"  {name:<27} {result['import_ms']:>6.1f}ms {result['first_response_ms']:>7.1f}ms "
+              f"{result['wall_ms']:>7.1f}ms  {', '.join(runs[0]['heavy']) or '-'}")
+
+    for name, module, app, prerendered in ENTRIES:
+        print(f"\n  -X importtime, {name}")
+        breakdown = import_breakdown(child_source(module, app, prerendered), module, args.top)
+        for depth, (cumulative, imported) in enumerate(breakdown):
+            print(f"    {cumulative:>8.1f} ms  {'  ' if depth else ''}{imported}")
+
+    cold = results["dragon_cold"]["first_response_ms"]
+    print(f"\n  dragon_cold first response {cold:.1f} ms, target {args.target_ms:.0f} ms "
+          f"({results['dragon_server']['first_response_ms'] / cold:.1f}x faster than dragon_server)")
+    if cold > args.target_ms:
+        print("❌ Cold start is over target")
+        sys.exit(1)
+    print("✅ Within target")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Streamed OG banner misses: time to first byte against a buffered render
+Every miss asks for a new title, so each one renders. "headers" is when the
+response headers arrive and "first IDAT" when image data starts; a buffered
+response could send neither before the whole PNG was encoded, which is the
+"buffered" column (dragon_og.render_png in this process). The streamed PNGs
+must decode to the buffered render's pixels (exits non-zero if not), and
+the encoder's peak memory is compared for both paths.
+"""
+
+import argparse
+import http.client
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "archive"))
+
+import numpy as np
+from PIL import Image
+
+import dragon_og
+from load_test import free_port, start_server, stop_server
+
+SIZES = [(1200, 630), (1920, 1080)]
+
+
+def fetch(port, path):
+    """(seconds to headers, seconds to the first IDAT byte, seconds to the end, body, headers)"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    start = time.perf_counter()
+    conn.request("GET", path)
+    response = conn.getresponse()
+    headers_at = time.perf_counter()
+    body = b""
+    idat_at = None
+    while True:
+        chunk = response.read1(64 * 1024)
+        if not chunk:
+            break
+        body += chunk
+        if idat_at is None and b"IDAT" in body:
+            idat_at = time.perf_counter()
+    end = time.perf_counter()
+    conn.close()
+    if response.status != 200:
+        raise SystemExit(f"❌ {path} answered {response.status}")
+    return headers_at - start, idat_at - start, end - start, body, response.headers
+
+
+def peak_kib(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamed OG banner responses")
+    parser.add_argument("--repeat", type=int, default=3, help="misses per size (the median counts)")
+    args = parser.parse_args()
+
+    os.environ["DRAGON_OG_CACHE"] = tempfile.mkdtemp(prefix="bench-stream-")
+    port = free_port()
+    proc = start_server(port, ["--serve", "--workers", "1"])
+    font_path = dragon_og.resolve_font_path()
+    failed = False
+    try:
+        # The first request pays for the imports
+        fetch(port, "/og/dark/200x200.png?title=warmup")
+        print("🐉 OG banner misses, ms (median)")
+        print(f"  {'size':>10} {'headers':>8} {'first IDAT':>11} {'streamed':>9} {'buffered':>9} {'hit':>6}  encoding")
+        for w, h in SIZES:
+            rows = []
+            for i in range(args.repeat):
+                title = f"Streamed banner {w}x{h} #{i}"
+                path = f"/og/dark/{w}x{h}.png?" + urllib.parse.urlencode({"title": title})
+                headers_s, idat_s, total_s, body, response_headers = fetch(port, path)
+                hit_s = fetch(port, path)[2]
+                start = time.perf_counter()
+                buffered = dragon_og.render_png("dark", w, h, title, font_path)
+                buffered_s = time.perf_counter() - start
+                streamed_pixels = np.asarray(Image.open(io.BytesIO(body)).convert("RGBA"))
+                failed |= not np.array_equal(streamed_pixels, np.asarray(Image.open(io.BytesIO(buffered)).convert("RGBA")))
+                rows.append((headers_s, idat_s, total_s, buffered_s, hit_s))
+            median = np.median(np.array(rows), axis=0) * 1000
+            encoding = response_headers.get("Transfer-Encoding", f"{response_headers.get('Content-Length')} bytes")
+            print(f"  {f'{w}x{h}':>10} {median[0]:>8.1f} {median[1]:>11.1f} {median[2]:>9.1f} "
+                  f"{median[3]:>9.1f} {median[4]:>6.1f}  {encoding}")
+    finally:
+        stop_server(proc)
+
+    encoder = dragon_og.load_encoder()
+    print(f"\n  encoder peak memory, KiB ({dragon_og.PNG_PRESET} preset, rendered image excluded)")
+    for w, h in SIZES:
+        img = dragon_og.load_generator().render_banner(w, h, "dark", seed=0)
+        buffered = peak_kib(lambda: encoder.encode_png(img, dragon_og.PNG_PRESET))
+        streamed = peak_kib(lambda: max(len(c) for c in encoder.stream_png(lambda: img, dragon_og.PNG_PRESET)))
+        print(f"  {f'{w}x{h}':>10} buffered {buffered:>8,.0f}  streamed {streamed:>8,.0f}")
+
+    if failed:
+        print("❌ A streamed banner differs from the buffered render")
+        sys.exit(1)
+    print("✅ Streamed banners decode to the buffered pixels")
+
+
+if __name__ == "__main__":
+    main()
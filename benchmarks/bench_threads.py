@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Single-banner latency against the number of layer threads (banner_scene)
+"cold" is the on-demand case: empty layer caches, so every layer of the
+plan is drawn; "warm" reuses the cached base image and only draws the
+per-render layers. Each thread count renders the same banners, which must
+come out pixel-identical to the single-threaded ones (exits non-zero if
+not). Threads only help where layers can overlap: on one core the numbers
+show the executor's overhead instead.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "archive"))
+
+import numpy as np
+
+import banner_scene
+from banner_layers import LAYERS
+
+CASES = [
+    ("dragon", "dark", (1200, 630)),
+    ("dragon", "light", (1920, 1080)),
+    ("dragon", "dark", (3840, 2016)),
+    ("earth-dragon", None, (1200, 630)),
+]
+
+
+def render(scene, variant, size, threads, cold):
+    if cold:
+        LAYERS.clear()
+    start = time.perf_counter()
+    img = banner_scene.render_scene(scene, *size, variant, seed=0, threads=threads)
+    return time.perf_counter() - start, img
+
+
+def best(scene, variant, size, threads, cold, repeat):
+    times, img = [], None
+    for _ in range(repeat):
+        elapsed, img = render(scene, variant, size, threads, cold)
+        times.append(elapsed)
+    return min(times), np.asarray(img)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark banner latency against layer threads")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=5, help="renders per measurement (the best counts)")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"🐉 Banner latency vs layer threads, ms (best of {args.repeat}, {os.cpu_count()} cores)")
+    print(f"  {'scene':<24} {'':<5}" + "".join(f" {f'{n} thr':>8}" for n in args.threads) + "  speedup")
+    for scene, variant, size in CASES:
+        label = f"{scene}{'-' + variant if variant else ''} {size[0]}x{size[1]}"
+        for cold in (True, False):
+            banner_scene.render_scene(scene, *size, variant, seed=0)
+            row, reference, times = "", None, []
+            for threads in args.threads:
+                elapsed, pixels = best(scene, variant, size, threads, cold, args.repeat)
+                if reference is None:
+                    reference = pixels
+                elif not np.array_equal(reference, pixels):
+                    failed = True
+                times.append(elapsed)
+                row += f" {elapsed * 1000:>8.1f}"
+            speedup = times[0] / min(times)
+            print(f"  {label:<24} {'cold' if cold else 'warm':<5}{row}  {speedup:>6.2f}x")
+
+    if failed:
+        print("❌ Threaded renders differ from single-threaded ones")
+        sys.exit(1)
+    print("✅ Same pixels at every thread count")
+
+
+if __name__ == "__main__":
+    main()
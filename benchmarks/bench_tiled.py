@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Peak memory and wall time of strip rendering (banner_tiled) against a
+full-frame render_banner() + Image.save(), from OG size up to print size
+Each measurement runs in a fresh child process. Full-frame renders above
+--full-max-pixels are skipped: at 16K they need several GiB. Both render with
+the exact glow blur, which is what strips reproduce. Exits non-zero if the two
+ever produce different pixels.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(ROOT), "archive"))
+
+import memory
+
+SIZES = ["1200x630", "3840x2016", "16384x8602"]
+
+
+def measure(mode, size, out_path, strip_rows):
+    """Run in a child process: render one banner to out_path, sampling peak RSS"""
+    import banner_tiled
+    import generate_banners
+
+    width, height = size
+    memory.reset_peak()
+    before = memory.rss_kb()
+    start = time.perf_counter()
+    if mode == "full":
+        generate_banners.render_banner(width, height, "dark", seed=0).save(out_path, "PNG", compress_level=6)
+    else:
+        banner_tiled.render_banner_tiled(width, height, out_path, "dark", seed=0, strip_rows=strip_rows or None)
+    return {
+        "ms": (time.perf_counter() - start) * 1000,
+        "peak_delta_kb": memory.peak_rss_kb() - before,
+        "bytes": os.path.getsize(out_path),
+    }
+
+
+def run_child(mode, size, out_path, strip_rows):
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", mode, f"{size[0]}x{size[1]}", out_path, str(strip_rows)],
+        capture_output=True, text=True, check=True, env=dict(os.environ, BANNER_BLUR_QUALITY="exact"),
+    )
+    return json.loads(out.stdout)
+
+
+def same_pixels(a_path, b_path):
+    from PIL import Image
+    import numpy as np
+    with Image.open(a_path) as a, Image.open(b_path) as b:
+        return np.array_equal(np.asarray(a), np.asarray(b))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark strip rendering memory")
+    parser.add_argument("--sizes", nargs="+", default=SIZES)
+    parser.add_argument("--strip-rows", type=int, default=0, help="rows per strip (default: sized by width)")
+    parser.add_argument("--full-max-pixels", type=int, default=40_000_000,
+                        help="skip full-frame renders larger than this")
+    parser.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, size, out_path, strip_rows = args.child
+        print(json.dumps(measure(mode, tuple(map(int, size.split("x"))), out_path, int(strip_rows))))
+        return
+
+    failed = False
+    strips = f"{args.strip_rows}-row strips" if args.strip_rows else "width-sized strips"
+    print(f"🐉 Strip rendering benchmark ({strips}, dark variant, seed 0)")
+    print(f"  {'size':<12} {'mode':<6} {'seconds':>8} {'peak MiB':>9} {'MiB/frame':>10} {'PNG bytes':>12} {'same':>5}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.sizes:
+            size = tuple(map(int, name.split("x")))
+            frame_mib = size[0] * size[1] * 4 / 2**20
+            paths = {mode: os.path.join(tmp, f"{name}-{mode}.png") for mode in ("full", "tiled")}
+            results = {}
+            for mode in ("full", "tiled"):
+                if mode == "full" and size[0] * size[1] > args.full_max_pixels:
+                    print(f"  {name:<12} {mode:<6} {'skipped':>8} {'':>9} {frame_mib:>10.1f}")
+                    continue
+                results[mode] = run_child(mode, size, paths[mode], args.strip_rows)
+            same = "-"
+            if len(results) == 2:
+                match = same_pixels(paths["full"], paths["tiled"])
+                failed |= not match
+                same = "yes" if match else "NO"
+            for mode, r in results.items():
+                print(f"  {name:<12} {mode:<6} {r['ms'] / 1000:>8.2f} {r['peak_delta_kb'] / 1024:>9.1f} "
+                      f"{frame_mib:>10.1f} {r['bytes']:>12,} {same if mode == 'tiled' else '':>5}")
+
+    if failed:
+        print("❌ Strip rendering differs from the full-frame render")
+        sys.exit(1)
+    print("✅ Strip rendering matches the full-frame render")
+
+
+if __name__ == "__main__":
+    main()
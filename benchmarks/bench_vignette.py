@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Fast (separable) vignette against Pillow's full-canvas GaussianBlur
+Exits non-zero if any case differs by more than banner_layers.VIGNETTE_TOLERANCE.
+"""
+
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "archive"))
+
+import numpy as np
+
+import banner_layers
+
+# (width, height, radius, strength, inset); the first two are what the generators draw today
+CASES = [
+    (1200, 630, 100, 0.3, 0),
+    (1200, 630, 120, 0.45, 0),
+    (1200, 630, 100, 0.3, 40),
+    (1200, 630, 120, 0.45, 60),
+    (600, 315, 20, 1.0, 10),
+    (1200, 630, 300, 0.8, 250),
+    (3840, 2016, 100, 0.6, 150),
+]
+
+
+def best_ms(fn, number=3):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1000
+
+
+def main():
+    failed = False
+    print("🐉 Vignette: exact GaussianBlur vs fast separable profile")
+    print(f"  {'size':>10} {'radius':>6} {'inset':>5} {'exact ms':>9} {'fast ms':>8} {'max diff':>8}")
+    for w, h, radius, strength, inset in CASES:
+        exact = banner_layers.vignette_layer(w, h, radius, strength, inset, quality="exact")
+        fast = banner_layers.vignette_layer(w, h, radius, strength, inset, quality="fast")
+        diff = int(np.abs(np.asarray(exact).astype(np.int16) - np.asarray(fast)).max())
+        failed |= diff > banner_layers.VIGNETTE_TOLERANCE
+        exact_ms = best_ms(lambda: banner_layers.vignette_layer(w, h, radius, strength, inset, quality="exact"))
+        fast_ms = best_ms(lambda: banner_layers.vignette_layer(w, h, radius, strength, inset, quality="fast"))
+        print(f"  {f'{w}x{h}':>10} {radius:>6} {inset:>5} {exact_ms:>9.1f} {fast_ms:>8.1f} {diff:>8}")
+
+    if failed:
+        print(f"❌ Fast vignette differs by more than {banner_layers.VIGNETTE_TOLERANCE}")
+        sys.exit(1)
+    print(f"✅ All cases within {banner_layers.VIGNETTE_TOLERANCE} of the exact blur")
+
+
+if __name__ == "__main__":
+    main()
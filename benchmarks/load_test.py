@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Load test for dragon_server.py
+Reports throughput and p50/p99 latency for / and /status at several
+concurrency levels, using keep-alive connections like a browser or proxy.
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def client_loop(host, port, path, deadline, latencies, errors, headers):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+            if response.getheader("Connection", "").lower() == "close":
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=10)
+        except (OSError, http.client.HTTPException):
+            errors.append("conn")
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run_level(host, port, path, concurrency, seconds, headers=None):
+    """Run concurrency clients against path for seconds; return a result dict"""
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=client_loop, args=(host, port, path, deadline, latencies, errors, headers or {}))
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(host, port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"❌ Server did not come up on {host}:{port}")
+
+
+def start_server(port, server_args):
+    command = [sys.executable, os.path.join(ROOT, "dragon_server.py"), "--host", "127.0.0.1",
+               "--port", str(port)] + server_args
+    proc = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for("127.0.0.1", port)
+    return proc
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=35)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def print_results(results):
+    print(f"  {'path':<10} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for r in results:
+        print(f"  {r['path']:<10} {r['concurrency']:>5} {r['rps']:>9,.0f} "
+              f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test dragon_server.py")
+    parser.add_argument("--url", help="test an already running server instead of starting one")
+    parser.add_argument("--paths", default="/,/status")
+    parser.add_argument("--concurrency", default="1,8,32,64", help="comma-separated client counts")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each level")
+    parser.add_argument("--gzip", action="store_true", help="send Accept-Encoding: gzip")
+    parser.add_argument("server_args", nargs="*",
+                        help="extra dragon_server.py arguments (default: --serve); put them after --")
+    args = parser.parse_args()
+
+    proc = None
+    if args.url:
+        parsed = urllib.parse.urlsplit(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        server_args = args.server_args or ["--serve"]
+        print(f"🐉 Starting dragon_server.py {' '.join(server_args)} on port {port}")
+        proc = start_server(port, server_args)
+
+    headers = {"Accept-Encoding": "gzip"} if args.gzip else {}
+    results = []
+    try:
+        for path in args.paths.split(","):
+            for concurrency in [int(c) for c in args.concurrency.split(",")]:
+                results.append(run_level(host, port, path, concurrency, args.seconds, headers))
+    finally:
+        if proc is not None:
+            stop_server(proc)
+
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
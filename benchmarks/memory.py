@@ -0,0 +1,46 @@
+"""
+Peak memory helpers for the benchmarks
+Pillow and NumPy buffers are allocated outside tracemalloc's view, so peak
+resident set size is what gets measured.
+"""
+
+import resource
+import sys
+
+
+def _status_kb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def rss_kb():
+    """Current resident set size in KiB (peak so far where /proc is unavailable)"""
+    current = _status_kb("VmRSS")
+    return current if current is not None else peak_rss_kb()
+
+
+def reset_peak():
+    """Reset the kernel's peak-RSS counter so the next peak_rss_kb() covers only what follows
+
+    Returns False where that is not supported (non-Linux, old kernels).
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kb():
+    peak = _status_kb("VmHWM")
+    if peak is not None:
+        return peak
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss // 1024 if sys.platform == "darwin" else maxrss
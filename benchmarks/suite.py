@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Benchmark and golden-image regression suite for the Python entry points
+Render cases (generate_banners across a size matrix, the earth banner and
+the translucent variants) record render time, encode time, peak RSS growth
+and PNG bytes; server cases record cold, p50/p99 latency and requests/sec
+for the dragon_server.py routes through Flask's test client. Every case
+runs in a fresh child process.
+
+Results are compared with benchmarks/baselines.json and each render is
+checked against a thumbnail in benchmarks/golden/ (PSNR and the worst 8x8
+block difference, so a changed pixel here and there passes but changed
+artwork does not). A case that regresses is run once more and the better
+of the two results counts. Exits non-zero on a regression or a golden
+mismatch.
+
+    python benchmarks/suite.py                  # compare with the baselines
+    python benchmarks/suite.py --quick          # sizes up to 1200x630 only
+    python benchmarks/suite.py --update         # record new baselines and goldens
+
+Renders are cold (layer and font caches cleared each time) with grain seed 0
+and the "balanced" PNG preset; timings are the best of --repeat runs.
+"""
+
+import argparse
+import fnmatch
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+ARCHIVE_DIR = os.path.join(ROOT, "archive")
+sys.path.insert(0, ARCHIVE_DIR)
+
+import memory
+
+BASELINES_PATH = os.path.join(BENCH_DIR, "baselines.json")
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+
+SIZES = [(600, 315), (1200, 630), (1920, 1080), (3840, 2160)]
+QUICK_PIXELS = 1200 * 630
+PRESET = "balanced"
+SERVER_PATHS = {
+    "server-home": "/",
+    "server-status": "/status",
+    "server-public": "/public/robots.txt",
+    "server-og": "/og/dark/1200x630.png",
+}
+
+# metric -> (allowed relative change, absolute change always allowed, higher is better)
+THRESHOLDS = {
+    "render_ms": (0.35, 5, False),
+    "encode_ms": (0.35, 5, False),
+    "peak_mib": (0.20, 4, False),
+    "bytes": (0.02, 0, False),
+    "cold_ms": (0.50, 20, False),
+    "rps": (0.25, 0, True),
+    "p50_ms": (0.30, 0.2, False),
+    "p99_ms": (0.50, 0.5, False),
+}
+
+THUMB_WIDTH = 320
+GOLDEN_MIN_PSNR = 40.0
+GOLDEN_MAX_BLOCK_DIFF = 6.0
+GOLDEN_BLOCK = 8
+
+
+def render_cases(quick=False):
+    cases = {}
+    for variant in ("dark", "light"):
+        for w, h in SIZES:
+            if not quick or w * h <= QUICK_PIXELS:
+                cases[f"banner-{variant}-{w}x{h}"] = {"kind": "banner", "variant": variant, "size": [w, h]}
+    cases["earth-1200x630"] = {"kind": "earth"}
+    cases["translucent"] = {"kind": "translucent"}
+    return cases
+
+
+def all_cases(quick=False):
+    cases = render_cases(quick)
+    cases.update({name: {"kind": "server", "path": path} for name, path in SERVER_PATHS.items()})
+    return cases
+
+
+# Child side: one case per process
+
+def best_of(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def thumbnail(img):
+    from PIL import Image
+    img = img.convert("RGBA")
+    return img.resize((THUMB_WIDTH, max(1, round(img.height * THUMB_WIDTH / img.width))), Image.Resampling.BOX)
+
+
+def measure_render(case, repeat, thumbs_dir):
+    """render -> {name: pixels}, encode pixels -> bytes, as_image pixels -> Image"""
+    import numpy as np
+    from PIL import Image
+
+    import banner_encode
+    from banner_fonts import FONTS
+    from banner_layers import LAYERS
+
+    def cold(render):
+        def run():
+            LAYERS.clear()
+            FONTS.clear()
+            return render()
+        return run
+
+    encode = lambda img: banner_encode.encode_png(img, PRESET, workers=1)
+    as_image = lambda img: img
+    if case["kind"] == "banner":
+        import generate_banners
+        w, h = case["size"]
+        render = lambda: {"": generate_banners.render_banner(w, h, case["variant"], seed=0)}
+    elif case["kind"] == "earth":
+        import generate_earth_dragon_banner
+        render = lambda: {"": generate_earth_dragon_banner.create_earth_dragon_banner(seed=0)}
+    else:
+        import create_translucent_dragons as translucent
+        source = translucent.load_source(os.path.join(ROOT, translucent.SOURCE_PATH))
+        variants = [(path, size, spec) for path, size, spec in translucent.VARIANTS]
+        names = [os.path.splitext(os.path.basename(path))[0].replace("dragon-og-", "").replace("translucent-", "")
+                 .replace("-translucent", "") for path, _, _ in variants]
+        render = lambda: dict(zip(names, translucent.variant_planes(source, variants)))
+        encode = lambda planes: banner_encode.encode_png_planes(*planes, PRESET, workers=1)
+        as_image = lambda planes: Image.fromarray(np.dstack(planes), "RGBA")
+
+    memory.reset_peak()
+    before = memory.rss_kb()
+    render_s, images = best_of(cold(render), repeat)
+    encode_s, blobs = best_of(lambda: [encode(img) for img in images.values()], repeat)
+    peak = memory.peak_rss_kb() - before
+    for name, img in images.items():
+        thumbnail(as_image(img)).save(os.path.join(thumbs_dir, f"{name or 'frame'}.png"))
+    return {
+        "render_ms": render_s * 1000,
+        "encode_ms": encode_s * 1000,
+        "peak_mib": peak / 1024,
+        "bytes": sum(len(b) for b in blobs),
+    }
+
+
+def measure_server(case, seconds, repeat):
+    os.environ.setdefault("DRAGON_OG_CACHE", tempfile.mkdtemp(prefix="suite-og-"))
+    sys.path.insert(0, ROOT)
+    import dragon_server
+
+    client = dragon_server.app.test_client()
+    path = case["path"]
+    start = time.perf_counter()
+    response = client.get(path)
+    response.get_data()
+    cold = time.perf_counter() - start
+    if response.status_code != 200:
+        raise SystemExit(f"{path} answered {response.status_code}")
+    best = None
+    for _ in range(repeat):
+        latencies = []
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            client.get(path).get_data()
+            latencies.append(time.perf_counter() - start)
+        if best is None or sum(latencies) / len(latencies) < sum(best) / len(best):
+            best = latencies
+    best.sort()
+    return {
+        "cold_ms": cold * 1000,
+        "rps": len(best) / sum(best),
+        "p50_ms": best[len(best) // 2] * 1000,
+        "p99_ms": best[min(len(best) - 1, int(len(best) * 0.99))] * 1000,
+    }
+
+
+def run_child(name, case, args, thumbs_dir):
+    command = [sys.executable, __file__, "--child", name, "--repeat", str(args.repeat),
+               "--seconds", str(args.seconds), "--thumbs", thumbs_dir]
+    out = subprocess.run(command, capture_output=True, text=True, cwd=ARCHIVE_DIR)
+    if out.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{out.stderr.strip()}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# Parent side: comparison
+
+def compare_metric(metric, value, baseline):
+    """(change relative to baseline, whether it is a regression)"""
+    relative, floor, higher_is_better = THRESHOLDS[metric]
+    if not baseline:
+        return 0.0, False
+    change = (value - baseline) / baseline
+    worse = -change if higher_is_better else change
+    return change, worse > relative and abs(value - baseline) > floor
+
+
+def better(metric, a, b):
+    return max(a, b) if THRESHOLDS[metric][2] else min(a, b)
+
+
+def perceptual_diff(a, b):
+    """(PSNR in dB, worst mean absolute difference over an 8x8 block) of two RGBA thumbnails"""
+    import numpy as np
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    if a.shape != b.shape:
+        return 0.0, 255.0
+    mse = np.mean((a - b) ** 2)
+    psnr = math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+    diff = np.abs(a - b).mean(axis=2)
+    h, w = (s - s % GOLDEN_BLOCK for s in diff.shape)
+    blocks = diff[:h, :w].reshape(h // GOLDEN_BLOCK, GOLDEN_BLOCK, w // GOLDEN_BLOCK, GOLDEN_BLOCK)
+    return psnr, float(blocks.mean(axis=(1, 3)).max()) if blocks.size else 0.0
+
+
+def check_golden(thumb_path, golden_path):
+    from PIL import Image
+    if not os.path.exists(golden_path):
+        return None, "no golden"
+    with Image.open(thumb_path) as got, Image.open(golden_path) as want:
+        psnr, block = perceptual_diff(got.convert("RGBA"), want.convert("RGBA"))
+    ok = psnr >= GOLDEN_MIN_PSNR and block <= GOLDEN_MAX_BLOCK_DIFF
+    return ok, f"PSNR {psnr:.1f} dB, worst block {block:.1f}"
+
+
+def load_baselines():
+    try:
+        with open(BASELINES_PATH) as f:
+            return json.load(f)
+    except OSError:
+        return {"cases": {}}
+
+
+def machine():
+    return {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark and golden-image regression suite")
+    parser.add_argument("--quick", action="store_true", help=f"only sizes up to {QUICK_PIXELS:,} pixels")
+    parser.add_argument("--cases", default="*", help="glob of case names to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the best counts")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per server measurement run")
+    parser.add_argument("--update", action="store_true", help="store these results as baselines and goldens")
+    parser.add_argument("--json", help="also write the results here")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--thumbs", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        case = all_cases()[args.child]
+        if case["kind"] == "server":
+            result = measure_server(case, args.seconds, args.repeat)
+        else:
+            result = measure_render(case, args.repeat, args.thumbs)
+        print(json.dumps(result))
+        return
+
+    cases = {name: case for name, case in all_cases(args.quick).items() if fnmatch.fnmatch(name, args.cases)}
+    baselines = load_baselines()
+    if baselines.get("machine") and baselines["machine"] != machine():
+        print(f"⚠️  Baselines were recorded on {baselines['machine']}; timings may not compare")
+
+    failures = []
+    results = {}
+    thumbs_root = tempfile.mkdtemp(prefix="suite-thumbs-")
+    print(f"🐉 Benchmark suite: {len(cases)} cases")
+    print(f"  {'case':<26} {'metric':<10} {'value':>12} {'baseline':>12} {'change':>8}")
+    try:
+        for name, case in cases.items():
+            thumbs_dir = os.path.join(thumbs_root, name)
+            os.makedirs(thumbs_dir)
+            try:
+                metrics = run_child(name, case, args, thumbs_dir)
+                base = baselines["cases"].get(name, {})
+                if not args.update and any(compare_metric(m, v, base.get(m))[1] for m, v in metrics.items()):
+                    # Timings on a busy machine are noisy: a regression has to show up twice
+                    again = run_child(name, case, args, thumbs_dir)
+                    metrics = {m: better(m, v, again[m]) for m, v in metrics.items()}
+                results[name] = metrics
+            except RuntimeError as e:
+                print(f"❌ {e}")
+                failures.append(f"{name}: failed to run")
+                continue
+            for metric, value in metrics.items():
+                change, regressed = compare_metric(metric, value, base.get(metric))
+                status = "new" if metric not in base else ("REGRESSED" if regressed else "")
+                base_text = f"{base[metric]:>12,.1f}" if metric in base else f"{'-':>12}"
+                print(f"  {name:<26} {metric:<10} {value:>12,.1f} {base_text} {change:>+7.0%} {status}")
+                if regressed and not args.update:
+                    failures.append(f"{name} {metric}: {value:,.1f} vs {base[metric]:,.1f}")
+            for thumb in sorted(os.listdir(thumbs_dir)):
+                stem = os.path.splitext(thumb)[0]
+                golden_path = os.path.join(GOLDEN_DIR, (name if stem == "frame" else f"{name}-{stem}") + ".png")
+                if args.update:
+                    os.makedirs(GOLDEN_DIR, exist_ok=True)
+                    shutil.copyfile(os.path.join(thumbs_dir, thumb), golden_path)
+                    continue
+                ok, detail = check_golden(os.path.join(thumbs_dir, thumb), golden_path)
+                print(f"  {name:<26} {'golden':<10} {os.path.basename(golden_path)}: {detail}"
+                      + ("" if ok is not False else "  MISMATCH"))
+                if ok is False:
+                    failures.append(f"{name}: artwork changed ({detail})")
+    finally:
+        shutil.rmtree(thumbs_root, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"machine": machine(), "cases": results}, f, indent=2)
+    if args.update:
+        baselines["machine"] = machine()
+        baselines["cases"].update(results)
+        with open(BASELINES_PATH, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"💾 Baselines for {len(results)} cases written to {BASELINES_PATH}")
+        return
+    if failures:
+        print("\n❌ Regressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Cold-start entry point for serverless deployments of the dragon server
+`application` answers GET and HEAD for / straight from the landing page in
+dragon_page, pre-rendered at build time, without importing Flask, Jinja,
+NumPy or Pillow. Any other request imports dragon_server on first use and is
+handed to its app, so those pay the Flask import once per process. Requests
+answered here are not counted in dragon_server's /metrics.
+
+Build step: `python dragon_page.py` writes dragon_home_page.py next to this file.
+"""
+
+import datetime
+
+import dragon_page
+
+home_page = dragon_page.load_home_page()
+
+_app = None
+
+
+def flask_app():
+    """dragon_server.app, imported on first use"""
+    global _app
+    if _app is None:
+        import dragon_server
+        _app = dragon_server.app
+    return _app
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison against an If-None-Match header, as werkzeug's contains_weak"""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"') == etag:
+            return True
+    return False
+
+
+def home(environ, start_response):
+    stamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    encoding = home_page.negotiate(environ.get("HTTP_ACCEPT_ENCODING", ""))
+    etag = home_page.etag(stamp, encoding)
+    headers = [
+        ("Cache-Control", dragon_page.HOME_CACHE_CONTROL),
+        ("Vary", "Accept-Encoding"),
+        ("ETag", f'"{etag}"'),
+    ]
+    if etag_matches(environ.get("HTTP_IF_NONE_MATCH", ""), etag):
+        start_response("304 NOT MODIFIED", headers)
+        return []
+
+    body = home_page.body(stamp, encoding)
+    headers += [("Content-Type", "text/html; charset=utf-8"), ("Content-Length", str(len(body)))]
+    if encoding != "identity":
+        headers.append(("Content-Encoding", encoding))
+    start_response("200 OK", headers)
+    return [] if environ["REQUEST_METHOD"] == "HEAD" else [body]
+
+
+def application(environ, start_response):
+    if environ.get("PATH_INFO") == "/" and environ.get("REQUEST_METHOD") in ("GET", "HEAD"):
+        return home(environ, start_response)
+    return flask_app()(environ, start_response)
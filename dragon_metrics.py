@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics for the dragon server, aggregated across worker processes
+Every process keeps its numbers in its own memory-mapped file in a shared
+directory, and every request thread writes to its own slab of that file, so
+recording a request takes no lock. /metrics reads all the files: counters
+and histograms are summed over every worker that ever ran, gauges (in-flight
+requests, RSS) over the live ones.
+
+Process stats and cache counters are sampled at most once per
+SAMPLE_INTERVAL, at the end of a request, so an idle worker reports the
+values from its last request. DRAGON_METRICS_DIR picks the directory (start
+from an empty one); by default each server start gets a fresh temporary one.
+"""
+
+import atexit
+import bisect
+import gc
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+from flask import Response, request
+
+# Request latency histogram upper bounds, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CODE_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+# Request threads with a slab of their own; any beyond share one slab under a lock
+THREAD_SLABS = 64
+SAMPLE_INTERVAL = 1.0
+
+# Per-route fields in a slab: one counter per status class, then these, then the buckets
+_BYTES, _DURATION, _IN_FLIGHT = range(len(CODE_CLASSES), len(CODE_CLASSES) + 3)
+_BUCKET0 = len(CODE_CLASSES) + 3
+_ROUTE_FIELDS = _BUCKET0 + len(BUCKETS) + 1
+_FILE_RE = re.compile(r"^(\d+)\.metrics$")
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Slab:
+    """One thread's region of the process file; handed back to the pool when the thread ends"""
+
+    __slots__ = ("metrics", "index", "values")
+
+    def __init__(self, metrics, index, values):
+        self.metrics = metrics
+        self.index = index
+        self.values = values
+
+    def __del__(self):
+        self.metrics._release(self.index)
+
+
+class Metrics:
+    """Request counters, byte totals and latency histograms per Flask endpoint, plus sampled process stats
+
+    Create it after every route is registered; it wraps app.wsgi_app. add_sample()
+    registers further sampled values (call it before the first request).
+    """
+
+    def __init__(self, app, directory=None):
+        self.app = app
+        self.routes = sorted(app.view_functions) + ["other"]
+        self._route_index = {name: i for i, name in enumerate(self.routes)}
+        self.directory = directory or os.environ.get("DRAGON_METRICS_DIR") or self._temp_dir()
+        self.samples = []
+        self._pid = None
+        self.add_sample("dragon_process_resident_memory_bytes", "gauge", "Resident set size", _rss_bytes)
+        self.add_sample("dragon_process_cpu_seconds_total", "counter", "CPU time used", time.process_time)
+        for generation in range(3):
+            self.add_sample("dragon_process_gc_collections_total", "counter", "Garbage collector runs",
+                            lambda g=generation: gc.get_stats()[g]["collections"], generation=str(generation))
+        self._local = threading.local()
+        self._pool_lock = threading.Lock()
+        self._shared_lock = threading.Lock()
+        self._sample_lock = threading.Lock()
+        self._next_sample = 0.0
+        self._wsgi_app = app.wsgi_app
+        app.wsgi_app = self.wsgi_app
+        app.before_request(self._tag_endpoint)
+
+    def _temp_dir(self):
+        directory = tempfile.mkdtemp(prefix="dragon-metrics-")
+        owner = os.getpid()
+        # Forked workers inherit this handler; only the process that made the directory removes it
+        atexit.register(lambda: os.getpid() == owner and shutil.rmtree(directory, ignore_errors=True))
+        return directory
+
+    def add_sample(self, name, kind, help, fn, **labels):
+        """Publish fn() as a "counter" (summed over all workers) or "gauge" (per live worker)"""
+        if self._pid is not None:
+            raise RuntimeError("Samples must be added before the first request")
+        self.samples.append((name, kind, help, tuple(sorted(labels.items())), fn))
+
+    @property
+    def slab_size(self):
+        return len(self.routes) * _ROUTE_FIELDS
+
+    def _open(self):
+        """Create this process's file; called again after a fork"""
+        self._pid = os.getpid()
+        count = len(self.samples) + (THREAD_SLABS + 1) * self.slab_size
+        path = os.path.join(self.directory, f"{self._pid}.metrics")
+        with open(path, "wb+") as f:
+            f.truncate(count * 8)
+            self._map = mmap.mmap(f.fileno(), count * 8)
+        self._values = memoryview(self._map).cast("d")
+        self._free = list(range(THREAD_SLABS))
+        self._local = threading.local()
+        self._shared = self._values[len(self.samples) + THREAD_SLABS * self.slab_size:]
+
+    def _release(self, index):
+        if self._pid == os.getpid():
+            with self._pool_lock:
+                self._free.append(index)
+
+    def _slab(self):
+        """This thread's slab, or None if every slab is taken (then the shared one is used)"""
+        if self._pid != os.getpid():
+            with self._pool_lock:
+                if self._pid != os.getpid():
+                    self._open()
+        slab = getattr(self._local, "slab", None)
+        if slab is None:
+            with self._pool_lock:
+                if not self._free:
+                    return None
+                index = self._free.pop()
+            start = len(self.samples) + index * self.slab_size
+            slab = self._local.slab = _Slab(self, index, self._values[start:start + self.slab_size])
+        return slab
+
+    def _tag_endpoint(self):
+        request.environ["dragon.endpoint"] = request.endpoint
+
+    def wsgi_app(self, environ, start_response):
+        slab = self._slab()
+        values = slab.values if slab is not None else self._shared
+        status = []
+
+        def capture(code, headers, exc_info=None):
+            status.append((code, headers))
+            return start_response(code, headers, exc_info)
+
+        self._count_in_flight(values, slab)
+        start = time.perf_counter()
+        try:
+            body = self._wsgi_app(environ, capture)
+        except BaseException:
+            self._finish(values, slab, environ, "500", start, 0)
+            raise
+        code, headers = status[0] if status else ("500", [])
+        length = next((v for k, v in headers if k.lower() == "content-length"), None)
+        if length is not None:
+            self._finish(values, slab, environ, code, start, int(length))
+            return body
+        # Streamed bodies are timed to their last chunk
+        return self._stream(body, values, slab, environ, code, start)
+
+    def _stream(self, body, values, slab, environ, code, start):
+        sent = 0
+        try:
+            for chunk in body:
+                sent += len(chunk)
+                yield chunk
+        finally:
+            close = getattr(body, "close", None)
+            if close is not None:
+                close()
+            self._finish(values, slab, environ, code, start, sent)
+
+    def _count_in_flight(self, values, slab):
+        # Counted before routing, so in-flight requests are all kept under "other"
+        field = self._route_index["other"] * _ROUTE_FIELDS + _IN_FLIGHT
+        if slab is None:
+            with self._shared_lock:
+                values[field] += 1
+        else:
+            values[field] += 1
+
+    def _finish(self, values, slab, environ, code, start, nbytes):
+        seconds = time.perf_counter() - start
+        route = environ.get("dragon.endpoint") or "other"
+        base = self._route_index.get(route, self._route_index["other"]) * _ROUTE_FIELDS
+        code_class = int(code[0]) - 1 if code[:1] in "12345" else 4
+        bucket = bisect.bisect_left(BUCKETS, seconds)
+        if slab is None:
+            self._shared_lock.acquire()
+        try:
+            values[self._route_index["other"] * _ROUTE_FIELDS + _IN_FLIGHT] -= 1
+            values[base + code_class] += 1
+            values[base + _BYTES] += nbytes
+            values[base + _DURATION] += seconds
+            values[base + _BUCKET0 + bucket] += 1
+        finally:
+            if slab is None:
+                self._shared_lock.release()
+        now = time.monotonic()
+        if now >= self._next_sample:
+            self.sample(now)
+
+    def sample(self, now=None):
+        """Write this process's sampled values to its file"""
+        if self._pid != os.getpid() or not self._sample_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_sample = (now or time.monotonic()) + SAMPLE_INTERVAL
+            for i, (*_, fn) in enumerate(self.samples):
+                self._values[i] = fn()
+        finally:
+            self._sample_lock.release()
+
+    def _read(self):
+        """[(pid, alive, values)] for every process file in the directory"""
+        out = []
+        for name in os.listdir(self.directory):
+            match = _FILE_RE.match(name)
+            if not match:
+                continue
+            pid = int(match.group(1))
+            try:
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            values = memoryview(data[:len(data) // 8 * 8]).cast("d")
+            if len(values) < len(self.samples) + self.slab_size:
+                continue
+            out.append((pid, _alive(pid), values))
+        return out
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        self._slab()
+        self.sample()
+        processes = self._read()
+        nslabs = THREAD_SLABS + 1
+        offset = len(self.samples)
+        size = self.slab_size
+        totals = [0.0] * size
+        in_flight = 0.0
+        for _, alive, values in processes:
+            for s in range(nslabs):
+                slab = values[offset + s * size:offset + (s + 1) * size]
+                for i, v in enumerate(slab):
+                    if v:
+                        totals[i] += v
+            if alive:
+                in_flight += sum(values[offset + s * size + self._route_index["other"] * _ROUTE_FIELDS + _IN_FLIGHT]
+                                 for s in range(nslabs))
+
+        lines = []
+
+        def header(name, kind, help):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        header("dragon_http_requests_total", "counter", "Requests handled, by route and status class")
+        for r, route in enumerate(self.routes):
+            for c, code in enumerate(CODE_CLASSES):
+                if totals[r * _ROUTE_FIELDS + c]:
+                    lines.append(f'dragon_http_requests_total{{route="{route}",code="{code}"}} '
+                                 f"{_num(totals[r * _ROUTE_FIELDS + c])}")
+        header("dragon_http_response_bytes_total", "counter", "Response body bytes, by route")
+        for r, route in enumerate(self.routes):
+            lines.append(f'dragon_http_response_bytes_total{{route="{route}"}} {_num(totals[r * _ROUTE_FIELDS + _BYTES])}')
+        header("dragon_http_request_duration_seconds", "histogram", "Request latency, by route")
+        for r, route in enumerate(self.routes):
+            base = r * _ROUTE_FIELDS
+            cumulative = 0.0
+            for b, bound in enumerate(BUCKETS + (float("inf"),)):
+                cumulative += totals[base + _BUCKET0 + b]
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'dragon_http_request_duration_seconds_bucket{{route="{route}",le="{le}"}} '
+                             f"{_num(cumulative)}")
+            lines.append(f'dragon_http_request_duration_seconds_sum{{route="{route}"}} {totals[base + _DURATION]!r}')
+            lines.append(f'dragon_http_request_duration_seconds_count{{route="{route}"}} {_num(cumulative)}')
+        header("dragon_http_requests_in_flight", "gauge", "Requests being handled by live workers")
+        lines.append(f"dragon_http_requests_in_flight {_num(in_flight)}")
+        header("dragon_workers", "gauge", "Live worker processes")
+        lines.append(f"dragon_workers {sum(alive for _, alive, _ in processes)}")
+
+        families = {}
+        for i, (name, kind, help, labels, _) in enumerate(self.samples):
+            families.setdefault(name, []).append((i, kind, help, labels))
+        for name, family in families.items():
+            header(name, family[0][1], family[0][2])
+            for i, kind, _, labels in family:
+                self._render_sample(lines, processes, name, i, kind, labels)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_sample(lines, processes, name, i, kind, labels):
+        """Counters summed over every process file, gauges one line per live worker"""
+        label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+        if kind == "counter":
+            total = sum(values[i] for _, _, values in processes)
+            lines.append(f"{name}{{{label_text}}} {_num(total)}" if label_text else f"{name} {_num(total)}")
+            return
+        for pid, alive, values in processes:
+            if alive:
+                pid_labels = ",".join(filter(None, (label_text, f'pid="{pid}"')))
+                lines.append(f"{name}{{{pid_labels}}} {_num(values[i])}")
+
+    def response(self):
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _num(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+On-demand OG banner rendering for the dragon server
+Rendered PNGs live in a bounded in-memory LRU backed by a content-addressed
+disk cache, and concurrent misses for the same banner share a single render.
+A miss can also be streamed: the PNG is sent as it is encoded and written
+to the disk cache on the way. Or it can be queued for a pool of render
+processes: the queue is bounded and sheds load instead of growing, so a
+burst of unique banners cannot starve the server's cheap routes.
+"""
+
+import hashlib
+import heapq
+import itertools
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_DIR = os.path.join(ROOT_DIR, "archive")
+DEFAULT_CACHE_DIR = os.environ.get("DRAGON_OG_CACHE", os.path.join(ROOT_DIR, ".cache", "og"))
+
+VARIANTS = ("dark", "light")
+MIN_SIZE, MAX_SIZE = 100, 4096
+MAX_TITLE_LENGTH = 80
+# PNG encoder preset for on-demand renders (archive/banner_encode.py)
+PNG_PRESET = os.environ.get("DRAGON_OG_PRESET", "balanced")
+# Threads drawing one banner's layers: an on-demand render is waited on by its request
+LAYER_THREADS = int(os.environ.get("DRAGON_OG_LAYER_THREADS", min(os.cpu_count() or 1, 4)))
+# Render processes per server worker, renders that may wait for one, and renders one
+# client may have waiting or running. With 0, the default, misses render in the
+# request thread and are streamed as they are encoded; the queue is opt-in
+RENDER_PROCESSES = int(os.environ.get("DRAGON_OG_RENDER_PROCESSES", 0))
+RENDER_QUEUE = int(os.environ.get("DRAGON_OG_RENDER_QUEUE", 16))
+RENDER_PER_CLIENT = int(os.environ.get("DRAGON_OG_RENDER_PER_CLIENT", 2))
+# Seconds a request waits for its queued render before it is shed
+RENDER_TIMEOUT = float(os.environ.get("DRAGON_OG_RENDER_TIMEOUT", 10))
+# Render processes run at this niceness, so request handling wins a busy CPU
+RENDER_NICE = 10
+# Environment settings of archive/banner_layers.py that change a render's bytes
+RENDER_SETTINGS = ("BANNER_VIGNETTE_QUALITY", "BANNER_BLUR_QUALITY", "BANNER_GRAIN_TEXTURE")
+
+
+def load_generator():
+    """Import archive/generate_banners.py; PIL and numpy are only loaded here"""
+    if ARCHIVE_DIR not in sys.path:
+        sys.path.insert(0, ARCHIVE_DIR)
+    import generate_banners
+    return generate_banners
+
+
+def load_encoder():
+    load_generator()
+    import banner_encode
+    return banner_encode
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by total value size in bytes"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._items[key] = (value, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.size -= evicted
+
+    def keys(self):
+        with self._lock:
+            return list(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class SingleFlight:
+    """Run fn once per key; concurrent callers for that key wait for its result"""
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def do_iter(self, key, chunks, follow):
+        """Yield from chunks() for the first caller for key; concurrent callers
+        wait until it is done (or abandoned) and then yield from follow()"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+        if not leader:
+            call.done.wait()
+            yield from follow()
+            return
+        try:
+            yield from chunks()
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class DiskCache:
+    """Content-addressed PNG store: keys/<key hash> names an objects/<content hash>.png"""
+
+    def __init__(self, root):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+
+    def _key_path(self, key_hash):
+        return os.path.join(self.root, "keys", key_hash[:2], key_hash)
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest + ".png")
+
+    def _write_atomic(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def get(self, key_hash):
+        try:
+            with open(self._key_path(key_hash)) as f:
+                digest = f.read().strip()
+            with open(self._object_path(digest), "rb") as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return digest, data
+
+    def put(self, key_hash, digest, data):
+        if not os.path.exists(self._object_path(digest)):
+            self._write_atomic(self._object_path(digest), data)
+        self._write_atomic(self._key_path(key_hash), (digest + "\n").encode())
+
+    def put_stream(self, key_hash, chunks):
+        """Pass chunks through while writing them as the entry for key_hash
+
+        The entry only appears once every chunk has been written; if the
+        stream fails or is closed early, nothing is stored. The key's lock is
+        only held to publish the entry, never while the chunks are consumed.
+        """
+        tmp_dir = os.path.join(self.root, "objects")
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=tmp_dir, prefix=".tmp-")
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    digest.update(chunk)
+                    yield chunk
+            with self.lock(key_hash):
+                path = self._object_path(digest.hexdigest())
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp, path)
+                tmp = None
+                self._write_atomic(self._key_path(key_hash), (digest.hexdigest() + "\n").encode())
+        except BaseException:
+            if tmp is not None:
+                os.unlink(tmp)
+            raise
+
+    def lock(self, key_hash):
+        """Cross-process lock so sibling workers do not render the same key twice"""
+        return _FileLock(os.path.join(self.root, "locks", key_hash[:2], key_hash + ".lock"))
+
+
+class _FileLock:
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+
+
+_font_path = None
+
+
+def resolve_font_path():
+    """Font file the generator resolves on this host; part of every cache key"""
+    global _font_path
+    if _font_path is None:
+        _font_path = load_generator().find_font_path() or ""
+    return _font_path
+
+
+def render_png(variant, width, height, title, font_path, preset=PNG_PRESET):
+    generator = load_generator()
+    img = generator.render_banner(width, height, variant, title=title or generator.DEFAULT_TITLE,
+                                  font_path=font_path or None, seed=0, threads=LAYER_THREADS)
+    return load_encoder().encode_png(img, preset)
+
+
+def stream_png(variant, width, height, title, font_path, preset=PNG_PRESET):
+    """render_png as an iterator of PNG chunks; the signature comes out before the render starts"""
+    generator = load_generator()
+    return load_encoder().stream_png(
+        lambda: generator.render_banner(width, height, variant, title=title or generator.DEFAULT_TITLE,
+                                        font_path=font_path or None, seed=0, threads=LAYER_THREADS),
+        preset)
+
+
+def _start_render_process():
+    os.nice(RENDER_NICE)
+    load_encoder()
+
+
+def _render_job(cache_dir, key_hash, key):
+    """Render key into the disk cache, in a render process: (content hash, png bytes, rendered)"""
+    disk = DiskCache(cache_dir)
+    with disk.lock(key_hash):
+        entry = disk.get(key_hash)
+        if entry is not None:
+            return entry + (False,)
+        data = render_png(*key)
+        entry = (hashlib.sha256(data).hexdigest(), data)
+        disk.put(key_hash, *entry)
+    return entry + (True,)
+
+
+class QueueFull(Exception):
+    """A render was refused or given up on: reason is "queue", "client" or "timeout",
+    retry_after a guess in seconds"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"render refused ({reason} limit), retry after {retry_after} s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RenderQueue:
+    """Bounded queue of renders feeding a pool of render processes
+
+    At most `processes` renders run at once and up to max_queue more wait,
+    smallest banner first. A client may have max_per_client renders waiting
+    or running. submit() raises QueueFull past either limit instead of
+    waiting; requests for a key already queued share its render. The pool
+    starts on first use, so forked server workers each get their own.
+    Its processes start (forkserver or spawn) by re-running the script that
+    started the server as __mp_main__, so that script must do no more than
+    import when run under that name (dragon_server.create_app).
+    """
+
+    class _Job:
+        def __init__(self, key, key_hash):
+            self.key = key
+            self.key_hash = key_hash
+            self.clients = []
+            self.future = Future()
+            self.queued_at = time.perf_counter()
+            self.started_at = None
+
+    def __init__(self, cache_dir, processes, max_queue=RENDER_QUEUE,
+                 max_per_client=RENDER_PER_CLIENT, done=None):
+        self.cache_dir = cache_dir
+        self.processes = processes
+        self.max_queue = max_queue
+        self.max_per_client = max_per_client
+        self.done = done
+        self.running = 0
+        self.renders = 0
+        self.started = 0
+        self.wait_seconds = 0.0
+        self.rejected = Counter()
+        # Moving average of a render's duration, for Retry-After
+        self.render_seconds = 0.5
+        self._heap = []
+        self._jobs = {}
+        self._clients = Counter()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def submit(self, key, key_hash, client):
+        """Future for (content hash, png bytes) of key = (variant, width, height, ...)"""
+        with self._lock:
+            job = self._jobs.get(key)
+            reason = None
+            if self._clients[client] >= self.max_per_client:
+                reason = "client"
+            elif job is None and len(self._heap) >= self.max_queue:
+                reason = "queue"
+            if reason is not None:
+                self.rejected[reason] += 1
+                raise QueueFull(reason, self._retry_after())
+            if job is None:
+                job = self._jobs[key] = self._Job(key, key_hash)
+                heapq.heappush(self._heap, (key[1] * key[2], next(self._order), job))
+            job.clients.append(client)
+            self._clients[client] += 1
+        self._dispatch()
+        return job.future
+
+    def _retry_after(self):
+        waiting = len(self._heap) + self.running
+        return max(1, math.ceil(waiting / max(self.processes, 1) * self.render_seconds))
+
+    def _executor(self):
+        if self._pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._pool = ProcessPoolExecutor(self.processes, multiprocessing.get_context(method),
+                                             initializer=_start_render_process)
+        return self._pool
+
+    def _dispatch(self):
+        with self._lock:
+            jobs = []
+            while self._heap and self.running < self.processes:
+                job = heapq.heappop(self._heap)[2]
+                job.started_at = time.perf_counter()
+                self.wait_seconds += job.started_at - job.queued_at
+                self.started += 1
+                self.running += 1
+                jobs.append(job)
+            executor = self._executor() if jobs else None
+        # Outside the lock: a future that is already done runs its callback right away
+        for job in jobs:
+            try:
+                future = executor.submit(_render_job, self.cache_dir, job.key_hash, job.key)
+            except (BrokenProcessPool, RuntimeError) as e:
+                # A dead pool, or one shut down as the interpreter exits
+                self._finish(job, None, e)
+            else:
+                future.add_done_callback(lambda f, job=job: self._finish(job, f, f.exception()))
+
+    def _finish(self, job, future, error):
+        with self._lock:
+            self.running -= 1
+            del self._jobs[job.key]
+            for client in job.clients:
+                self._clients[client] -= 1
+                if not self._clients[client]:
+                    del self._clients[client]
+            if isinstance(error, BrokenProcessPool):
+                # A render process died; the next job starts a new pool
+                self._pool = None
+            elif error is None:
+                self.render_seconds += 0.2 * (time.perf_counter() - job.started_at - self.render_seconds)
+                self.renders += future.result()[2]
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            digest, data, _ = future.result()
+            if self.done is not None:
+                self.done(job.key, (digest, data))
+            job.future.set_result((digest, data))
+        self._dispatch()
+
+
+class BannerCache:
+    """Memory LRU -> disk cache -> single-flight render, keyed by (variant, size, text, font, preset)"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=64 * 1024 * 1024, render=render_png,
+                 stream_render=stream_png, processes=RENDER_PROCESSES):
+        self.memory = LRUCache(max_bytes)
+        self.disk = DiskCache(cache_dir)
+        self.render = render
+        self.stream_render = stream_render
+        self.renders = 0
+        self.fallbacks = 0
+        self.queue = None
+        if processes:
+            self.queue = RenderQueue(cache_dir, processes,
+                                     done=lambda key, entry: self.memory.put(key, entry, len(entry[1])))
+        self._flight = SingleFlight()
+        self._code_version = None
+
+    def code_version(self):
+        """Hash of the generator and encoder source and RENDER_SETTINGS, so changing any invalidates old entries"""
+        if self._code_version is None:
+            digest = hashlib.sha256()
+            for name in ("generate_banners.py", "banner_scene.py", "scenes/dragon.json", "banner_layers.py",
+                         "banner_compositor.py", "banner_fonts.py", "banner_encode.py", "png_stream.py"):
+                with open(os.path.join(ARCHIVE_DIR, name), "rb") as f:
+                    digest.update(f.read())
+            # banner_layers' quality settings change the bytes too; read here, without importing PIL
+            for name in RENDER_SETTINGS:
+                digest.update(f"{name}={os.environ.get(name, '')}\n".encode())
+            self._code_version = digest.hexdigest()[:16]
+        return self._code_version
+
+    def key_hash(self, key):
+        return hashlib.sha256(repr((self.code_version(),) + key).encode("utf-8")).hexdigest()
+
+    def etag(self, key):
+        """Validator for key known before anything is rendered: renders are deterministic"""
+        return self.key_hash(key)[:32]
+
+    def get(self, key):
+        """Return (content hash, png bytes) for key = (variant, width, height, title, font_path, preset)"""
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached[0]
+        return self._flight.do(key, lambda: self._load(key))
+
+    def _load(self, key):
+        key_hash = self.key_hash(key)
+        entry = self.disk.get(key_hash)
+        if entry is None:
+            with self.disk.lock(key_hash):
+                entry = self.disk.get(key_hash)
+                if entry is None:
+                    data = self.render(*key)
+                    self.renders += 1
+                    entry = (hashlib.sha256(data).hexdigest(), data)
+                    self.disk.put(key_hash, *entry)
+        self.memory.put(key, entry, len(entry[1]))
+        return entry
+
+    def cached(self, key):
+        """PNG bytes for key from memory or disk, or None; never renders"""
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached[0][1]
+        entry = self.disk.get(self.key_hash(key))
+        if entry is None:
+            return None
+        self.memory.put(key, entry, len(entry[1]))
+        return entry[1]
+
+    def stream(self, key):
+        """Iterator of PNG chunks for key, rendered and stored as it is sent
+
+        Nothing happens until the first chunk is asked for. Concurrent misses
+        for key in this process share one render: the first streams it and the
+        others wait, then answer through get() (which renders again only if the
+        stream was abandoned). No lock is held while a client reads, so sibling
+        workers may each render a key they miss at the same time. Streamed
+        entries reach the memory LRU on their next cached() call.
+        """
+        key_hash = self.key_hash(key)
+        entry = self.disk.get(key_hash)
+        if entry is not None:
+            self.memory.put(key, entry, len(entry[1]))
+            yield entry[1]
+            return
+        yield from self._flight.do_iter(key, lambda: self._stream_render(key, key_hash),
+                                        lambda: [self.get(key)[1]])
+
+    def _stream_render(self, key, key_hash):
+        self.renders += 1
+        return self.disk.put_stream(key_hash, self.stream_render(*key))
+
+    def render_queued(self, key, client, timeout=RENDER_TIMEOUT):
+        """(content hash, png bytes) for key, rendered by the render processes
+
+        Raises QueueFull if the queue refuses the render (see RenderQueue.submit),
+        or with reason "timeout" if it is not done within timeout seconds or its
+        render process died. A render that times out carries on and is cached.
+        Errors raised by the render itself come through as they are.
+        """
+        future = self.queue.submit(key, self.key_hash(key), client)
+        try:
+            return future.result(timeout)
+        except (TimeoutError, BrokenProcessPool):
+            raise QueueFull("timeout", self.queue._retry_after()) from None
+
+    def nearest(self, key):
+        """(key, png bytes) of the banner in memory closest in size to key with the same text, or None"""
+        width, height = key[1], key[2]
+        same = [k for k in self.memory.keys() if k[0] == key[0] and k[3:] == key[3:]]
+        for k in sorted(same, key=lambda k: abs(math.log(k[1] / width)) + abs(math.log(k[2] / height))):
+            cached = self.memory.get(k)
+            if cached is not None:
+                self.fallbacks += 1
+                return k, cached[0][1]
+        return None
+
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Production serving for the dragon server
+Runs the Flask app under gunicorn when it is installed, otherwise under a
+small pre-fork pool of threaded werkzeug workers sharing one listen socket.
+"""
+
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+DEFAULT_WORKERS = min(os.cpu_count() or 1, 8)
+DEFAULT_KEEPALIVE = 5
+DEFAULT_BACKLOG = 1024
+DEFAULT_GRACEFUL_TIMEOUT = 30
+
+
+def serve(app, host="0.0.0.0", port=5000, workers=DEFAULT_WORKERS, keepalive=DEFAULT_KEEPALIVE,
+          backlog=DEFAULT_BACKLOG, graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT, server="auto",
+          access_log=False):
+    """Serve app until SIGINT/SIGTERM, then drain in-flight requests
+
+    server is "gunicorn", "prefork" or "auto" (gunicorn if importable).
+    """
+    if server in ("auto", "gunicorn"):
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            if server == "gunicorn":
+                raise SystemExit("❌ gunicorn is not installed: pip install gunicorn")
+        else:
+            return serve_gunicorn(app, host, port, workers, keepalive, backlog, graceful_timeout, access_log)
+    return serve_prefork(app, host, port, workers, keepalive, backlog, graceful_timeout, access_log)
+
+
+def serve_gunicorn(app, host, port, workers, keepalive, backlog, graceful_timeout, access_log):
+    from gunicorn.app.base import BaseApplication
+
+    class DragonApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{host}:{port}",
+                "workers": workers,
+                "keepalive": keepalive,
+                "backlog": backlog,
+                "graceful_timeout": graceful_timeout,
+                "accesslog": "-" if access_log else None,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    print(f"🚀 gunicorn: {workers} workers on http://{host}:{port}")
+    DragonApplication().run()
+
+
+def _handler_class(keepalive, access_log):
+    class KeepAliveHandler(WSGIRequestHandler):
+        # HTTP/1.1 keeps connections open; idle ones are dropped after keepalive seconds
+        protocol_version = "HTTP/1.1"
+        timeout = keepalive
+
+        def log_request(self, *args, **kwargs):
+            if access_log:
+                super().log_request(*args, **kwargs)
+
+    return KeepAliveHandler
+
+
+def _run_worker(app, host, port, sock, keepalive, access_log, forked=False):
+    """Serve from the inherited socket until SIGTERM, then finish open requests
+
+    A forked worker ignores SIGINT, which the whole process group gets on
+    Ctrl-C: its master turns that into SIGTERM. Serving in-process, SIGINT
+    stops the server the same way.
+    """
+    server = make_server(host, port, app, threaded=True,
+                         request_handler=_handler_class(keepalive, access_log), fd=sock.fileno())
+    # Wait for in-flight request threads in server_close() instead of killing them
+    server.daemon_threads = False
+    server.block_on_close = True
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN if forked else stop)
+    try:
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        server.server_close()
+
+
+def serve_prefork(app, host, port, workers, keepalive, backlog, graceful_timeout, access_log):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.create_server((host, port), family=family, backlog=backlog)
+    sock.set_inheritable(True)
+    port = sock.getsockname()[1]
+
+    if not hasattr(os, "fork") or workers <= 1:
+        print(f"🚀 Serving on http://{host}:{port} (1 worker)")
+        _run_worker(app, host, port, sock, keepalive, access_log)
+        return
+
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(app, host, port, sock, keepalive, access_log, forked=True)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            os._exit(code)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+    print(f"🚀 Serving on http://{host}:{port} ({workers} workers, keep-alive {keepalive}s, backlog {backlog})")
+
+    # Supervise: respawn crashed workers until asked to stop
+    while not stopping:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if pid:
+            children.discard(pid)
+            print(f"⚠️ Worker {pid} exited, restarting")
+            spawn()
+        else:
+            time.sleep(0.2)
+
+    print("🛑 Shutting down, draining workers...")
+    for pid in children:
+        os.kill(pid, signal.SIGTERM)
+    deadline = time.monotonic() + graceful_timeout
+    while children and time.monotonic() < deadline:
+        for pid in list(children):
+            done, _ = os.waitpid(pid, os.WNOHANG)
+            if done:
+                children.discard(pid)
+        time.sleep(0.1)
+    for pid in children:
+        print(f"⚠️ Worker {pid} did not stop within {graceful_timeout}s, killing")
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+    sock.close()
+    sys.stdout.flush()
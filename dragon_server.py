@@ -4,246 +4,178 @@ Ultra-simple dragon server in Python Flask
 No dependencies, no complex frameworks, just guaranteed visible dragon effects
 """
 
-from flask import Flask, render_template_string
+from flask import Flask, Response, abort, request, url_for
 import datetime
+import os
 
-app = Flask(__name__)
-
-# HTML template with inline styles for maximum compatibility
-DRAGON_TEMPLATE = """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>🐉 Python Dragon Server</title>
-    <style>
-        body {
-            margin: 0;
-            padding: 0;
-            min-height: 100vh;
-            background: linear-gradient(135deg, #0f0f23, #1a1a2e);
-            color: white;
-            font-family: 'Courier New', monospace;
-            overflow-x: hidden;
-        }
-        
-        .dragon-container {
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            z-index: -1;
-            pointer-events: none;
-        }
-        
-        .dragon {
-            position: absolute;
-            top: 25%;
-            left: 20%;
-            width: 300px;
-            height: 150px;
-            background: radial-gradient(ellipse, rgba(0, 255, 127, 0.2), transparent);
-            border: 3px solid #00ff7f;
-            border-radius: 60% 40% 80% 20%;
-            animation: float 4s ease-in-out infinite;
-        }
-        
-        @keyframes float {
-            0%, 100% { transform: translateY(0) scale(1); }
-            50% { transform: translateY(-15px) scale(1.02); }
-        }
-        
-        .dragon-eye {
-            position: absolute;
-            top: 35%;
-            right: 30%;
-            width: 8px;
-            height: 8px;
-            background: #00ff7f;
-            border-radius: 50%;
-            box-shadow: 0 0 10px #00ff7f;
-            animation: blink 2.5s infinite;
-        }
-        
-        @keyframes blink {
-            0%, 85%, 100% { opacity: 1; }
-            90% { opacity: 0.1; }
-        }
-        
-        .storm {
-            position: absolute;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: repeating-linear-gradient(
-                20deg,
-                transparent,
-                transparent 25px,
-                rgba(0, 255, 127, 0.05) 25px,
-                rgba(0, 255, 127, 0.05) 27px
-            );
-            animation: storm-move 1.8s linear infinite;
-        }
-        
-        @keyframes storm-move {
-            0% { background-position: 0 0; }
-            100% { background-position: 40px 80px; }
-        }
-        
-        .content {
-            position: relative;
-            z-index: 1;
-            padding: 50px 30px;
-            text-align: center;
-        }
-        
-        .status-box {
-            background: rgba(0, 0, 0, 0.8);
-            border: 2px solid #00ff7f;
-            border-radius: 15px;
-            padding: 25px;
-            margin: 25px auto;
-            max-width: 500px;
-            box-shadow: 0 0 20px rgba(0, 255, 127, 0.3);
-        }
-        
-        .success-badge {
-            background: #00ff7f;
-            color: black;
-            padding: 10px 20px;
-            border-radius: 8px;
-            font-weight: bold;
-            display: inline-block;
-            margin: 10px;
-            animation: pulse 1.5s infinite;
-        }
-        
-        @keyframes pulse {
-            0%, 100% { transform: scale(1); }
-            50% { transform: scale(1.05); }
-        }
-        
-        .tech-info {
-            font-size: 14px;
-            color: #00ff7f;
-            margin: 10px 0;
-        }
-        
-        button {
-            background: #00ff7f;
-            color: black;
-            border: none;
-            padding: 12px 24px;
-            border-radius: 6px;
-            font-weight: bold;
-            cursor: pointer;
-            margin: 10px;
-            transition: all 0.3s ease;
-        }
-        
-        button:hover {
-            background: #00cc64;
-            transform: translateY(-2px);
-        }
-        
-        @media (prefers-reduced-motion: reduce) {
-            * { animation: none !important; }
-        }
-        
-        @media (max-width: 600px) {
-            .dragon { width: 250px; height: 120px; left: 15%; }
-            .content { padding: 30px 20px; }
-            .status-box { margin: 15px; padding: 20px; }
-        }
-    </style>
-</head>
-<body>
-    <div class="dragon-container">
-        <div class="storm"></div>
-        <div class="dragon">
-            <div class="dragon-eye"></div>
-        </div>
-    </div>
-    
-    <div class="content">
-        <h1>🐉 Python Dragon Server</h1>
-        <div class="success-badge">✅ PYTHON SERVER ACTIVE</div>
-        
-        <div class="status-box">
-            <h2>🌟 Dragon Status</h2>
-            <p><strong>Server Time:</strong> {{ current_time }}</p>
-            <p><strong>Language:</strong> Python {{ python_version }}</p>
-            <p><strong>Framework:</strong> Flask (minimal)</p>
-            
-            <div class="tech-info">
-                <p>✅ Green dragon with glowing eye (floating animation)</p>
-                <p>✅ Diagonal storm lines (moving pattern)</p>
-                <p>✅ Pure CSS animations (no JavaScript required)</p>
-                <p>✅ Reduced motion support</p>
-            </div>
-            
-            <button onclick="toggleDragon()">Toggle Dragon Visibility</button>
-            <button onclick="window.location.reload()">Refresh Page</button>
-        </div>
-        
-        <div class="status-box">
-            <h3>🔥 Why This Works</h3>
-            <p>This is <strong>pure HTML/CSS</strong> served by <strong>Python Flask</strong></p>
-            <p>No React, no TypeScript, no complex build tools</p>
-            <p>Just simple, guaranteed-to-work web technologies</p>
-            <p><strong>If you still see nothing, your browser may have CSS disabled</strong></p>
-        </div>
-    </div>
-    
-    <script>
-        function toggleDragon() {
-            const dragon = document.querySelector('.dragon');
-            const container = document.querySelector('.dragon-container');
-            
-            if (dragon.style.border === '5px solid red') {
-                dragon.style.border = '3px solid #00ff7f';
-                dragon.style.background = 'radial-gradient(ellipse, rgba(0, 255, 127, 0.2), transparent)';
-                container.style.backgroundColor = '';
-                console.log('Dragon reset to normal');
-            } else {
-                dragon.style.border = '5px solid red';
-                dragon.style.background = 'rgba(255, 0, 0, 0.3)';
-                container.style.backgroundColor = 'rgba(255, 255, 0, 0.1)';
-                console.log('Dragon in debug mode - should be VERY visible now');
-            }
+import dragon_metrics
+import dragon_og
+import dragon_page
+import dragon_static
+from dragon_page import HOME_CACHE_CONTROL
+
+PUBLIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public")
+
+OG_CACHE_CONTROL = "public, max-age=86400"
+
+
+def create_app():
+    """The dragon server's Flask app, with its OG banner cache and /metrics
+
+    Built once as `app` below, except in render processes: those re-run the
+    script that started the server as __mp_main__ before taking a job
+    (dragon_og.RenderQueue), and must not build a second server.
+    """
+    app = Flask(__name__)
+
+    # Pre-rendered at build time by `python dragon_page.py` when available
+    home_page = dragon_page.load_home_page()
+
+    @app.route('/')
+    def dragon_home():
+        stamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        encoding = home_page.negotiate(request.headers.get("Accept-Encoding", ""))
+        etag = home_page.etag(stamp, encoding)
+        headers = {"Cache-Control": HOME_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+        # Conditional requests are answered before anything is spliced or compressed
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304, headers=headers)
+        else:
+            response = Response(home_page.body(stamp, encoding), mimetype="text/html", headers=headers)
+            if encoding != "identity":
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(etag)
+        return response
+
+    public_index = dragon_static.StaticIndex(PUBLIC_DIR)
+
+    @app.route('/public/<path:filename>')
+    def public_file(filename):
+        return dragon_static.send_static(public_index, filename, request)
+
+    og_cache = dragon_og.BannerCache()
+
+    @app.route('/og/<variant>/<int:width>x<int:height>.png')
+    def og_banner(variant, width, height):
+        if variant not in dragon_og.VARIANTS:
+            abort(404)
+        if not (dragon_og.MIN_SIZE <= width <= dragon_og.MAX_SIZE and dragon_og.MIN_SIZE <= height <= dragon_og.MAX_SIZE):
+            abort(400, f"Banner size must be between {dragon_og.MIN_SIZE} and {dragon_og.MAX_SIZE} px")
+        title = request.args.get("title", "")
+        if len(title) > dragon_og.MAX_TITLE_LENGTH:
+            abort(400, f"Title is limited to {dragon_og.MAX_TITLE_LENGTH} characters")
+
+        key = (variant, width, height, title, dragon_og.resolve_font_path(), dragon_og.PNG_PRESET)
+        etag = og_cache.etag(key)
+        headers = {"Cache-Control": OG_CACHE_CONTROL, "ETag": f'W/"{etag}"'}
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304, headers=headers)
+        data = og_cache.cached(key)
+        if data is not None:
+            return Response(data, mimetype="image/png", headers=headers)
+        if request.method == "HEAD":
+            return Response(mimetype="image/png", headers=headers)
+        if og_cache.queue is None:
+            # Misses go out as they are encoded (chunked), starting before the render
+            return Response(og_cache.stream(key), mimetype="image/png", headers=headers)
+
+        # Nothing is sent until the render is done, so a failed one can still be
+        # answered with an error (Flask's 500 for anything but QueueFull)
+        try:
+            _, data = og_cache.render_queued(key, request.remote_addr)
+        except dragon_og.QueueFull as e:
+            # Shed load: the closest size already rendered, or a retry hint
+            fallback = og_cache.nearest(key)
+            if fallback is not None:
+                (_, fallback_width, fallback_height, *_), data = fallback
+                # Only the title carries over: it is all the banner depends on besides the route
+                location = url_for("og_banner", variant=variant, width=fallback_width, height=fallback_height,
+                                   title=title or None)
+                return Response(data, mimetype="image/png",
+                                headers={"Cache-Control": "no-store", "Content-Location": location})
+            return Response(f"Banner renders are busy, retry in {e.retry_after} s\n", mimetype="text/plain",
+                            status=429 if e.reason == "client" else 503, headers={"Retry-After": str(e.retry_after)})
+        return Response(data, mimetype="image/png", headers=headers)
+
+    @app.route('/status')
+    def status():
+        return {
+            "status": "Dragon server running",
+            "time": datetime.datetime.now().isoformat(),
+            "dragon_visible": True,
+            "effects": ["floating_dragon", "storm_lines", "blinking_eye"]
         }
-        
-        console.log('🐉 Python Dragon Server loaded!');
-        console.log('Time:', '{{ current_time }}');
-    </script>
-</body>
-</html>
-"""
 
-@app.route('/')
-def dragon_home():
-    import sys
-    return render_template_string(DRAGON_TEMPLATE,
-        current_time=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        python_version=f"{sys.version_info.major}.{sys.version_info.minor}"
-    )
-
-@app.route('/status')
-def status():
-    return {
-        "status": "Dragon server running",
-        "time": datetime.datetime.now().isoformat(),
-        "dragon_visible": True,
-        "effects": ["floating_dragon", "storm_lines", "blinking_eye"]
-    }
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return metrics.response()
+
+    # Wraps every route above; /metrics adds up all worker processes
+    metrics = dragon_metrics.Metrics(app)
+    for tier, cache in (("memory", og_cache.memory), ("disk", og_cache.disk)):
+        metrics.add_sample("dragon_og_cache_hits_total", "counter", "OG banner cache hits",
+                           lambda cache=cache: cache.hits, tier=tier)
+        metrics.add_sample("dragon_og_cache_misses_total", "counter", "OG banner cache misses",
+                           lambda cache=cache: cache.misses, tier=tier)
+    metrics.add_sample("dragon_og_renders_total", "counter", "OG banners rendered",
+                       lambda: og_cache.renders + (og_cache.queue.renders if og_cache.queue is not None else 0))
+    metrics.add_sample("dragon_og_fallbacks_total", "counter", "OG banners answered with a cached nearby size",
+                       lambda: og_cache.fallbacks)
+    if og_cache.queue is not None:
+        queue = og_cache.queue
+        metrics.add_sample("dragon_og_queue_depth", "gauge", "OG renders waiting for a render process", lambda: len(queue))
+        metrics.add_sample("dragon_og_renders_running", "gauge", "OG renders in progress", lambda: queue.running)
+        metrics.add_sample("dragon_og_queue_wait_seconds_total", "counter", "Time OG renders spent queued",
+                           lambda: queue.wait_seconds)
+        metrics.add_sample("dragon_og_queue_started_total", "counter", "OG renders taken off the queue",
+                           lambda: queue.started)
+        for reason in ("queue", "client"):
+            metrics.add_sample("dragon_og_rejections_total", "counter", "OG renders refused",
+                               lambda reason=reason: queue.rejected[reason], reason=reason)
+
+    app.extensions["dragon_metrics"] = metrics
+    return app
+
+
+if __name__ != "__mp_main__":
+    app = create_app()
+    metrics = app.extensions["dragon_metrics"]
+
+
+def main():
+    import argparse
+    import dragon_serve
+
+    parser = argparse.ArgumentParser(description="Python Dragon Server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--debug", action="store_true", help="enable the Flask debugger and reloader (dev server only)")
+    parser.add_argument("--serve", action="store_true", help="run the production server instead of the dev server")
+    parser.add_argument("--server", choices=["auto", "gunicorn", "prefork"], default="auto",
+                        help="production server backend (default: gunicorn if installed)")
+    parser.add_argument("--workers", type=int, default=dragon_serve.DEFAULT_WORKERS)
+    parser.add_argument("--keepalive", type=int, default=dragon_serve.DEFAULT_KEEPALIVE,
+                        help="seconds to keep idle connections open")
+    parser.add_argument("--backlog", type=int, default=dragon_serve.DEFAULT_BACKLOG)
+    parser.add_argument("--graceful-timeout", type=int, default=dragon_serve.DEFAULT_GRACEFUL_TIMEOUT,
+                        help="seconds to wait for in-flight requests on shutdown")
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
 
-if __name__ == '__main__':
     print("🐉 Starting Python Dragon Server...")
-    print("🌐 Visit: http://localhost:5000")
-    print("📊 Status: http://localhost:5000/status")
+    print(f"🌐 Visit: http://localhost:{args.port}")
+    print(f"📊 Status: http://localhost:{args.port}/status")
     print("🔥 This WILL show a dragon - guaranteed!")
-    
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+
+    if args.serve:
+        dragon_serve.serve(app, host=args.host, port=args.port, workers=args.workers,
+                           keepalive=args.keepalive, backlog=args.backlog,
+                           graceful_timeout=args.graceful_timeout, server=args.server,
+                           access_log=args.access_log)
+    else:
+        app.run(debug=args.debug, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
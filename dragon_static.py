@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Static file serving for the generated banners in public/
+Content-hash ETags are computed once per file version and kept in an index,
+so a conditional or ranged request costs a dict lookup and, at most, one stat.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+import threading
+import time
+
+from flask import Response, abort
+from werkzeug.http import http_date, parse_date
+from werkzeug.security import safe_join
+
+# Names like dragon-og.3f9a1c2b.png or dragon-og-3f9a1c2b7e.png never change content
+FINGERPRINT_RE = re.compile(r"[.-][0-9a-f]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STATIC_CACHE_CONTROL = "public, max-age=3600"
+CHUNK_SIZE = 256 * 1024
+
+
+class StaticEntry:
+    __slots__ = ("path", "size", "mtime", "stat_key", "etag", "mimetype", "cache_control", "checked")
+
+    def __init__(self, path, st):
+        self.path = path
+        self.size = st.st_size
+        self.mtime = int(st.st_mtime)
+        self.stat_key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        with open(path, "rb") as f:
+            self.etag = hashlib.file_digest(f, "blake2b").hexdigest()[:20]
+        self.mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        fingerprinted = FINGERPRINT_RE.search(os.path.basename(path))
+        self.cache_control = IMMUTABLE_CACHE_CONTROL if fingerprinted else STATIC_CACHE_CONTROL
+        self.checked = time.monotonic()
+
+
+class StaticIndex:
+    """Index of files under root with cached content hashes
+
+    Entries are revalidated with a stat at most every check_interval seconds,
+    and only rehashed when inode, size or mtime changed.
+    """
+
+    def __init__(self, root, check_interval=1.0):
+        self.root = root
+        self.check_interval = check_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, rel_path):
+        entry = self._entries.get(rel_path)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked < self.check_interval:
+            return entry
+
+        path = safe_join(self.root, rel_path)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._entries.pop(rel_path, None)
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+
+        if entry is not None and entry.stat_key == (st.st_ino, st.st_size, st.st_mtime_ns):
+            entry.checked = now
+            return entry
+        with self._lock:
+            entry = StaticEntry(path, st)
+            self._entries[rel_path] = entry
+        return entry
+
+
+def _pread_chunks(path, offset, length):
+    """Stream a byte range with positional reads
+
+    The file is opened on first iteration so HEAD requests never touch it.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        while length > 0:
+            chunk = os.pread(fd, min(CHUNK_SIZE, length), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            length -= len(chunk)
+            yield chunk
+    finally:
+        os.close(fd)
+
+
+def _byte_range(request, entry):
+    """Return (start, end) for a satisfiable single Range, None for the full body, or False if unsatisfiable"""
+    if request.range is None or len(request.range.ranges) != 1:
+        return None
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range.strip('"') != entry.etag:
+        date = parse_date(if_range)
+        if date is None or int(date.timestamp()) != entry.mtime:
+            return None
+    span = request.range.range_for_length(entry.size)
+    return span if span is not None else False
+
+
+def send_static(index, rel_path, request):
+    """Build the response for one file under index.root, honouring conditionals and Range"""
+    entry = index.lookup(rel_path)
+    if entry is None:
+        abort(404)
+
+    headers = {
+        "ETag": f'"{entry.etag}"',
+        "Last-Modified": http_date(entry.mtime),
+        "Cache-Control": entry.cache_control,
+        "Accept-Ranges": "bytes",
+    }
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(entry.etag)
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and entry.mtime <= since.timestamp()
+    if not_modified:
+        return Response(status=304, headers=headers)
+
+    span = _byte_range(request, entry)
+    if span is False:
+        headers["Content-Range"] = f"bytes */{entry.size}"
+        return Response(status=416, headers=headers)
+    start, end = span or (0, entry.size)
+    if span:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{entry.size}"
+    headers["Content-Length"] = str(end - start)
+
+    file_wrapper = request.environ.get("wsgi.file_wrapper")
+    if file_wrapper is not None and not span:
+        # Servers such as gunicorn turn this into sendfile(); the wrapper sends
+        # to the end of the file, so ranges go through the bounded reader below
+        body = file_wrapper(open(entry.path, "rb"), CHUNK_SIZE)
+    else:
+        body = _pread_chunks(entry.path, start, end - start)
+
+    return Response(body, status=206 if span else 200, headers=headers,
+                    mimetype=entry.mimetype, direct_passthrough=True)
@@ -0,0 +1,62 @@
+"""
+Error bounds of the banner fast paths, at small canvas sizes
+The benchmarks check the same bounds at full size; these run with pytest.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "archive"))
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFilter
+
+import banner_compositor
+import banner_layers
+import banner_scene
+from banner_layers import LAYERS
+
+
+@pytest.mark.parametrize("scene, variant", [("dragon", "dark"), ("dragon", "light"), ("earth-dragon", None)])
+def test_compositor_within_tolerance(scene, variant):
+    def render(compositor):
+        # The cached base image is composited by whichever engine built it
+        LAYERS.clear()
+        return banner_scene.render_scene(scene, 320, 168, variant, seed=0, compositor=compositor)
+
+    reference = render(banner_compositor.PillowCompositor)
+    fast = render(banner_compositor.Compositor)
+    assert banner_compositor.max_difference(reference, fast) <= banner_compositor.TOLERANCE
+
+
+@pytest.mark.parametrize("w, h, radius, strength, inset", [(300, 158, 25, 0.3, 0), (300, 158, 30, 0.45, 15), (150, 79, 5, 1.0, 3)])
+def test_fast_vignette_within_tolerance(w, h, radius, strength, inset):
+    exact = banner_layers.vignette_layer(w, h, radius, strength, inset, quality="exact")
+    fast = banner_layers.vignette_layer(w, h, radius, strength, inset, quality="fast")
+    diff = np.abs(np.asarray(exact).astype(np.int16) - np.asarray(fast))
+    assert diff.max() <= banner_layers.VIGNETTE_TOLERANCE
+
+
+def _ellipses(w, h):
+    img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.ellipse((w * 0.15, h * 0.2, w * 0.85, h * 0.8), fill=(33, 189, 140, 55))
+    draw.ellipse((w * 0.3, h * 0.35, w * 0.7, h * 0.65), fill=(155, 240, 200, 45))
+    return img
+
+
+# The bound holds at the sizes the scenes blur, not below them: these are the
+# smallest glows in benchmarks/bench_blur.py
+@pytest.mark.parametrize("quality", ["fast", "draft"])
+@pytest.mark.parametrize("source, w, h, radius", [
+    (banner_layers.create_dragon_silhouette, 333, 177, 15),
+    (_ellipses, 350, 310, 20),
+])
+def test_pyramid_blur_within_tolerance(quality, source, w, h, radius):
+    img = source(w, h)
+    assert banner_layers.blur_factor(radius, quality) > 1
+    exact = np.asarray(img.filter(ImageFilter.GaussianBlur(radius))).astype(np.int16)
+    diff = np.abs(np.asarray(banner_layers.blur_image(img, radius, quality)) - exact)
+    assert diff.max() <= banner_layers.BLUR_TOLERANCE[quality]
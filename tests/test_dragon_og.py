@@ -0,0 +1,54 @@
+"""
+OG banner cache: concurrent misses for one banner share a render
+"""
+
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import dragon_og
+
+KEY = ("dark", 1200, 630, "Unfurl storm", "", "balanced")
+
+
+def test_concurrent_streamed_misses_render_once(tmp_path):
+    renders = []
+
+    def stream_render(*key):
+        renders.append(key)
+        yield b"\x89PNG"
+        # Long enough for every other request to arrive while this one streams
+        time.sleep(0.3)
+        yield b" rows"
+
+    cache = dragon_og.BannerCache(str(tmp_path), render=lambda *key: b"rendered again",
+                                  stream_render=stream_render, processes=0)
+    bodies = []
+    threads = [threading.Thread(target=lambda: bodies.append(b"".join(cache.stream(KEY)))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(renders) == 1
+    assert cache.renders == 1
+    assert bodies == [b"\x89PNG rows"] * 8
+
+
+def test_abandoned_stream_leaves_followers_a_render(tmp_path):
+    cache = dragon_og.BannerCache(str(tmp_path), render=lambda *key: b"rendered",
+                                  stream_render=lambda *key: iter([b"part", b"rest"]), processes=0)
+    leader = cache.stream(KEY)
+    assert next(leader) == b"part"
+    body = []
+    follower = threading.Thread(target=lambda: body.append(b"".join(cache.stream(KEY))))
+    follower.start()
+    time.sleep(0.1)
+    leader.close()
+    follower.join()
+
+    assert body == [b"rendered"]